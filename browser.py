@@ -5,61 +5,483 @@ This module handles browser automation using Selenium for JavaScript-heavy websi
 that require user interaction to access PDF download links.
 """
 
+import json
 import logging
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import threading
 import time
-from typing import List, Optional, Any
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Any
+from urllib.request import urlopen
 from urllib.parse import urljoin, urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
+try:
+    from selenium.webdriver.remote.client_config import ClientConfig
+except ImportError:
+    # Selenium before 4.26 has no ClientConfig; the WebDriver connection
+    # pool then keeps its default size
+    ClientConfig = None
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import (
     TimeoutException, 
     NoSuchElementException, 
     WebDriverException,
-    ElementClickInterceptedException
+    JavascriptException
 )
 
 logger = logging.getLogger(__name__)
 
+# Chrome flags for stability and compatibility, plus a user agent that
+# looks like a regular browser
+CHROME_ARGUMENTS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--window-size=1920,1080',
+    '--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+]
+
+# Links that may point to PDFs, matched in one query
+PDF_LINK_CSS = ', '.join([
+    'a[href*=".pdf"]',
+    'a[download*=".pdf"]',
+    'a[title*="PDF"]',
+    'a[title*="Download"]',
+])
+
+# chromedriver and Chrome paths resolved by Selenium Manager on the first
+# start; later starts pass them in and skip the lookup subprocess
+_CHROME_PATHS: Dict[str, str] = {}
+
+# Persistent Chrome profiles, so the HTTP cache and cookies for gov.hk sites
+# survive browser restarts. Chrome locks a profile while it runs, so each
+# live browser gets its own profile-N directory under this one.
+DEFAULT_USER_DATA_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'hk_gov_pdf_crawler', 'chrome')
+_MAX_PROFILES = 16
+_profiles_in_use: Set[str] = set()
+_profiles_lock = threading.Lock()
+
+# Executable names tried when launching a shared Chrome
+_CHROME_EXECUTABLES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+
+# Collects PDF links in a single WebDriver round trip: visible links, links
+# behind "show more"/download buttons, data attributes and hidden links, and
+# whatever the page's own reveal functions add. Buttons are clicked once
+# each, then the page gets a moment to render before links are re-collected.
+_BATCH_PDF_LINKS_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var links = new Set();
+
+function collect() {
+    document.querySelectorAll(
+        'a[href*=".pdf"], a[download*=".pdf"], a[title*="PDF"], a[title*="Download"]'
+    ).forEach(function (el) {
+        var href = el.href || '';
+        var lower = href.toLowerCase();
+        if (lower.indexOf('.pdf') !== -1 || lower.indexOf('download') !== -1) links.add(href);
+    });
+    document.querySelectorAll('[data-url*="pdf"], [data-href*="pdf"], [data-download*="pdf"]').forEach(function (el) {
+        var url = el.getAttribute('data-url') || el.getAttribute('data-href') || el.getAttribute('data-download');
+        if (url) links.add(url);
+    });
+}
+
+function clickAll(elements) {
+    var clicked = 0;
+    for (var i = 0; i < elements.length && clicked < 3; i++) {
+        try { elements[i].click(); clicked++; } catch (e) {}
+    }
+    return clicked;
+}
+
+function withText(tag, text) {
+    return Array.prototype.filter.call(document.getElementsByTagName(tag), function (el) {
+        return (el.textContent || '').indexOf(text) !== -1;
+    });
+}
+
+collect();
+
+var clicked = 0;
+[['button', 'Download'], ['button', 'PDF'], ['button', 'View'], ['button', 'Show'],
+ ['a', 'More'], ['a', 'View All'], ['a', 'Show All']].forEach(function (pair) {
+    clicked += clickAll(withText(pair[0], pair[1]));
+});
+['.download-btn', '.pdf-btn', '.view-more', '.show-all'].forEach(function (selector) {
+    clicked += clickAll(document.querySelectorAll(selector));
+});
+
+['showDownloads', 'loadPDFs', 'showAllDocuments'].forEach(function (name) {
+    if (typeof window[name] === 'function') {
+        try { window[name](); clicked++; } catch (e) {}
+    }
+});
+
+setTimeout(function () {
+    collect();
+    done(Array.from(links));
+}, clicked ? 2000 : 0);
+"""
+
+# Runs a selector in the page and returns only the link URLs, so one JSON
+# response replaces a WebElement reference plus an attribute call per link
+_LINK_HREFS_SCRIPT = """
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (a) { return a.href; });
+"""
+
+# Clicks one element and returns the PDF links that appeared because of it.
+# The click counts as done once the DOM has been quiet for 100ms, or after
+# 2s for pages that keep changing.
+_CLICK_AND_COLLECT_SCRIPT = """
+var element = arguments[0];
+var pdfLinkCss = arguments[1];
+var done = arguments[arguments.length - 1];
+
+function pdfHrefs() {
+    return Array.prototype.map.call(document.querySelectorAll(pdfLinkCss), function (a) { return a.href || ''; })
+        .filter(function (href) {
+            var lower = href.toLowerCase();
+            return lower.indexOf('.pdf') !== -1 || lower.indexOf('download') !== -1;
+        });
+}
+
+var before = new Set(pdfHrefs());
+var started = Date.now();
+var lastChange = started;
+var observer = new MutationObserver(function () { lastChange = Date.now(); });
+observer.observe(document, {subtree: true, childList: true, attributes: true});
+
+try {
+    element.scrollIntoView(true);
+    element.click();
+} catch (e) {
+    observer.disconnect();
+    done([]);
+    return;
+}
+
+(function settle() {
+    var now = Date.now();
+    if (now - lastChange < 100 && now - started < 2000) {
+        setTimeout(settle, 50);
+        return;
+    }
+    observer.disconnect();
+    done(pdfHrefs().filter(function (href) { return !before.has(href); }));
+})();
+"""
+
+# Opens up to two modals per trigger selector and collects their PDF links,
+# then ticks the checkboxes of the first two forms (terms acceptance) and
+# clicks their submit buttons. Submitting may navigate away, so links are
+# returned before that and the caller looks again once the new page loads.
+_FORMS_AND_MODALS_SCRIPT = """
+var pdfLinkCss = arguments[0];
+var done = arguments[arguments.length - 1];
+var links = [];
+
+function collect() {
+    document.querySelectorAll(pdfLinkCss).forEach(function (el) {
+        var href = el.href || '';
+        var lower = href.toLowerCase();
+        if (lower.indexOf('.pdf') !== -1 || lower.indexOf('download') !== -1) links.push(href);
+    });
+}
+
+// requestAnimationFrame doesn't fire in background tabs, so fall back to a timer
+function nextFrame(callback) {
+    var fired = false;
+    function run() { if (!fired) { fired = true; callback(); } }
+    requestAnimationFrame(run);
+    setTimeout(run, 100);
+}
+
+var triggers = [];
+['button[data-toggle="modal"]', 'a[data-toggle="modal"]', '.modal-trigger', '.popup-trigger'].forEach(function (selector) {
+    Array.prototype.slice.call(document.querySelectorAll(selector), 0, 2).forEach(function (el) { triggers.push(el); });
+});
+
+function openModal(index) {
+    if (index >= triggers.length) return handleForms();
+    try { triggers[index].click(); } catch (e) { return openModal(index + 1); }
+    nextFrame(function () {
+        collect();
+        var close = document.querySelector('.close, .modal-close, [data-dismiss="modal"]');
+        if (close) { try { close.click(); } catch (e) {} }
+        openModal(index + 1);
+    });
+}
+
+function handleForms() {
+    var submitted = 0;
+    Array.prototype.slice.call(document.forms, 0, 2).forEach(function (form) {
+        form.querySelectorAll('input[type="checkbox"]').forEach(function (box) {
+            if (!box.checked) {
+                box.checked = true;
+                box.dispatchEvent(new Event('change', {bubbles: true}));
+            }
+        });
+        var submit = form.querySelector('input[type="submit"], button[type="submit"], .submit-btn');
+        if (submit) { try { submit.click(); submitted++; } catch (e) {} }
+    });
+    done({links: links, submitted: submitted});
+}
+
+openModal(0);
+"""
+
+# Finds elements that might reveal PDFs: elements of a tag containing some
+# text, then CSS selector matches, at most `limit` new ones per target
+_CLICKABLE_ELEMENTS_SCRIPT = """
+var textTargets = arguments[0];
+var cssSelectors = arguments[1];
+var limit = arguments[2];
+var found = [];
+
+function add(elements) {
+    var added = 0;
+    for (var i = 0; i < elements.length && added < limit; i++) {
+        if (found.indexOf(elements[i]) === -1) {
+            found.push(elements[i]);
+            added++;
+        }
+    }
+}
+
+textTargets.forEach(function (target) {
+    add(Array.prototype.filter.call(document.getElementsByTagName(target[0]), function (el) {
+        return (el.textContent || '').indexOf(target[1]) !== -1;
+    }));
+});
+cssSelectors.forEach(function (selector) { add(document.querySelectorAll(selector)); });
+return found;
+"""
+
+# Reports whether the DOM changed since the previous call. The first call on
+# a page installs a MutationObserver and always reports a change.
+_DOM_CHANGED_SCRIPT = """
+var changed = window.__hkPdfLinksDirty !== false;
+if (!window.__hkPdfLinksObserver) {
+    window.__hkPdfLinksObserver = new MutationObserver(function () { window.__hkPdfLinksDirty = true; });
+    window.__hkPdfLinksObserver.observe(document, {subtree: true, childList: true, attributes: true});
+}
+window.__hkPdfLinksDirty = false;
+return changed;
+"""
+
+# The scripts above, registered as window.__hkpdf.<name> in every new
+# document so later calls send a one-line stub instead of the whole script.
+# Each script body becomes a function body, where `arguments` and `return`
+# behave as they do under execute_script.
+_PAGE_HELPERS = {
+    'batchPdfLinks': _BATCH_PDF_LINKS_SCRIPT,
+    'linkHrefs': _LINK_HREFS_SCRIPT,
+    'clickAndCollect': _CLICK_AND_COLLECT_SCRIPT,
+    'clickableElements': _CLICKABLE_ELEMENTS_SCRIPT,
+    'formsAndModals': _FORMS_AND_MODALS_SCRIPT,
+    'domChanged': _DOM_CHANGED_SCRIPT,
+}
+_PAGE_HELPERS_JS = "window.__hkpdf = {\n" + ",\n".join(
+    f"{name}: function () {{{script}}}" for name, script in _PAGE_HELPERS.items()
+) + "\n};"
+_PAGE_HELPER_CALLS = {
+    script: f"return window.__hkpdf.{name}.apply(null, arguments);"
+    for name, script in _PAGE_HELPERS.items()
+}
+
+
+def _build_default_options(headless: bool) -> Options:
+    """Chrome options for a browser launched by a BrowserHandler"""
+    # Built fresh on every start: Selenium writes the resolved browser
+    # path back into the options it is given
+    options = Options()
+    if headless:
+        options.add_argument('--headless')
+    for argument in CHROME_ARGUMENTS:
+        options.add_argument(argument)
+    
+    # Network events go to the performance log, where PDF responses are
+    # picked up without running the reveal scripts
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def _profile_locked(profile: str) -> bool:
+    """
+    Whether a Chrome in another process holds a profile.
+    
+    Chrome marks a profile with a SingletonLock symlink to 'hostname-pid'
+    and leaves it behind when it crashes or is killed; a lock from this
+    host whose process has exited is stale, so it is removed.
+    """
+    lock_path = os.path.join(profile, 'SingletonLock')
+    try:
+        target = os.readlink(lock_path)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        # Not a symlink we can read; leave it to its owner
+        return os.path.lexists(lock_path)
+    
+    host, _, pid = target.rpartition('-')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        logger.debug(f"Removing stale Chrome profile lock: {lock_path} -> {target}")
+        try:
+            os.remove(lock_path)
+        except OSError:
+            return os.path.lexists(lock_path)
+        return False
+    except OSError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+def _claim_profile(base_dir: str) -> Optional[str]:
+    """Reserve a Chrome profile directory no other browser is using"""
+    with _profiles_lock:
+        for i in range(_MAX_PROFILES):
+            profile = os.path.join(base_dir, f'profile-{i}')
+            if profile in _profiles_in_use or _profile_locked(profile):
+                continue
+            _profiles_in_use.add(profile)
+            return profile
+    return None
+
+
+def _release_profile(profile: Optional[str]):
+    with _profiles_lock:
+        _profiles_in_use.discard(profile)
+
+
+def _filter_pdf_hrefs(hrefs: List[Any]) -> List[str]:
+    """Keep the hrefs that look like PDF links, lowercasing each one once"""
+    return [
+        href for href in hrefs
+        if isinstance(href, str) and ('.pdf' in (lower := href.lower()) or 'download' in lower)
+    ]
+
+
+def _is_pdf_url_path(url: str) -> bool:
+    """Whether a URL's path ends in .pdf, ignoring its query and fragment"""
+    return url.split('#', 1)[0].split('?', 1)[0].lower().endswith('.pdf')
+
+
+def _page_loaded(driver) -> bool:
+    """WebDriverWait condition: the document and its scripts have finished loading"""
+    return driver.execute_script("return document.readyState") == "complete"
+
 
 class BrowserHandler:
     """Handles browser automation for interactive websites"""
     
-    def __init__(self, headless: bool = True):
+    # Elements that might reveal PDFs: (tag, text it contains) pairs, then
+    # CSS selectors
+    INTERACTIVE_TEXT_TARGETS: Tuple[Tuple[str, str], ...] = (
+        ('button', 'Download'),
+        ('button', 'PDF'),
+        ('button', 'View'),
+        ('button', 'Show'),
+        ('a', 'More'),
+        ('a', 'View All'),
+        ('a', 'Show All'),
+    )
+    INTERACTIVE_SELECTORS: Tuple[str, ...] = ('.download-btn', '.pdf-btn', '.view-more', '.show-all')
+    
+    def __init__(self, headless: bool = True, cdp_endpoint: Optional[str] = None,
+                 pool_size: Optional[int] = None,
+                 user_data_dir: Optional[str] = DEFAULT_USER_DATA_DIR):
         self.driver: Optional[webdriver.Chrome] = None
         self.headless = headless
+        
+        # Base directory for persistent profiles; None starts Chrome with
+        # a throwaway profile
+        self.user_data_dir = user_data_dir
+        self._profile: Optional[str] = None
         self.wait: Optional[WebDriverWait] = None
         
+        # Element waits by timeout, reused by wait_for_element for this driver
+        self._waits: Dict[float, WebDriverWait] = {}
+        
+        # Implicit wait set through set_implicit_wait; tracked here so
+        # explicit waits don't need a round trip to read it back
+        self._implicit_wait: float = 0
+        
+        # host:port of an already running Chrome (see launch_shared_chrome);
+        # when set, this handler works in its own tab of that browser
+        self.cdp_endpoint = cdp_endpoint
+        
+        # HTTP connections kept open to the driver; urllib3 keeps only one
+        # by default, so overlapping WebDriver commands queue behind it
+        self.pool_size = pool_size
+        
+        # Whether _PAGE_HELPERS_JS is injected into this driver's documents
+        self._page_helpers_registered = False
+        
+        # PDF links found on each page, reused until the page's DOM changes
+        self._pdf_link_cache: Dict[str, List[str]] = {}
+        
     def start_browser(self):
         """Start browser instance when needed (lazy initialization)"""
         if not self.driver:
-            logger.info("Starting browser instance...")
-            options = Options()
-            
-            if self.headless:
-                options.add_argument('--headless')
-                logger.debug("Browser running in headless mode")
-            
-            # Chrome options for stability and compatibility
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--disable-web-security')
-            options.add_argument('--disable-features=VizDisplayCompositor')
-            options.add_argument('--window-size=1920,1080')
+            if self.cdp_endpoint:
+                # The shared browser was launched with its own flags
+                logger.info(f"Attaching to shared browser at {self.cdp_endpoint}...")
+                options = Options()
+                options.debugger_address = self.cdp_endpoint
+            else:
+                logger.info("Starting browser instance...")
+                options = _build_default_options(self.headless)
+                if self.headless:
+                    logger.debug("Browser running in headless mode")
+                
+                if self.user_data_dir:
+                    self._profile = _claim_profile(self.user_data_dir)
+                    if self._profile:
+                        options.add_argument(f'--user-data-dir={self._profile}')
+                    else:
+                        logger.debug("All browser profiles are in use, starting without one")
             
-            # User agent to appear more like a regular browser
-            options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+            chrome_kwargs = {}
+            if _CHROME_PATHS:
+                chrome_kwargs['service'] = Service(executable_path=_CHROME_PATHS['driver'])
+                if _CHROME_PATHS['browser'] and not self.cdp_endpoint:
+                    options.binary_location = _CHROME_PATHS['browser']
             
             try:
-                self.driver = webdriver.Chrome(options=options)
+                self.driver = webdriver.Chrome(options=options, **chrome_kwargs)
+                self._remember_chrome_paths(options)
+                self._configure_connection_pool()
+                if self.cdp_endpoint:
+                    self.driver.switch_to.new_window('tab')
+                self._register_page_helpers()
                 self.wait = WebDriverWait(self.driver, 10)
+                self._waits = {}
+                self._implicit_wait = 0
                 logger.info("Browser started successfully")
             except Exception as e:
                 logger.error(f"Failed to start browser: {e}")
+                if not self.driver:
+                    _release_profile(self._profile)
+                    self._profile = None
                 raise
             
     def handle_interactive_page(self, url: str) -> List[str]:
@@ -67,22 +489,111 @@ class BrowserHandler:
         if not self.driver:
             self.start_browser()
             
-        pdf_links = []
+        logger.info(f"Loading interactive page: {url}")
         
+        # Drop network log entries left over from the previous page
+        self._read_pdf_responses()
         try:
-            logger.info(f"Loading interactive page: {url}")
             self.driver.get(url)
+        except Exception as e:
+            self._raise_if_session_lost(e)
+            logger.error(f"Error handling interactive page {url}: {e}")
+            return []
+        
+        return self._collect_page_links(url)
+        
+    def handle_interactive_pages(self, urls: List[str]) -> Dict[str, List[str]]:
+        """Handle several interactive pages, loading them side by side in tabs
+        
+        All tabs are opened first so the pages load concurrently in the
+        browser; each is then processed and closed in turn, since one
+        WebDriver session only runs one command at a time.
+        """
+        results: Dict[str, List[str]] = {}
+        if not urls:
+            return results
+        if not self.driver:
+            self.start_browser()
+        
+        self._read_pdf_responses()
+        original_handle = self.driver.current_window_handle
+        known_handles = set(self.driver.window_handles)
+        tabs: Dict[str, str] = {}
+        
+        for url in dict.fromkeys(urls):
+            results[url] = []
+            try:
+                # Unlike driver.get, window.open returns without waiting for the load
+                self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+                new_handles = [handle for handle in self.driver.window_handles if handle not in known_handles]
+                known_handles.update(new_handles)
+                if new_handles:
+                    tabs[url] = new_handles[0]
+            except Exception as e:
+                logger.error(f"Error opening tab for {url}: {e}")
+        
+        logger.info(f"Loading {len(tabs)} interactive pages in tabs")
+        try:
+            for url, handle in tabs.items():
+                try:
+                    self.driver.switch_to.window(handle)
+                    results[url] = self._collect_page_links(url, sniff=False)
+                finally:
+                    try:
+                        self.driver.close()
+                    except Exception as e:
+                        logger.debug(f"Error closing tab for {url}: {e}")
+            
+            # The performance log covers every tab; its entries name the tab
+            for webview, pdf_url in self._read_pdf_responses_by_view():
+                for url, handle in tabs.items():
+                    if webview and handle.endswith(webview) and pdf_url not in results[url]:
+                        results[url].append(pdf_url)
+        except Exception as e:
+            logger.error(f"Error handling interactive pages: {e}")
+        finally:
+            try:
+                self.driver.switch_to.window(original_handle)
+            except Exception as e:
+                logger.debug(f"Could not return to the original tab: {e}")
+        
+        return results
+        
+    def _collect_page_links(self, url: str, sniff: bool = True) -> List[str]:
+        """Collect PDF links from the page loaded in the current tab"""
+        pdf_links = []
+        
+        try:
+            self._pdf_link_cache.pop(url, None)
             
-            # Wait for page to load
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)  # Additional wait for JavaScript to execute
+            # Wait for page to load, then for its scripts to finish, instead
+            # of sleeping for a fixed time
+            with self._no_implicit_wait():
+                self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                self.wait.until(_page_loaded)
             
-            # Try multiple strategies to find and reveal PDF links
-            pdf_links.extend(self._find_existing_pdf_links())
-            pdf_links.extend(self._click_interactive_elements())
-            pdf_links.extend(self._execute_pdf_reveal_scripts())
+            # PDFs the page fetched while loading
+            sniffed_links = self._read_pdf_responses() if sniff else []
+            pdf_links.extend(sniffed_links)
+            
+            # Find and reveal PDF links in one script run; the step-by-step
+            # helpers are only used if the batch script fails
+            batch_links = self._collect_pdf_links_batched()
+            if batch_links is not None:
+                pdf_links.extend(batch_links)
+            else:
+                pdf_links.extend(self._find_existing_pdf_links())
+                pdf_links.extend(self._click_interactive_elements())
+                # Reveal scripts are only needed when the network log
+                # showed no PDFs
+                if not sniffed_links:
+                    pdf_links.extend(self._execute_pdf_reveal_scripts())
             pdf_links.extend(self._handle_forms_and_modals())
             
+            # PDFs fetched because of clicks and form submissions
+            if sniff:
+                pdf_links.extend(self._read_pdf_responses())
+            
             # Remove duplicates and convert relative URLs to absolute
             pdf_links = list(set(pdf_links))
             pdf_links = [urljoin(url, link) if not link.startswith('http') else link for link in pdf_links]
@@ -90,104 +601,128 @@ class BrowserHandler:
             logger.info(f"Found {len(pdf_links)} PDF links on interactive page")
             
         except Exception as e:
+            self._raise_if_session_lost(e)
             logger.error(f"Error handling interactive page {url}: {e}")
             
         return pdf_links
         
+    def _read_pdf_responses(self) -> List[str]:
+        """PDF URLs the browser received since the last call, from the performance log"""
+        return [pdf_url for _, pdf_url in self._read_pdf_responses_by_view()]
+        
+    def _read_pdf_responses_by_view(self) -> List[Tuple[str, str]]:
+        """(tab id, PDF URL) pairs from the performance log since the last call"""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return []
+        if not isinstance(entries, list):
+            return []
+        
+        pdf_urls = []
+        for entry in entries:
+            message = entry.get('message', '')
+            # Cheap check first; most entries are other network events
+            if 'Network.responseReceived' not in message:
+                continue
+            try:
+                logged = json.loads(message)
+                event = logged['message']
+                if event['method'] != 'Network.responseReceived':
+                    continue
+                response = event['params']['response']
+            except (ValueError, KeyError, TypeError):
+                continue
+            
+            response_url = response.get('url', '')
+            if response.get('mimeType') == 'application/pdf' or _is_pdf_url_path(response_url):
+                pdf_urls.append((logged.get('webview') or '', response_url))
+        return pdf_urls
+        
+    def _collect_pdf_links_batched(self) -> Optional[List[str]]:
+        """Find and reveal PDF links with a single async script, or None if it fails"""
+        try:
+            result = self._run_page_script(_BATCH_PDF_LINKS_SCRIPT, asynchronous=True)
+        except Exception as e:
+            logger.debug(f"Batched PDF link script failed: {e}")
+            return None
+        
+        if not isinstance(result, list):
+            return None
+        return [link for link in result if isinstance(link, str) and link]
+        
     def _find_existing_pdf_links(self) -> List[str]:
         """Find PDF links that are already visible on the page"""
+        # Helpers call this after every click and modal; when the click
+        # changed nothing, one script call replaces the selector queries
+        try:
+            page_url = self.driver.current_url
+            cached_links = self._pdf_link_cache.get(page_url)
+            if cached_links is not None and self._run_page_script(_DOM_CHANGED_SCRIPT) is False:
+                return list(cached_links)
+        except Exception as e:
+            logger.debug(f"PDF link cache check failed: {e}")
+            page_url = None
+        
         pdf_links = []
         
         try:
-            # Look for direct PDF links
-            pdf_selectors = [
-                'a[href$=".pdf"]',
-                'a[href*=".pdf"]',
-                'a[download*=".pdf"]',
-                'a:contains("PDF")',
-                'a:contains("Download")',
-                'a[title*="PDF"]',
-                'a[title*="Download"]'
-            ]
-            
-            for selector in pdf_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector.replace(':contains', '[text*='))
-                    for element in elements:
-                        href = element.get_attribute('href')
-                        if href and ('.pdf' in href.lower() or 'download' in href.lower()):
-                            pdf_links.append(href)
-                except:
-                    continue
+            # Look for direct PDF links with one query for all selectors
+            hrefs = self._run_page_script(_LINK_HREFS_SCRIPT, PDF_LINK_CSS) or []
+            pdf_links = _filter_pdf_hrefs(hrefs)
                     
         except Exception as e:
             logger.debug(f"Error finding existing PDF links: {e}")
+        
+        if isinstance(page_url, str):
+            # Start watching for DOM changes from this lookup onwards
+            try:
+                self._run_page_script(_DOM_CHANGED_SCRIPT)
+                self._pdf_link_cache[page_url] = list(pdf_links)
+            except Exception as e:
+                logger.debug(f"Could not watch page for changes: {e}")
             
         return pdf_links
         
-    def _click_interactive_elements(self) -> List[str]:
-        """Click on elements that might reveal PDF download links"""
+    def _click_interactive_elements(self, elements: Optional[List[WebElement]] = None) -> List[str]:
+        """Click on elements that might reveal PDF download links
+        
+        Callers that already hold the elements pass them in; otherwise
+        they are looked up with the common reveal selectors.
+        """
         pdf_links = []
         
-        # Common selectors for elements that might reveal PDFs
-        clickable_selectors = [
-            'button:contains("Download")',
-            'button:contains("PDF")',
-            'button:contains("View")',
-            'button:contains("Show")',
-            'a:contains("More")',
-            'a:contains("View All")',
-            'a:contains("Show All")',
-            '.download-btn',
-            '.pdf-btn',
-            '.view-more',
-            '.show-all'
-        ]
+        if elements is None:
+            elements = self._find_clickable_elements()
         
-        for selector in clickable_selectors:
+        for element in elements:
+            # Click, wait for the page to settle and diff its links in one
+            # script run, instead of a click plus a separate link scan
             try:
-                # Convert :contains to xpath for Selenium
-                if ':contains' in selector:
-                    text = selector.split(':contains("')[1].split('")')[0]
-                    tag = selector.split(':contains')[0]
-                    xpath = f"//{tag}[contains(text(), '{text}')]"
-                    elements = self.driver.find_elements(By.XPATH, xpath)
-                else:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                for element in elements[:3]:  # Limit to first 3 elements
-                    try:
-                        # Scroll element into view
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                        time.sleep(0.5)
-                        
-                        # Try to click the element
-                        element.click()
-                        time.sleep(2)  # Wait for content to load
-                        
-                        # Look for new PDF links after clicking
-                        new_links = self._find_existing_pdf_links()
-                        pdf_links.extend(new_links)
-                        
-                    except (ElementClickInterceptedException, NoSuchElementException):
-                        # Try JavaScript click if regular click fails
-                        try:
-                            self.driver.execute_script("arguments[0].click();", element)
-                            time.sleep(2)
-                            new_links = self._find_existing_pdf_links()
-                            pdf_links.extend(new_links)
-                        except:
-                            continue
-                    except Exception as e:
-                        logger.debug(f"Error clicking element: {e}")
-                        continue
-                        
+                new_links = self._run_page_script(_CLICK_AND_COLLECT_SCRIPT, element, PDF_LINK_CSS, asynchronous=True)
             except Exception as e:
-                logger.debug(f"Error with selector {selector}: {e}")
+                logger.debug(f"Error clicking element: {e}")
                 continue
+            
+            if isinstance(new_links, list):
+                pdf_links.extend(link for link in new_links if isinstance(link, str) and link)
                 
         return pdf_links
         
+    def _find_clickable_elements(self) -> List[WebElement]:
+        """Find elements that might reveal PDF download links"""
+        # All selectors run in one page script, keeping the first three
+        # new matches of each
+        try:
+            elements = self._run_page_script(
+                _CLICKABLE_ELEMENTS_SCRIPT, self.INTERACTIVE_TEXT_TARGETS, self.INTERACTIVE_SELECTORS, 3
+            )
+        except Exception as e:
+            logger.debug(f"Error finding clickable elements: {e}")
+            return []
+        return elements if isinstance(elements, list) else []
+        
     def _execute_pdf_reveal_scripts(self) -> List[str]:
         """Execute JavaScript to reveal hidden PDF URLs"""
         pdf_links = []
@@ -248,67 +783,26 @@ class BrowserHandler:
         """Handle forms and modal dialogs that might contain PDF links"""
         pdf_links = []
         
+        # Modals, checkboxes and submit buttons are all handled in one
+        # script run instead of a WebDriver call per element
         try:
-            # Look for and handle common modal triggers
-            modal_triggers = [
-                'button[data-toggle="modal"]',
-                'a[data-toggle="modal"]',
-                '.modal-trigger',
-                '.popup-trigger'
-            ]
-            
-            for selector in modal_triggers:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements[:2]:  # Limit to first 2 modals
-                        try:
-                            element.click()
-                            time.sleep(2)
-                            
-                            # Look for PDF links in the modal
-                            modal_links = self._find_existing_pdf_links()
-                            pdf_links.extend(modal_links)
-                            
-                            # Close modal if possible
-                            close_buttons = self.driver.find_elements(By.CSS_SELECTOR, '.close, .modal-close, [data-dismiss="modal"]')
-                            if close_buttons:
-                                close_buttons[0].click()
-                                time.sleep(1)
-                                
-                        except Exception as e:
-                            logger.debug(f"Error handling modal: {e}")
-                            continue
-                            
-                except Exception as e:
-                    logger.debug(f"Error with modal selector {selector}: {e}")
-                    continue
-            
-            # Handle simple forms (like terms acceptance)
-            forms = self.driver.find_elements(By.TAG_NAME, 'form')
-            for form in forms[:2]:  # Limit to first 2 forms
-                try:
-                    # Look for checkboxes (terms acceptance)
-                    checkboxes = form.find_elements(By.CSS_SELECTOR, 'input[type="checkbox"]')
-                    for checkbox in checkboxes:
-                        if not checkbox.is_selected():
-                            checkbox.click()
-                    
-                    # Look for submit buttons
-                    submit_buttons = form.find_elements(By.CSS_SELECTOR, 'input[type="submit"], button[type="submit"], .submit-btn')
-                    if submit_buttons:
-                        submit_buttons[0].click()
-                        time.sleep(3)
-                        
-                        # Look for PDF links after form submission
-                        form_links = self._find_existing_pdf_links()
-                        pdf_links.extend(form_links)
-                        
-                except Exception as e:
-                    logger.debug(f"Error handling form: {e}")
-                    continue
-                    
+            result = self._run_page_script(_FORMS_AND_MODALS_SCRIPT, PDF_LINK_CSS, asynchronous=True)
         except Exception as e:
             logger.debug(f"Error handling forms and modals: {e}")
+            return pdf_links
+        
+        if not isinstance(result, dict):
+            return pdf_links
+        pdf_links.extend(link for link in result.get('links') or [] if isinstance(link, str) and link)
+        
+        if result.get('submitted'):
+            # Look for PDF links after form submission
+            try:
+                with self._no_implicit_wait():
+                    self.wait.until(_page_loaded)
+            except Exception as e:
+                logger.debug(f"Page did not finish loading after form submission: {e}")
+            pdf_links.extend(self._find_existing_pdf_links())
             
         return pdf_links
         
@@ -331,8 +825,15 @@ class BrowserHandler:
             self.start_browser()
             
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            # Poll every 100ms rather than WebDriverWait's default 500ms
+            wait = self._waits.get(timeout)
+            if wait is None:
+                wait = self._waits[timeout] = WebDriverWait(
+                    self.driver, timeout, poll_frequency=0.1,
+                    ignored_exceptions=(NoSuchElementException,)
+                )
+            with self._no_implicit_wait():
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
             return True
         except TimeoutException:
             logger.debug(f"Element {selector} not found within {timeout} seconds")
@@ -341,15 +842,316 @@ class BrowserHandler:
             logger.error(f"Error waiting for element {selector}: {e}")
             return False
             
+    def _register_page_helpers(self):
+        """Inject the page scripts into every document this driver loads"""
+        self._page_helpers_registered = False
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _PAGE_HELPERS_JS})
+            self._page_helpers_registered = True
+        except Exception as e:
+            logger.debug(f"Could not register page scripts, sending them in full: {e}")
+    
+    def _run_page_script(self, script: str, *args, asynchronous: bool = False) -> Any:
+        """Run one of the page scripts, through its registered helper when available"""
+        execute = self.driver.execute_async_script if asynchronous else self.driver.execute_script
+        if not self._page_helpers_registered:
+            return execute(script, *args)
+        try:
+            return execute(_PAGE_HELPER_CALLS[script], *args)
+        except JavascriptException:
+            # The page replaced window.__hkpdf, or the document predates
+            # the registration
+            return execute(script, *args)
+    
+    def _remember_chrome_paths(self, options: Options):
+        """Keep the driver and browser paths Selenium resolved for later starts"""
+        driver_path = getattr(getattr(self.driver, 'service', None), 'path', None)
+        browser_path = getattr(options, 'binary_location', '')
+        if _CHROME_PATHS or not isinstance(driver_path, str) or not driver_path:
+            return
+        _CHROME_PATHS.update(
+            driver=driver_path,
+            browser=browser_path if isinstance(browser_path, str) and not self.cdp_endpoint else '',
+        )
+    
+    def set_implicit_wait(self, seconds: float):
+        """Set the driver's implicit wait for element lookups"""
+        if not self.driver:
+            self.start_browser()
+        self.driver.implicitly_wait(seconds)
+        self._implicit_wait = seconds
+    
+    @contextmanager
+    def _no_implicit_wait(self) -> Iterator[None]:
+        """Turn the implicit wait off for the duration of an explicit wait"""
+        # Otherwise every poll of the explicit wait can block for the whole
+        # implicit timeout before reporting a missing element
+        previous = self._implicit_wait
+        if previous:
+            self.driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            if previous:
+                self.driver.implicitly_wait(previous)
+    
+    def _configure_connection_pool(self):
+        """Enlarge the urllib3 pool used for WebDriver commands"""
+        # webdriver.Chrome doesn't accept a client_config, so the driver's
+        # connection manager is rebuilt from its config with the new maxsize
+        executor = getattr(self.driver, 'command_executor', None)
+        client_config = getattr(executor, 'client_config', None)
+        if (not self.pool_size or ClientConfig is None
+                or not isinstance(client_config, ClientConfig) or not client_config.keep_alive):
+            return
+        
+        # This goes through the executor's private connection attributes,
+        # so any change to them in a Selenium upgrade leaves the default pool
+        try:
+            client_config.init_args_for_pool_manager = {
+                "init_args_for_pool_manager": {"maxsize": self.pool_size}
+            }
+            previous_manager = executor._conn
+            executor._conn = executor._get_connection_manager()
+            previous_manager.clear()
+        except Exception as e:
+            logger.debug(f"Keeping the default WebDriver connection pool: {e}")
+            return
+        logger.debug(f"WebDriver connection pool size set to {self.pool_size}")
+    
+    def is_alive(self) -> bool:
+        """Whether the browser session still answers commands
+        
+        A handler whose browser hasn't been started yet counts as alive,
+        since it starts one on first use.
+        """
+        if not self.driver:
+            return True
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+    
+    def _raise_if_session_lost(self, error: Exception):
+        """Re-raise a page error as a WebDriverException if it killed the browser session
+        
+        Page-level failures (a timeout, a broken script) are logged and the
+        page skipped, but a dead session would fail every later page too, so
+        it is raised for the pool to discard this handler.
+        """
+        if self.is_alive():
+            return
+        if isinstance(error, WebDriverException):
+            raise error
+        raise WebDriverException(f"Browser session lost: {error}") from error
+    
     def close_browser(self):
         """Clean up browser resources"""
         if self.driver:
             try:
                 logger.info("Closing browser instance...")
+                if self.cdp_endpoint:
+                    # Close this handler's tab; the shared browser keeps running
+                    self.driver.close()
                 self.driver.quit()
                 logger.info("Browser closed successfully")
             except Exception as e:
                 logger.error(f"Error closing browser: {e}")
             finally:
                 self.driver = None
-                self.wait = None
\ No newline at end of file
+                self.wait = None
+                self._waits = {}
+                _release_profile(self._profile)
+                self._profile = None
+
+
+def launch_shared_chrome(port: int = 9222, headless: bool = True,
+                         user_data_dir: Optional[str] = None,
+                         startup_timeout: float = 15.0) -> Tuple[str, subprocess.Popen]:
+    """Launch one Chrome that several BrowserHandlers can attach to
+    
+    Each attached handler (BrowserHandler(cdp_endpoint=...)) opens its own
+    tab, so extra workers cost a tab instead of a whole browser process.
+    Returns the DevTools endpoint and the Chrome process, which the caller
+    terminates when done.
+    """
+    executable = os.environ.get('CHROME_EXECUTABLE_PATH') or next(
+        (path for path in map(shutil.which, _CHROME_EXECUTABLES) if path), None
+    )
+    if not executable:
+        raise WebDriverException("Chrome executable not found")
+    
+    command = [
+        executable,
+        f'--remote-debugging-port={port}',
+        f'--user-data-dir={user_data_dir or os.path.join(DEFAULT_USER_DATA_DIR, "shared")}',
+        *CHROME_ARGUMENTS,
+    ]
+    if headless:
+        command.append('--headless')
+    
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    endpoint = f"127.0.0.1:{port}"
+    
+    # Wait until the DevTools endpoint answers
+    deadline = time.monotonic() + startup_timeout
+    while True:
+        try:
+            with urlopen(f"http://{endpoint}/json/version", timeout=1):
+                break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise WebDriverException(f"Shared Chrome did not start on port {port}")
+            time.sleep(0.1)
+    
+    logger.info(f"Shared browser listening at {endpoint}")
+    return endpoint, process
+
+
+class BrowserPool:
+    """Pool of browser handlers shared by crawler threads
+    
+    Each handler drives its own browser, started on first use and kept warm
+    between pages. A handler is closed and replaced after max_uses pages, as
+    soon as its WebDriver fails, or when its browser is found dead on checkout.
+    """
+    
+    def __init__(self, size: int = 1, max_uses: int = 50,
+                 factory: Optional[Callable[[], BrowserHandler]] = None):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.factory = factory or (lambda: BrowserHandler(headless=True))
+        
+        # Idle handlers, most recently used first so warm browsers get reused
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._uses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        
+        # Handlers checked out; waiters are woken whenever a slot frees up
+        self._checked_out = 0
+        self._slot_freed = threading.Condition()
+        
+    def acquire(self) -> BrowserHandler:
+        """Check out a handler, waiting while all of them are in use"""
+        with self._slot_freed:
+            self._slot_freed.wait_for(lambda: self._checked_out < self.size)
+            self._checked_out += 1
+        
+        # Idle browsers may have crashed since they were returned
+        handler = self._take_live_idle()
+        if handler is not None:
+            return handler
+        
+        try:
+            handler = self.factory()
+        except Exception:
+            self._free_slot()
+            raise
+        with self._lock:
+            self._uses[id(handler)] = 0
+        return handler
+        
+    def release(self, handler: BrowserHandler, discard: bool = False):
+        """Return a handler to the pool, closing it if it failed or is worn out"""
+        with self._lock:
+            uses = self._uses.get(id(handler), 0) + 1
+            retire = discard or uses >= self.max_uses
+            if retire:
+                self._uses.pop(id(handler), None)
+            else:
+                self._uses[id(handler)] = uses
+        
+        try:
+            if retire:
+                self._close_handler(handler)
+            else:
+                self._idle.put(handler)
+        finally:
+            self._free_slot()
+            
+    def _take_live_idle(self) -> Optional[BrowserHandler]:
+        """Take an idle handler whose browser still responds, closing dead ones"""
+        while True:
+            try:
+                handler = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if handler.is_alive():
+                return handler
+            logger.warning("Discarding pooled browser whose session has died")
+            with self._lock:
+                self._uses.pop(id(handler), None)
+            self._close_handler(handler)
+    
+    def _free_slot(self):
+        with self._slot_freed:
+            self._checked_out -= 1
+            self._slot_freed.notify_all()
+            
+    def wait_healthy(self, timeout: Optional[float] = None) -> bool:
+        """Wait until a live handler is ready to be checked out, e.g. after a failed one
+        
+        Waits for a free slot, closes idle handlers whose browser has died
+        and, if no live one is left, starts a replacement browser so the
+        next checkout gets a working one. Returns False if no slot freed up
+        within timeout seconds or the replacement browser failed to start.
+        """
+        with self._slot_freed:
+            if not self._slot_freed.wait_for(lambda: self._checked_out < self.size, timeout):
+                return False
+            self._checked_out += 1
+        
+        handler = None
+        try:
+            handler = self._take_live_idle()
+            if handler is None:
+                handler = self.factory()
+                with self._lock:
+                    self._uses[id(handler)] = 0
+                if not handler.driver:
+                    handler.start_browser()
+            self._idle.put(handler)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not start a replacement browser: {e}")
+            if handler is not None:
+                with self._lock:
+                    self._uses.pop(id(handler), None)
+                self._close_handler(handler)
+            return False
+        finally:
+            self._free_slot()
+            
+    @contextmanager
+    def handler(self) -> Iterator[BrowserHandler]:
+        """Check out a handler for the duration of a with-block"""
+        handler = self.acquire()
+        discard = False
+        try:
+            yield handler
+        except WebDriverException:
+            discard = True
+            raise
+        finally:
+            self.release(handler, discard=discard)
+            
+    def _close_handler(self, handler: BrowserHandler):
+        try:
+            handler.close_browser()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+            
+    def close(self) -> int:
+        """Close every idle handler, returning how many were closed"""
+        closed = 0
+        while True:
+            try:
+                handler = self._idle.get_nowait()
+            except queue.Empty:
+                return closed
+            with self._lock:
+                self._uses.pop(id(handler), None)
+            self._close_handler(handler)
+            closed += 1
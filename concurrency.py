@@ -9,8 +9,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 import time
 import logging
-from typing import List
-from urllib.parse import urlparse
+from typing import List, Optional
+from urllib.parse import urlsplit
 
 from models import DownloadResult
 
@@ -34,26 +34,44 @@ class SimpleConcurrency:
         """
         Download PDFs with simple thread pool and rate limiting.
         
+        Duplicate URLs are downloaded once.
+        
         Args:
             pdf_urls: List of PDF URLs to download
             department: Department name for organization
             downloader: FileDownloader instance to use for actual downloads
             
         Returns:
-            List of DownloadResult objects
+            List of DownloadResult objects, one per unique URL in input order
         """
         if not pdf_urls:
             return []
-            
-        results = []
+        
+        # The same PDF is often linked from several index pages; download
+        # it once instead of spending a worker, a rate-limit slot and a
+        # request on each copy
+        unique_urls = list(dict.fromkeys(pdf_urls))
+        if len(unique_urls) < len(pdf_urls):
+            logging.debug(f"Skipping {len(pdf_urls) - len(unique_urls)} duplicate PDF URLs for {department}")
+        pdf_urls = unique_urls
+        
+        results_by_url = {}
         
         logging.info(f"Starting concurrent download of {len(pdf_urls)} PDFs for {department} with {self.max_workers} workers")
         
+        # Split each URL's host out once up front and create every domain's
+        # lock in a single pass, so workers only look them up
+        url_domains = [(url, urlsplit(url).netloc) for url in pdf_urls]
+        with self._lock:
+            for _, domain in url_domains:
+                if domain not in self.domain_locks:
+                    self.domain_locks[domain] = threading.Lock()
+        
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # Submit all download tasks
             future_to_url = {
-                executor.submit(self.download_with_rate_limit, url, department, downloader): url 
-                for url in pdf_urls
+                executor.submit(self.download_with_rate_limit, url, department, downloader, domain): url 
+                for url, domain in url_domains
             }
             
             # Collect results as they complete
@@ -64,7 +82,7 @@ class SimpleConcurrency:
                 
                 try:
                     result = future.result()
-                    results.append(result)
+                    results_by_url[url] = result
                     
                     status = "Success" if result.success else "Failed"
                     if result.error:
@@ -75,12 +93,14 @@ class SimpleConcurrency:
                         
                 except Exception as e:
                     logging.error(f"[{completed_count}/{len(pdf_urls)}] Unexpected error downloading {url}: {e}")
-                    results.append(DownloadResult(url=url, success=False, error=str(e)))
-                    
+                    results_by_url[url] = DownloadResult(url=url, success=False, error=str(e))
+        
+        results = [results_by_url[url] for url in pdf_urls]
         logging.info(f"Completed concurrent download for {department}: {sum(1 for r in results if r.success)}/{len(results)} successful")
         return results
     
-    def download_with_rate_limit(self, url: str, department: str, downloader) -> DownloadResult:
+    def download_with_rate_limit(self, url: str, department: str, downloader,
+                                 domain: Optional[str] = None) -> DownloadResult:
         """
         Download with simple rate limiting per domain.
         
@@ -88,33 +108,38 @@ class SimpleConcurrency:
             url: URL to download
             department: Department name
             downloader: FileDownloader instance to use
+            domain: URL's host, if the caller has already split it out
             
         Returns:
             DownloadResult object
         """
-        domain = urlparse(url).netloc
-        
-        # Get or create domain lock (thread-safe)
-        with self._lock:
-            if domain not in self.domain_locks:
-                self.domain_locks[domain] = threading.Lock()
-        
-        domain_lock = self.domain_locks[domain]
-        
-        # Apply rate limiting per domain
+        if domain is None:
+            domain = urlsplit(url).netloc
+        
+        domain_lock = self.domain_locks.get(domain)
+        if domain_lock is None:
+            # Get or create domain lock (thread-safe)
+            with self._lock:
+                domain_lock = self.domain_locks.setdefault(domain, threading.Lock())
+        
+        # Reserve this request's start slot under the domain lock, then wait
+        # and download outside it: request starts to a domain stay at least
+        # 1 second apart, but same-domain downloads overlap instead of
+        # queueing behind each other for their whole duration
         with domain_lock:
-            # Ensure minimum delay between requests to same domain
+            now = time.monotonic()
+            start_at = now
             if domain in self.last_request_times:
-                elapsed = time.time() - self.last_request_times[domain]
-                if elapsed < 1.0:  # 1 second minimum delay
-                    sleep_time = 1.0 - elapsed
-                    logging.debug(f"Rate limiting: sleeping {sleep_time:.2f}s for domain {domain}")
-                    time.sleep(sleep_time)
-            
-            self.last_request_times[domain] = time.time()
-            
-            # Perform actual download with retry logic
-            return self._download_with_retry(url, department, downloader)
+                start_at = max(now, self.last_request_times[domain] + 1.0)  # 1 second minimum delay
+            self.last_request_times[domain] = start_at
+        
+        sleep_time = start_at - time.monotonic()
+        if sleep_time > 0:
+            logging.debug(f"Rate limiting: sleeping {sleep_time:.2f}s for domain {domain}")
+            time.sleep(sleep_time)
+        
+        # Perform actual download with retry logic
+        return self._download_with_retry(url, department, downloader)
     
     def _download_with_retry(self, url: str, department: str, downloader, max_retries: int = 3) -> DownloadResult:
         """
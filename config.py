@@ -11,6 +11,22 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from pathlib import Path
 
+# Departments crawled in parallel unless the caller asks otherwise
+DEFAULT_DEPARTMENT_WORKERS = 5
+
+# libyaml's C loader and dumper when PyYAML was built with it; the pure
+# Python versions produce the same results, only slower
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Markdown seed file patterns, compiled once and run over the whole file.
+# Department headers look like "## 1. Department Name (ABBR):"
+_DEPT_HEADER_RE = re.compile(
+    r'^[ \t]*##[ \t]+\d+\.[ \t]+(.+?)(?:[ \t]*\([^)\n]+\))?[ \t]*:[ \t]*$', re.M
+)
+_DEPT_KEY_STRIP_RE = re.compile(r'[^\w\s]')
+_URL_RE = re.compile(r'https?://[^\s\)]+')
+
 
 @dataclass
 class DepartmentConfig:
@@ -72,9 +88,26 @@ def load_config(config_path: str) -> CrawlConfig:
     if not config_file.exists():
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return load_config_from_string(f.read())
+
+
+def load_config_from_string(yaml_text: str) -> CrawlConfig:
+    """
+    Load configuration from YAML text already in memory.
+    
+    Args:
+        yaml_text: YAML configuration content
+        
+    Returns:
+        CrawlConfig object with loaded configuration
+        
+    Raises:
+        yaml.YAMLError: If YAML parsing fails
+        ValueError: If configuration is invalid
+    """
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        data = yaml.load(yaml_text, Loader=YAML_LOADER)
     except yaml.YAMLError as e:
         raise yaml.YAMLError(f"Failed to parse YAML configuration: {e}")
     
@@ -165,42 +198,44 @@ def create_config_from_markdown(markdown_path: str) -> CrawlConfig:
     except Exception as e:
         raise ValueError(f"Failed to read markdown file: {e}")
     
-    departments = {}
-    current_dept = None
-    current_dept_name = None
+    return create_config_from_markdown_string(content)
+
+
+def create_config_from_markdown_string(content: str) -> CrawlConfig:
+    """
+    Create default configuration from markdown text already in memory.
     
-    # Parse markdown structure to extract department names and URLs
-    lines = content.split('\n')
+    Args:
+        content: Markdown content with department headers and URLs
+        
+    Returns:
+        CrawlConfig object with parsed departments and default settings
+        
+    Raises:
+        ValueError: If no departments with URLs are found
+    """
+    departments = {}
     
-    for line in lines:
-        line = line.strip()
+    # Each department's URLs are the ones between its header and the next
+    headers = list(_DEPT_HEADER_RE.finditer(content))
+    for i, header in enumerate(headers):
+        dept_name = header.group(1).strip()
+        # Create department key from name (lowercase, replace spaces with underscores)
+        dept_key = _DEPT_KEY_STRIP_RE.sub('', dept_name.lower()).replace(' ', '_')
         
-        # Match department headers: ## 1. Department Name (ABBR):
-        dept_match = re.match(r'^##\s+\d+\.\s+(.+?)(?:\s*\([^)]+\))?\s*:\s*$', line)
-        if dept_match:
-            dept_name = dept_match.group(1).strip()
-            # Create department key from name (lowercase, replace spaces with underscores)
-            current_dept = re.sub(r'[^\w\s]', '', dept_name.lower()).replace(' ', '_')
-            current_dept_name = dept_name
-            
-            departments[current_dept] = DepartmentConfig(
-                name=dept_name,
-                seed_urls=[],
-                max_depth=3,
-                max_pages=500,
-                time_limit=1800
-            )
-            continue
+        block_end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+        # Clean up URLs (remove trailing punctuation), keeping first occurrences in order
+        seed_urls = dict.fromkeys(
+            url.rstrip('.,;') for url in _URL_RE.findall(content, header.end(), block_end)
+        )
         
-        # Match URL lines: 1. **Description**: https://...
-        if current_dept and line:
-            # Look for URLs in the line
-            url_matches = re.findall(r'https?://[^\s\)]+', line)
-            for url in url_matches:
-                # Clean up URL (remove trailing punctuation)
-                url = re.sub(r'[.,;]+$', '', url)
-                if url not in departments[current_dept].seed_urls:
-                    departments[current_dept].seed_urls.append(url)
+        departments[dept_key] = DepartmentConfig(
+            name=dept_name,
+            seed_urls=list(seed_urls),
+            max_depth=3,
+            max_pages=500,
+            time_limit=1800
+        )
     
     if not departments:
         raise ValueError("No departments found in markdown file")
@@ -264,4 +299,4 @@ def save_config_to_yaml(config: CrawlConfig, output_path: str) -> None:
     
     # Write to file
     with open(output_path, 'w', encoding='utf-8') as f:
-        yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False, indent=2)
\ No newline at end of file
+        yaml.dump(config_dict, f, Dumper=YAML_DUMPER, default_flow_style=False, sort_keys=False, indent=2)
\ No newline at end of file
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Shared pytest configuration for the HK PDF Crawler tests
+
+Loads the core crawler modules once per test process (or xdist worker),
+before any test file is collected, so every test file reuses them.
+"""
+
+import config  # noqa: F401
+import discovery  # noqa: F401
+import downloader  # noqa: F401
+import models  # noqa: F401
+import utils  # noqa: F401
@@ -10,13 +10,17 @@ from typing import List, Optional, Set
 import requests
 import time
 import logging
+import shutil
+import tempfile
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 
-from config import CrawlConfig, DepartmentConfig
+from config import CrawlConfig, DepartmentConfig, DEFAULT_DEPARTMENT_WORKERS
 from discovery import URLDiscovery
 from downloader import FileDownloader
-from browser import BrowserHandler
+from selenium.common.exceptions import WebDriverException
+from browser import BrowserHandler, BrowserPool
 from reporter import ProgressReporter
 from utils import handle_error, retry_with_backoff
 from models import (
@@ -24,14 +28,101 @@ from models import (
     DepartmentAnalysis, DryRunReport
 )
 
+# Seconds to wait for the browser pool to offer a replacement after a
+# browser fails
+BROWSER_RECOVERY_TIMEOUT = 30
+
+
+class DepartmentReportWriter:
+    """
+    Writes a department's success and failure reports as downloads complete
+    
+    Entries are spooled to temporary files and copied under the report
+    header on close(), so download results don't have to be kept in memory
+    until the department finishes.
+    """
+    
+    def __init__(self, department_name: str):
+        self.department_name = department_name
+        self.successful = 0
+        self.failed = 0
+        self._success_entries = None
+        self._failure_entries = None
+        
+    def add(self, result: DownloadResult) -> None:
+        """Record one download result"""
+        if result.success:
+            self.successful += 1
+            if self._success_entries is None:
+                self._success_entries = tempfile.TemporaryFile('w+', encoding='utf-8')
+            size_mb = result.file_size / (1024 * 1024) if result.file_size else 0
+            self._success_entries.write(
+                f"{self.successful:3d}. {result.url}\n"
+                f"     File: {result.file_path}\n"
+                f"     Size: {size_mb:.2f} MB\n\n"
+            )
+        else:
+            self.failed += 1
+            if self._failure_entries is None:
+                self._failure_entries = tempfile.TemporaryFile('w+', encoding='utf-8')
+            self._failure_entries.write(
+                f"{self.failed:3d}. {result.url}\n"
+                f"     Reason: {result.error or 'Unknown error'}\n\n"
+            )
+    
+    def close(self) -> None:
+        """Write the report files and print a summary to the console"""
+        logger = logging.getLogger(__name__)
+        
+        # Create safe filename from department name
+        safe_name = self.department_name.lower().replace(' ', '_').replace('(', '').replace(')', '')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        # Generate success report
+        if self._success_entries is not None:
+            success_file = f"{safe_name}_successful_downloads_{timestamp}.txt"
+            self._write_report(success_file, "SUCCESSFUL DOWNLOADS",
+                               f"{self.successful} PDFs", self._success_entries)
+            logger.info(f"📄 Success report saved: {success_file}")
+        
+        # Generate failure report
+        if self._failure_entries is not None:
+            failure_file = f"{safe_name}_failed_downloads_{timestamp}.txt"
+            self._write_report(failure_file, "FAILED DOWNLOADS",
+                               f"{self.failed} URLs", self._failure_entries)
+            logger.info(f"❌ Failure report saved: {failure_file}")
+        
+        # Print summary to console
+        print(f"\n📊 {self.department_name} Reports Generated:")
+        if self.successful:
+            print(f"  ✅ Successful: {self.successful} PDFs → {success_file}")
+        if self.failed:
+            print(f"  ❌ Failed: {self.failed} URLs → {failure_file}")
+    
+    def _write_report(self, filename: str, title: str, total: str, entries) -> None:
+        """Write a report header followed by the spooled entries"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(f"{title} - {self.department_name}\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Total: {total}\n")
+            f.write("=" * 80 + "\n\n")
+            
+            entries.seek(0)
+            shutil.copyfileobj(entries, f)
+        entries.close()
+
 
 class PDFCrawler:
     """Main PDF crawler class that orchestrates the crawling process"""
     
-    def __init__(self, config: CrawlConfig):
+    def __init__(self, config: CrawlConfig, workers: int = DEFAULT_DEPARTMENT_WORKERS,
+                 browser_pool: Optional[BrowserPool] = None):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
+        # Number of departments crawled in parallel
+        self.workers = max(1, workers)
+        
         # Initialize session with proper headers
         self.session = requests.Session()
         self.session.headers.update({
@@ -48,16 +139,22 @@ class PDFCrawler:
             config.storage, 
             config.settings.max_concurrent_downloads
         )
-        self.browser_handler = None  # Lazy initialization
+        # Browsers are started on first use and reused across departments;
+        # each WebDriver serves one page at a time
+        self.browser_pool = browser_pool or BrowserPool(factory=lambda: BrowserHandler(
+            headless=True, pool_size=config.settings.max_concurrent_downloads
+        ))
         self.progress_reporter = ProgressReporter()
         
         # Initialize discovery cache for incremental updates
-        from discovery_cache import DiscoveryCache
+        from discovery_cache import DiscoveryCache, AnalysisCache
         self.discovery_cache = DiscoveryCache()
+        self.analysis_cache = AnalysisCache()
         
         # Advanced features flags
         self.use_comprehensive_discovery = True
         self.use_incremental_updates = True
+        self.use_analysis_cache = True
         self.cache_max_age_hours = getattr(config.settings, 'cache_max_age_hours', 24)
         
         # State tracking
@@ -100,7 +197,7 @@ class PDFCrawler:
         total_pdfs_downloaded = 0
         
         # Use ThreadPoolExecutor for parallel department processing
-        max_parallel_departments = min(3, len(departments_to_crawl))  # Max 3 departments in parallel
+        max_parallel_departments = min(self.workers, len(departments_to_crawl))
         
         with ThreadPoolExecutor(max_workers=max_parallel_departments, thread_name_prefix="dept-crawler") as executor:
             # Submit all department crawling tasks
@@ -135,10 +232,10 @@ class PDFCrawler:
                         pdfs_failed=0,
                         pdfs_skipped=0,
                         total_size=0,
-                    duration=0,
-                    errors=[error_msg]
-                )
-                department_results.append(dept_result)
+                        duration=0,
+                        errors=[error_msg]
+                    )
+                    department_results.append(dept_result)
         
         # Calculate overall statistics
         total_duration = time.time() - start_time
@@ -155,9 +252,15 @@ class PDFCrawler:
         self.logger.info(f"Crawling completed in {total_duration/60:.2f} minutes. "
                         f"Downloaded {total_pdfs_downloaded}/{total_pdfs_found} PDFs ({success_rate:.1f}% success rate)")
         
+        # Write queued progress lines before the caller prints its report
+        self.progress_reporter.close()
+        
         # Clean up browser if used
         self._cleanup_browser()
         
+        # Persist buffered file registry updates
+        self.file_downloader.close()
+        
         return results
     
     def _crawl_department_wrapper(self, dept_key: str, dept_config: DepartmentConfig) -> DepartmentResults:
@@ -309,8 +412,13 @@ class PDFCrawler:
             
             self.progress_reporter.track_discovery(dept_config.name, urls_crawled, pdfs_found)
             
-            # Download PDFs if any were found
-            download_results = []
+            # Download PDFs if any were found. Each result is folded into the
+            # counters and department report as it arrives and then dropped,
+            # so memory doesn't grow with the number of PDFs
+            pdfs_downloaded = 0
+            pdfs_failed = 0
+            total_size = 0
+            department_report = DepartmentReportWriter(dept_config.name)
             if validated_pdf_urls:
                 self.logger.info(f"Starting download of {pdfs_found} PDFs for {dept_config.name}")
                 
@@ -322,13 +430,10 @@ class PDFCrawler:
                 try:
                     # Use incremental downloads if enabled
                     if self.use_incremental_updates:
-                        download_results = []
-                        for pdf_url in validated_pdf_urls:
-                            result = self.file_downloader.download_pdf_incremental(
-                                pdf_url, dept_config.name
-                            )
-                            download_results.append(result)
-                            self.progress_reporter.update_progress_bar(dept_config.name)
+                        download_results = (
+                            self.file_downloader.download_pdf_incremental(pdf_url, dept_config.name)
+                            for pdf_url in validated_pdf_urls
+                        )
                     else:
                         download_results = self.file_downloader.download_pdfs_batch(
                             validated_pdf_urls, dept_config.name
@@ -337,10 +442,14 @@ class PDFCrawler:
                     # Update progress bar as downloads complete
                     for result in download_results:
                         self.progress_reporter.update_progress_bar(dept_config.name)
+                        department_report.add(result)
                         
                         if result.success:
+                            pdfs_downloaded += 1
+                            total_size += result.file_size
                             self.progress_reporter.track_download(dept_config.name, True, result.file_size)
                         else:
+                            pdfs_failed += 1
                             self.progress_reporter.track_download(dept_config.name, False)
                             if result.error:
                                 errors.append(f"Download failed for {result.url}: {result.error}")
@@ -349,14 +458,11 @@ class PDFCrawler:
                     self.progress_reporter.close_progress_bar(dept_config.name)
             
             # Calculate statistics
-            pdfs_downloaded = sum(1 for r in download_results if r.success)
-            pdfs_failed = sum(1 for r in download_results if not r.success)
             pdfs_skipped = 0  # TODO: Implement skip tracking for existing files
-            total_size = sum(r.file_size for r in download_results if r.success)
             duration = time.time() - start_time
             
             # Generate detailed reports for this department
-            self._generate_department_reports(dept_config.name, download_results)
+            department_report.close()
             
             result = DepartmentResults(
                 department=dept_config.name,
@@ -409,8 +515,22 @@ class PDFCrawler:
         analyses = []
         
         for dept_key, dept_config in departments_to_analyze.items():
-            self.logger.info(f"Analyzing department: {dept_config.name}")
-            analysis = self._analyze_department(dept_config)
+            cache_key = self.analysis_cache.make_key(dept_config.name, dept_config.seed_urls)
+            analysis = None
+            if self.use_analysis_cache:
+                analysis = self.analysis_cache.get(cache_key, self.cache_max_age_hours)
+            
+            if analysis is not None:
+                self.logger.info(f"Using cached analysis for department: {dept_config.name}")
+            else:
+                self.logger.info(f"Analyzing department: {dept_config.name}")
+                analysis = self._analyze_department(dept_config)
+                
+                # Problems such as timeouts or rate limiting may be transient,
+                # so only clean analyses are reused by later dry-runs
+                if not analysis.issues:
+                    self.analysis_cache.put(cache_key, analysis)
+            
             analyses.append(analysis)
         
         # Generate overall report
@@ -453,67 +573,11 @@ class PDFCrawler:
         
         return report
     
-    def _generate_department_reports(self, department_name: str, download_results: List) -> None:
-        """
-        Generate detailed success and failure reports for a department
-        
-        Args:
-            department_name: Name of the department
-            download_results: List of DownloadResult objects
-        """
-        from datetime import datetime
-        
-        # Create safe filename from department name
-        safe_name = department_name.lower().replace(' ', '_').replace('(', '').replace(')', '')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # Separate successful and failed downloads
-        successful = [r for r in download_results if r.success]
-        failed = [r for r in download_results if not r.success]
-        
-        # Generate success report
-        if successful:
-            success_file = f"{safe_name}_successful_downloads_{timestamp}.txt"
-            with open(success_file, 'w', encoding='utf-8') as f:
-                f.write(f"SUCCESSFUL DOWNLOADS - {department_name}\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total: {len(successful)} PDFs\n")
-                f.write("=" * 80 + "\n\n")
-                
-                for i, result in enumerate(successful, 1):
-                    size_mb = result.file_size / (1024 * 1024) if result.file_size else 0
-                    f.write(f"{i:3d}. {result.url}\n")
-                    f.write(f"     File: {result.file_path}\n")
-                    f.write(f"     Size: {size_mb:.2f} MB\n\n")
-            
-            self.logger.info(f"📄 Success report saved: {success_file}")
-        
-        # Generate failure report
-        if failed:
-            failure_file = f"{safe_name}_failed_downloads_{timestamp}.txt"
-            with open(failure_file, 'w', encoding='utf-8') as f:
-                f.write(f"FAILED DOWNLOADS - {department_name}\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total: {len(failed)} URLs\n")
-                f.write("=" * 80 + "\n\n")
-                
-                for i, result in enumerate(failed, 1):
-                    f.write(f"{i:3d}. {result.url}\n")
-                    f.write(f"     Reason: {result.error or 'Unknown error'}\n\n")
-            
-            self.logger.info(f"❌ Failure report saved: {failure_file}")
-        
-        # Print summary to console
-        print(f"\n📊 {department_name} Reports Generated:")
-        if successful:
-            print(f"  ✅ Successful: {len(successful)} PDFs → {success_file}")
-        if failed:
-            print(f"  ❌ Failed: {len(failed)} URLs → {failure_file}")
-    
     def _get_departments_to_crawl(self, departments: Optional[List[str]]) -> dict:
         """Get dictionary of departments to crawl based on input filter"""
         if departments:
-            # Filter to specific departments
+            # Filter to specific departments, matching by key or name
+            departments = set(departments)
             return {
                 dept_key: dept_config 
                 for dept_key, dept_config in self.config.departments.items()
@@ -577,29 +641,35 @@ class PDFCrawler:
     
     def _try_browser_automation(self, url: str) -> List[str]:
         """Try browser automation to find PDFs on JavaScript-heavy pages"""
-        try:
-            if not self.browser_handler:
-                self.browser_handler = BrowserHandler(headless=True)
-            
-            self.logger.debug(f"Trying browser automation for {url}")
-            pdf_links = self.browser_handler.handle_interactive_page(url)
-            
-            if pdf_links:
-                self.logger.info(f"Browser automation found {len(pdf_links)} PDF links on {url}")
-            
-            return pdf_links
-            
-        except Exception as e:
-            self.logger.warning(f"Browser automation failed for {url}: {str(e)}")
-            return []
+        for attempt in range(2):
+            try:
+                with self.browser_pool.handler() as browser_handler:
+                    self.logger.debug(f"Trying browser automation for {url}")
+                    pdf_links = browser_handler.handle_interactive_page(url)
+                
+                if pdf_links:
+                    self.logger.info(f"Browser automation found {len(pdf_links)} PDF links on {url}")
+                
+                return pdf_links
+                
+            except WebDriverException as e:
+                # The pool has discarded the failed browser; retry as soon
+                # as it has a live replacement running rather than after a
+                # fixed delay
+                if attempt == 0 and self.browser_pool.wait_healthy(timeout=BROWSER_RECOVERY_TIMEOUT):
+                    self.logger.warning(f"Browser failed for {url}, retrying with a fresh browser: {str(e)}")
+                    continue
+                self.logger.warning(f"Browser automation failed for {url}: {str(e)}")
+                return []
+            except Exception as e:
+                self.logger.warning(f"Browser automation failed for {url}: {str(e)}")
+                return []
+        return []
     
     def _cleanup_browser(self):
         """Clean up browser resources"""
-        if self.browser_handler:
-            try:
-                self.browser_handler.close_browser()
+        try:
+            if self.browser_pool.close():
                 self.logger.info("Browser resources cleaned up")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up browser: {str(e)}")
-            finally:
-                self.browser_handler = None
\ No newline at end of file
+        except Exception as e:
+            self.logger.warning(f"Error cleaning up browser: {str(e)}")
\ No newline at end of file
@@ -4,171 +4,330 @@ Discovery Cache for Incremental Updates
 
 Tracks discovered URLs across crawl runs to enable delta updates.
 Only crawls new/changed content on subsequent runs.
+
+Both caches live in a single SQLite database opened in WAL mode, so each
+mutation is an indexed insert/update instead of a full-file rewrite and
+concurrent crawler processes can share the cache directory safely.
+
+Dry-run department analyses are cached separately as small JSON files, so
+repeated dry-runs over an unchanged configuration skip the network probes.
 """
 
 import json
+import logging
 import os
 import time
 import hashlib
+import sqlite3
+import threading
+from functools import lru_cache
+from dataclasses import asdict
 from typing import Dict, Set, List, Optional
 from datetime import datetime, timedelta
 
+from models import DepartmentAnalysis
+
+logger = logging.getLogger(__name__)
+
+# Keeps IN (...) queries below SQLite's bound-parameter limit
+_SQL_BATCH_SIZE = 500
+
+
+@lru_cache(maxsize=65536)
+def _url_hash(url: str) -> bytes:
+    """MD5 digest of a URL, memoized across cache calls"""
+    return hashlib.md5(url.encode()).digest()
+
 
 class DiscoveryCache:
     """Manages cache of discovered URLs for incremental updates"""
-    
+
     def __init__(self, cache_dir: str = "./cache"):
         self.cache_dir = cache_dir
+        self.db_file = os.path.join(cache_dir, "discovery_cache.db")
+
+        # Legacy JSON cache files, imported once into the database
         self.cache_file = os.path.join(cache_dir, "discovery_cache.json")
         self.url_cache_file = os.path.join(cache_dir, "url_discovery_cache.json")
-        
+
         # Ensure cache directory exists
         os.makedirs(cache_dir, exist_ok=True)
-        
-        # Load existing caches
-        self.pdf_cache = self._load_cache(self.cache_file)
-        self.url_cache = self._load_cache(self.url_cache_file)
-    
+
+        # Departments are crawled from a thread pool sharing this instance;
+        # other crawler processes are waited on for up to 30s instead of
+        # failing with "database is locked"
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        # Import caches written by older versions
+        self._import_legacy_caches()
+
+    def _create_tables(self):
+        """Create cache tables if they don't exist"""
+        # WITHOUT ROWID stores each entry once, clustered on its 16-byte
+        # hash, instead of a rowid table plus a separate primary key index
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS pdf_cache ("
+                "hash BLOB PRIMARY KEY, url TEXT, source TEXT, "
+                "discovered REAL, last_seen REAL) WITHOUT ROWID"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_cache ("
+                "hash BLOB PRIMARY KEY, url TEXT, last_crawled REAL, "
+                "pdf_count INTEGER, crawl_count INTEGER) WITHOUT ROWID"
+            )
+
+            # Age indexes let cleanup delete expired rows in age order
+            # without scanning the whole table
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS pdf_cache_last_seen ON pdf_cache(last_seen)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS page_cache_last_crawled ON page_cache(last_crawled)"
+            )
+
     def _load_cache(self, file_path: str) -> Dict:
-        """Load cache from file"""
+        """Load legacy JSON cache from file"""
         if os.path.exists(file_path):
             try:
                 with open(file_path, 'r') as f:
                     return json.load(f)
             except Exception as e:
-                print(f"Warning: Could not load cache {file_path}: {e}")
+                logger.warning("Could not load cache %s: %s", file_path, e)
         return {}
-    
-    def _save_cache(self, cache_data: Dict, file_path: str):
-        """Save cache to file"""
-        try:
-            with open(file_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving cache {file_path}: {e}")
-    
-    def _get_url_hash(self, url: str) -> str:
+
+    def _import_legacy_caches(self):
+        """Move entries from the old JSON cache files into the database"""
+        pdf_cache = self._load_cache(self.cache_file)
+        if pdf_cache:
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO pdf_cache VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (bytes.fromhex(key), entry.get('url'), entry.get('source_page'),
+                         entry.get('discovered_time', 0), entry.get('last_seen', 0))
+                        for key, entry in pdf_cache.items()
+                    ]
+                )
+
+        url_cache = self._load_cache(self.url_cache_file)
+        if url_cache:
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO page_cache VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (bytes.fromhex(key), entry.get('url'), entry.get('last_crawled', 0),
+                         entry.get('pdf_count', 0), entry.get('crawl_count', 0))
+                        for key, entry in url_cache.items()
+                    ]
+                )
+
+        for file_path in (self.cache_file, self.url_cache_file):
+            try:
+                os.replace(file_path, file_path + '.migrated')
+            except FileNotFoundError:
+                # Not present, or already migrated by a concurrent crawler
+                pass
+
+    def _get_url_hash(self, url: str) -> bytes:
         """Get hash for URL"""
-        return hashlib.md5(url.encode()).hexdigest()
-    
+        # The crawler looks each URL up and then records it (should_skip_page
+        # -> cache_page_crawl, get_new_pdfs_only -> cache_discovered_pdfs),
+        # so memoizing means each URL is hashed once per run
+        return _url_hash(url)
+
     def is_pdf_cached(self, pdf_url: str) -> bool:
         """Check if PDF URL was discovered in previous runs"""
         url_hash = self._get_url_hash(pdf_url)
-        return url_hash in self.pdf_cache
-    
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM pdf_cache WHERE hash = ? LIMIT 1", (url_hash,)
+            ).fetchone()
+        return row is not None
+
     def is_page_recently_crawled(self, page_url: str, max_age_hours: int = 24) -> bool:
         """Check if page was crawled recently"""
         url_hash = self._get_url_hash(page_url)
-        
-        if url_hash not in self.url_cache:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_crawled FROM page_cache WHERE hash = ?", (url_hash,)
+            ).fetchone()
+
+        if row is None:
             return False
-        
-        last_crawled = self.url_cache[url_hash].get('last_crawled', 0)
-        age_hours = (time.time() - last_crawled) / 3600
-        
+
+        age_hours = (time.time() - (row[0] or 0)) / 3600
+
         return age_hours < max_age_hours
-    
+
     def cache_discovered_pdfs(self, pdf_urls: List[str], source_page: str):
         """Cache discovered PDF URLs"""
+        if not pdf_urls:
+            return
+
         current_time = time.time()
-        
-        for pdf_url in pdf_urls:
-            url_hash = self._get_url_hash(pdf_url)
-            self.pdf_cache[url_hash] = {
-                'url': pdf_url,
-                'discovered_time': current_time,
-                'source_page': source_page,
-                'last_seen': current_time
-            }
-        
-        self._save_cache(self.pdf_cache, self.cache_file)
-    
+        get_url_hash = self._get_url_hash
+
+        # Rows are streamed from a generator straight into executemany,
+        # so bulk inserts don't build an intermediate list
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pdf_cache VALUES (?, ?, ?, ?, ?)",
+                ((get_url_hash(pdf_url), pdf_url, source_page, current_time, current_time)
+                 for pdf_url in pdf_urls)
+            )
+
     def cache_page_crawl(self, page_url: str, pdf_count: int):
         """Cache that a page was crawled"""
         url_hash = self._get_url_hash(page_url)
         current_time = time.time()
-        
-        self.url_cache[url_hash] = {
-            'url': page_url,
-            'last_crawled': current_time,
-            'pdf_count': pdf_count,
-            'crawl_count': self.url_cache.get(url_hash, {}).get('crawl_count', 0) + 1
-        }
-        
-        self._save_cache(self.url_cache, self.url_cache_file)
-    
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO page_cache VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(hash) DO UPDATE SET url = excluded.url, "
+                "last_crawled = excluded.last_crawled, pdf_count = excluded.pdf_count, "
+                "crawl_count = crawl_count + 1",
+                (url_hash, page_url, current_time, pdf_count)
+            )
+
     def get_new_pdfs_only(self, discovered_pdfs: List[str]) -> List[str]:
         """Filter to only new PDFs not seen before"""
-        new_pdfs = []
-        
-        for pdf_url in discovered_pdfs:
-            if not self.is_pdf_cached(pdf_url):
-                new_pdfs.append(pdf_url)
-            else:
-                # Update last_seen time for existing PDFs
-                url_hash = self._get_url_hash(pdf_url)
-                if url_hash in self.pdf_cache:
-                    self.pdf_cache[url_hash]['last_seen'] = time.time()
-        
-        # Save updated cache
-        if discovered_pdfs:  # Only save if we processed some PDFs
-            self._save_cache(self.pdf_cache, self.cache_file)
-        
-        return new_pdfs
-    
+        # Don't open a write transaction when there is nothing to check
+        if not discovered_pdfs:
+            return []
+
+        url_hashes = {pdf_url: self._get_url_hash(pdf_url) for pdf_url in discovered_pdfs}
+        hashes = list(set(url_hashes.values()))
+        cached_hashes = set()
+
+        with self._lock, self.conn:
+            # Batched membership queries instead of one lookup per URL
+            for i in range(0, len(hashes), _SQL_BATCH_SIZE):
+                batch = hashes[i:i + _SQL_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                cached_hashes.update(
+                    row[0] for row in self.conn.execute(
+                        f"SELECT hash FROM pdf_cache WHERE hash IN ({placeholders})", batch
+                    )
+                )
+
+            # Update last_seen time for existing PDFs
+            current_time = time.time()
+            self.conn.executemany(
+                "UPDATE pdf_cache SET last_seen = ? WHERE hash = ?",
+                ((current_time, url_hash) for url_hash in cached_hashes)
+            )
+
+        return [pdf_url for pdf_url in discovered_pdfs if url_hashes[pdf_url] not in cached_hashes]
+
     def should_skip_page(self, page_url: str, max_age_hours: int = 24) -> bool:
         """Determine if page should be skipped based on cache"""
         return self.is_page_recently_crawled(page_url, max_age_hours)
-    
+
     def get_cache_stats(self) -> Dict:
         """Get statistics about cached data"""
         current_time = time.time()
-        
-        # PDF cache stats
-        total_pdfs = len(self.pdf_cache)
-        recent_pdfs = sum(1 for entry in self.pdf_cache.values() 
-                         if (current_time - entry.get('last_seen', 0)) < 86400)  # 24 hours
-        
-        # URL cache stats
-        total_pages = len(self.url_cache)
-        recent_pages = sum(1 for entry in self.url_cache.values()
-                          if (current_time - entry.get('last_crawled', 0)) < 86400)
-        
+        recent_cutoff = current_time - 86400  # 24 hours
+
+        # One aggregate pass per table instead of separate count/min scans
+        with self._lock:
+            total_pdfs, recent_pdfs, oldest_pdf = self.conn.execute(
+                "SELECT COUNT(*), COUNT(CASE WHEN last_seen > ? THEN 1 END), MIN(discovered) "
+                "FROM pdf_cache", (recent_cutoff,)
+            ).fetchone()
+            total_pages, recent_pages = self.conn.execute(
+                "SELECT COUNT(*), COUNT(CASE WHEN last_crawled > ? THEN 1 END) "
+                "FROM page_cache", (recent_cutoff,)
+            ).fetchone()
+
         return {
             'total_cached_pdfs': total_pdfs,
             'recent_pdfs': recent_pdfs,
             'total_cached_pages': total_pages,
             'recent_pages': recent_pages,
-            'cache_age_hours': (current_time - min([entry.get('discovered_time', current_time) 
-                                                   for entry in self.pdf_cache.values()], 
-                                                  default=current_time)) / 3600
+            'cache_age_hours': (current_time - (oldest_pdf if oldest_pdf is not None else current_time)) / 3600
         }
-    
+
     def cleanup_old_entries(self, max_age_days: int = 30):
         """Remove old cache entries"""
-        current_time = time.time()
-        max_age_seconds = max_age_days * 24 * 3600
-        
-        # Clean PDF cache
-        old_pdf_keys = [
-            key for key, entry in self.pdf_cache.items()
-            if (current_time - entry.get('last_seen', 0)) > max_age_seconds
-        ]
-        
-        for key in old_pdf_keys:
-            del self.pdf_cache[key]
-        
-        # Clean URL cache
-        old_url_keys = [
-            key for key, entry in self.url_cache.items()
-            if (current_time - entry.get('last_crawled', 0)) > max_age_seconds
-        ]
-        
-        for key in old_url_keys:
-            del self.url_cache[key]
-        
-        # Save cleaned caches
-        self._save_cache(self.pdf_cache, self.cache_file)
-        self._save_cache(self.url_cache, self.url_cache_file)
-        
-        return len(old_pdf_keys), len(old_url_keys)
+        cutoff = time.time() - max_age_days * 24 * 3600
+
+        with self._lock, self.conn:
+            old_pdfs = self.conn.execute(
+                "DELETE FROM pdf_cache WHERE last_seen < ?", (cutoff,)
+            ).rowcount
+            old_urls = self.conn.execute(
+                "DELETE FROM page_cache WHERE last_crawled < ?", (cutoff,)
+            ).rowcount
+
+        return old_pdfs, old_urls
+
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            self.conn.close()
+
+
+class AnalysisCache:
+    """Caches dry-run department analyses, keyed by department and seed URLs"""
+
+    def __init__(self, cache_dir: str = "./cache"):
+        self.cache_dir = os.path.join(cache_dir, "analysis")
+
+    @staticmethod
+    def make_key(department: str, seed_urls: List[str]) -> str:
+        """Cache key that changes whenever the department's seed URLs do"""
+        content = department + "\n" + "\n".join(sorted(seed_urls))
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str, max_age_hours: int = 24) -> Optional[DepartmentAnalysis]:
+        """Get a cached analysis, or None if missing, unreadable or expired"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry['cached_time'] >= max_age_hours * 3600:
+                return None
+            return DepartmentAnalysis(**entry['analysis'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Could not load cached analysis %s: %s", key, e)
+            return None
+
+    def put(self, key: str, analysis: DepartmentAnalysis):
+        """Cache an analysis; a failed write is logged, never raised"""
+        entry = {'cached_time': time.time(), 'analysis': asdict(analysis)}
+
+        # Write to a temporary file first so concurrent readers never see
+        # a partially written entry
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not cache analysis %s: %s", key, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        """Remove all cached analyses, returning how many were removed"""
+        removed = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+        return removed
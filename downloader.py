@@ -5,17 +5,23 @@ This module handles downloading PDF files and managing both local and S3 storage
 including file organization, validation, and error handling.
 """
 
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Union, BinaryIO
+import io
 import os
 import re
 import time
 import logging
 import hashlib
-import json
+import queue
+import tempfile
+import threading
 from pathlib import Path
 from urllib.parse import urlparse, unquote
-from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 import requests
 from requests.adapters import HTTPAdapter
@@ -24,7 +30,92 @@ from urllib3.util.retry import Retry
 from config import StorageConfig
 from models import DownloadResult
 from concurrency import SimpleConcurrency
-from utils import retry_with_backoff
+from file_registry import FileRegistry
+from utils import retry_with_backoff, is_government_domain
+
+# Streaming read size for PDF downloads. Larger chunks cut the number of
+# Python-level iterations through urllib3; each in-flight download holds
+# roughly this much (~128 KB) of read buffer per worker.
+DOWNLOAD_CHUNK_SIZE = 128 * 1024
+
+# Write buffer for saved PDFs; coalesces several download chunks per
+# write syscall instead of Python's default 8 KiB buffer
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Files at least this large are dropped from the page cache once written,
+# so a few big PDFs don't evict pages the crawler is still using
+PAGE_CACHE_DROP_THRESHOLD = 16 * 1024 * 1024
+
+# Files above this size are uploaded to S3 as parallel multipart uploads
+MULTIPART_THRESHOLD = 5 * 1024 * 1024
+
+# Background S3 uploader threads, and how many saved files may wait for them
+S3_UPLOAD_WORKERS = 5
+S3_UPLOAD_QUEUE_SIZE = 16
+
+# Socket write size for request bodies; the library defaults (8-16 KiB)
+# make upload threads hand the GIL back and forth for every small send
+HTTP_BLOCKSIZE = 1024 * 1024
+
+
+def _raise_http_blocksize(blocksize: int = HTTP_BLOCKSIZE) -> None:
+    """Raise the default HTTPConnection write block size used by boto3 uploads"""
+    try:
+        import http.client
+        import urllib3.connection
+        
+        # botocore connections are urllib3 HTTPConnections underneath
+        kwdefaults = urllib3.connection.HTTPConnection.__init__.__kwdefaults__
+        if kwdefaults and kwdefaults.get('blocksize', blocksize) < blocksize:
+            kwdefaults['blocksize'] = blocksize
+        
+        defaults = http.client.HTTPConnection.__init__.__defaults__
+        if defaults:
+            http.client.HTTPConnection.__init__.__defaults__ = tuple(
+                blocksize if value == 8192 else value for value in defaults
+            )
+    except (ImportError, AttributeError, TypeError) as e:
+        logging.debug(f"Could not raise HTTP block size: {e}")
+
+
+_raise_http_blocksize()
+
+# Filename/directory cleaning patterns, compiled once
+_INVALID_NAME_CHARS = re.compile(r'[^\w\s-]')
+_SEPARATOR_RUNS = re.compile(r'[-\s]+')
+
+
+# Deletes the ASCII characters _INVALID_NAME_CHARS matches, so ASCII names
+# (nearly all URL-derived ones) are cleaned in one C-level pass
+_NAME_TRANSLATION = str.maketrans(
+    {c: None for c in map(chr, range(128)) if _INVALID_NAME_CHARS.match(c)}
+)
+
+
+def _clean_name(name: str) -> str:
+    """Strip characters that aren't safe in file names and join words with '-'"""
+    if name.isascii():
+        return '-'.join(name.translate(_NAME_TRANSLATION).replace('-', ' ').split())
+    return _SEPARATOR_RUNS.sub('-', _INVALID_NAME_CHARS.sub('', name)).strip('-')
+
+
+@lru_cache(maxsize=256)
+def _clean_department_dir(department: str) -> str:
+    """Directory/key component for a department; there are only a few, so cache them"""
+    return _clean_name(department)
+
+
+def _open_for_write(file_path: str):
+    """
+    Open a file for buffered binary writing, creating its directory only
+    when it is missing. Nearly every file lands in an existing department
+    directory, so trying the open first skips a mkdir/stat per file.
+    """
+    try:
+        return open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE)
 
 
 class FileDownloader:
@@ -37,17 +128,43 @@ class FileDownloader:
         # Initialize concurrent downloader
         self.concurrency = SimpleConcurrency(max_workers=max_concurrent_downloads)
         
-        # Initialize S3 upload executor for parallel uploads
-        self.s3_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="s3-upload")
+        # Persistent S3 uploader threads fed through a bounded queue; when
+        # S3 falls behind, a full queue blocks downloads instead of letting
+        # pending uploads pile up
+        self._s3_queue = queue.Queue(maxsize=S3_UPLOAD_QUEUE_SIZE)
+        self._s3_workers: List[threading.Thread] = []
+        self._s3_workers_lock = threading.Lock()
+        
+        # Multipart settings for large uploads; parts are sent in parallel
+        self.s3_transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=8,
+            use_threads=True
+        )
+        
+        # Existing S3 keys per department prefix, listed once per batch
+        self._s3_existing_keys: Dict[str, Set[str]] = {}
+        
+        # Local file sizes per department directory, scanned once per batch
+        self._local_snapshot: Dict[str, Dict[str, int]] = {}
         
         # Initialize file tracking for incremental updates
-        self.file_registry_path = os.path.join(config.local_path, '.file_registry.json')
-        self.file_registry = self._load_file_registry()
+        self.file_registry_path = os.path.join(config.local_path, '.file_registry.db')
+        self.file_registry = FileRegistry(
+            self.file_registry_path,
+            legacy_json_file=os.path.join(config.local_path, '.file_registry.json')
+        )
         
         # Initialize S3 client if enabled
         if config.s3_enabled:
             try:
-                self.s3_client = boto3.client('s3')
+                # Enough pooled connections for every upload worker and its
+                # multipart threads, kept alive between uploads
+                self.s3_client = boto3.client('s3', config=BotoConfig(
+                    max_pool_connections=max(32, S3_UPLOAD_WORKERS * 2),
+                    tcp_keepalive=True
+                ))
                 # Test S3 connection if bucket is specified
                 if config.s3_bucket:
                     self.s3_client.head_bucket(Bucket=config.s3_bucket)
@@ -56,16 +173,45 @@ class FileDownloader:
                 logging.warning(f"S3 initialization failed: {e}. S3 uploads will be disabled.")
                 self.s3_client = None
         
-        # Setup requests session with retry strategy
-        self.session = requests.Session()
+        # Setup requests adapter with retry strategy
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Pool sized for the download workers, S3 threads and the many
+        # gov.hk hosts, so TCP/TLS connections are reused instead of
+        # being discarded when the default 10-connection pool is full
+        self._adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=max(64, max_concurrent_downloads),
+            max_retries=retry_strategy,
+            pool_block=False
+        )
+        
+        # Sessions are created per download thread, see the session property
+        self._thread_local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """
+        The calling thread's requests session.
+        
+        Session cookies and redirect state aren't safe to share between
+        download threads, so each thread gets its own Session. They are all
+        mounted on the same adapter, so TCP/TLS connections to a host are
+        still pooled and reused across threads.
+        """
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            
+            # Default headers set once instead of on every request
+            session.headers.update({'User-Agent': 'HK-PDF-Crawler/1.0'})
+            self._thread_local.session = session
+        return session
         
     def download_pdf(self, url: str, department: str) -> DownloadResult:
         """
@@ -84,8 +230,9 @@ class FileDownloader:
             local_path = self._get_local_path(filename, department)
             s3_key = self._get_s3_key(filename, department) if self.config.s3_enabled else None
             
-            # Check if file already exists
-            if self.file_exists(local_path, department):
+            # Check if file already exists; S3 is only consulted through the
+            # batch listing, never with a per-file HeadObject
+            if self.file_exists(local_path, department, force_s3_check=False):
                 logging.info(f"File already exists, skipping: {filename}")
                 return DownloadResult(
                     url=url,
@@ -94,67 +241,50 @@ class FileDownloader:
                     file_size=os.path.getsize(local_path) if os.path.exists(local_path) else 0
                 )
             
-            # Validate PDF URL with HEAD request
-            if not self._validate_pdf_url(url):
-                return DownloadResult(
-                    url=url,
-                    success=False,
-                    error="URL does not point to a valid PDF file"
-                )
-            
             # Download the file with streaming
             logging.info(f"Downloading PDF: {url}")
-            response = self.session.get(
-                url, 
-                stream=True, 
-                timeout=30,
-                headers={'User-Agent': 'HK-PDF-Crawler/1.0'}
-            )
+            response = self.session.get(url, stream=True, timeout=30)
             response.raise_for_status()
             
-            # Read content and validate
-            content = b''
-            file_size = 0
-            
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    content += chunk
-                    file_size += len(chunk)
-            
-            # Validate PDF content
-            if not self.validate_pdf_content(content):
+            # Validate from the GET headers before reading the body, instead
+            # of a separate HEAD round-trip
+            if not self._is_pdf_response(url, response.headers):
+                response.close()
                 return DownloadResult(
                     url=url,
                     success=False,
-                    error="Downloaded content is not a valid PDF file"
+                    error="URL does not point to a valid PDF file"
                 )
             
-            # Save locally if configured
-            local_saved = True
-            if not self.config.s3_enabled or self.config.local_path:
-                local_saved = self.save_locally(content, local_path)
-                if not local_saved:
-                    return DownloadResult(
-                        url=url,
-                        success=False,
-                        error="Failed to save file locally"
-                    )
+            # Stream straight to disk; S3-only mode spools to a temp file
+            store_locally = not self.config.s3_enabled or bool(self.config.local_path)
+            target_path = local_path if store_locally else self._make_spool_path()
+            
+            # A queued S3 upload reads the file straight back, so keep it cached
+            uploading = bool(self.config.s3_enabled and self.s3_client)
+            saved = self._stream_to_file(response, url, target_path, drop_cache=not uploading)
+            if not saved.success:
+                return saved
+            file_size = saved.file_size
             
             # Upload to S3 if configured (async)
             s3_saved = True
             if self.config.s3_enabled and self.s3_client and s3_key:
-                # Submit S3 upload to thread pool for parallel processing
-                self.s3_executor.submit(self._async_upload_to_s3, content, s3_key, filename)
+                # Hand the upload to the S3 uploader threads
+                self._queue_s3_upload(target_path, s3_key, filename, not store_locally)
+            elif not store_locally:
+                os.remove(target_path)
             
-            success = local_saved or s3_saved
-            final_path = local_path if local_saved else f"s3://{self.config.s3_bucket}/{s3_key}"
+            success = store_locally or s3_saved
+            final_path = local_path if store_locally else f"s3://{self.config.s3_bucket}/{s3_key}"
             
             logging.info(f"Successfully downloaded: {filename} ({file_size} bytes)")
             return DownloadResult(
                 url=url,
                 success=success,
                 file_path=final_path,
-                file_size=file_size
+                file_size=file_size,
+                file_hash=saved.file_hash
             )
             
         except requests.exceptions.RequestException as e:
@@ -188,6 +318,11 @@ class FileDownloader:
         
         logging.info(f"Starting batch download of {len(pdf_urls)} PDFs for {department}")
         
+        # One directory scan and one paginated listing instead of a stat
+        # and a HeadObject per file
+        self._snapshot_local(department)
+        self._prefetch_s3_keys(department)
+        
         # Use concurrent downloader with rate limiting
         results = self.concurrency.download_pdfs_concurrently(pdf_urls, department, self)
         
@@ -205,19 +340,18 @@ class FileDownloader:
         Save file to local storage with directory creation.
         
         Args:
-            content: File content as bytes
+            content: File content as bytes or bytearray
             file_path: Full path where to save the file
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Create directory if it doesn't exist
-            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            # Write file
-            with open(file_path, 'wb') as f:
+            # Write file, creating the directory if it doesn't exist
+            with _open_for_write(file_path) as f:
                 f.write(content)
+                if len(content) >= PAGE_CACHE_DROP_THRESHOLD:
+                    self._drop_page_cache(f)
             
             logging.debug(f"Saved locally: {file_path}")
             return True
@@ -226,6 +360,121 @@ class FileDownloader:
             logging.error(f"Failed to save file locally {file_path}: {e}")
             return False
     
+    def _stream_to_file(self, response, url: str, file_path: str,
+                        drop_cache: bool = True) -> DownloadResult:
+        """
+        Stream a response body to disk and validate it as a PDF.
+        
+        The body is written chunk by chunk to a '.part' sibling and only
+        renamed into place once it validates, so a download never holds the
+        whole file in memory or leaves a partial PDF behind. The SHA-256 is
+        computed from the same chunks as they arrive.
+        
+        Args:
+            response: Streaming response to read from
+            url: Source URL of the file
+            file_path: Final path for the file
+            drop_cache: Drop a large file from the page cache once written;
+                        off when the file is about to be read back for upload
+            
+        Returns:
+            DownloadResult with the saved size and hash, or the error that stopped it
+        """
+        part_path = file_path + '.part'
+        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        
+        # Check the PDF magic number on the first bytes, so an HTML error
+        # page isn't downloaded in full (or written to disk) before it fails
+        head = b''
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= 5:
+                break
+        
+        if not head.startswith(b'%PDF-'):
+            response.close()
+            logging.warning(f"Response body is not a PDF (header {head[:8]!r}): {url}")
+            return DownloadResult(
+                url=url,
+                success=False,
+                error="Downloaded content is not a valid PDF file"
+            )
+        
+        try:
+            part_file = _open_for_write(part_path)
+        except OSError as e:
+            logging.error(f"Failed to save file locally {file_path}: {e}")
+            return DownloadResult(
+                url=url,
+                success=False,
+                error="Failed to save file locally"
+            )
+        
+        try:
+            part_file.write(head)
+            sha256 = hashlib.sha256(head)
+            file_size = len(head)
+            with part_file:
+                for chunk in chunks:
+                    if chunk:
+                        part_file.write(chunk)
+                        sha256.update(chunk)
+                        file_size += len(chunk)
+                
+                if drop_cache and file_size >= PAGE_CACHE_DROP_THRESHOLD:
+                    self._drop_page_cache(part_file)
+            
+            # Validate PDF content
+            if not self.validate_pdf_content(part_path):
+                os.remove(part_path)
+                return DownloadResult(
+                    url=url,
+                    success=False,
+                    error="Downloaded content is not a valid PDF file"
+                )
+            
+            os.replace(part_path, file_path)
+            
+            # Keep the department snapshot current for later existence checks
+            snapshot = self._local_snapshot.get(os.path.dirname(file_path))
+            if snapshot is not None:
+                snapshot[os.path.basename(file_path)] = file_size
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        
+        logging.debug(f"Saved locally: {file_path}")
+        return DownloadResult(
+            url=url,
+            success=True,
+            file_path=file_path,
+            file_size=file_size,
+            file_hash=sha256.hexdigest()
+        )
+    
+    def _drop_page_cache(self, f) -> None:
+        """
+        Advise the kernel that a just-written file won't be read again soon.
+        
+        DONTNEED only evicts clean pages, so the data is synced to disk first;
+        otherwise the dirty pages from the write are left in the cache.
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            f.flush()
+            getattr(os, 'fdatasync', os.fsync)(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError as e:
+            logging.debug(f"posix_fadvise failed: {e}")
+    
+    def _make_spool_path(self) -> str:
+        """Create a temporary file to hold a download that is only stored in S3"""
+        fd, spool_path = tempfile.mkstemp(prefix='hk-pdf-', suffix='.pdf')
+        os.close(fd)
+        return spool_path
+    
     def _check_file_size_limit(self, response, url: str) -> Optional[DownloadResult]:
         """
         Check if file size exceeds limit and return error result if so
@@ -245,36 +494,102 @@ class FileDownloader:
                 )
         return None
     
-    def upload_to_s3(self, content: bytes, s3_key: str) -> bool:
+    def upload_to_s3(self, content: Union[bytes, BinaryIO], s3_key: str) -> bool:
         """
         Upload file to S3 with error handling and retries.
         
+        Files larger than MULTIPART_THRESHOLD go through the transfer
+        manager as a multipart upload; smaller ones use a single PUT.
+        
         Args:
-            content: File content as bytes
+            content: File content as bytes, or a binary file opened for reading
             s3_key: S3 object key
             
         Returns:
             True if successful, False otherwise
         """
-        if not self.s3_client or not self.config.s3_bucket:
-            logging.warning("S3 client not available or bucket not configured")
-            return False
+        is_file = hasattr(content, 'read')
+        size = os.fstat(content.fileno()).st_size if is_file else len(content)
         
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
+        def upload(metadata):
+            if is_file:
+                content.seek(0)
+            
+            if size > MULTIPART_THRESHOLD:
+                self.s3_client.upload_fileobj(
+                    content if is_file else io.BytesIO(content),
+                    self.config.s3_bucket,
+                    s3_key,
+                    ExtraArgs={'ContentType': 'application/pdf', 'Metadata': metadata},
+                    Config=self.s3_transfer_config
+                )
+            else:
                 self.s3_client.put_object(
                     Bucket=self.config.s3_bucket,
                     Key=s3_key,
                     Body=content,
                     ContentType='application/pdf',
-                    Metadata={
-                        'source': 'hk-pdf-crawler',
-                        'upload_time': str(int(time.time()))
-                    }
+                    Metadata=metadata
                 )
+        
+        return self._upload_with_retries(upload, s3_key)
+    
+    def upload_file_to_s3(self, local_path: str, s3_key: str) -> bool:
+        """
+        Upload a file on disk to S3 with error handling and retries.
+        
+        The transfer manager reads the file itself (in parallel parts above
+        MULTIPART_THRESHOLD), so its content is never held in memory.
+        
+        Args:
+            local_path: Path of the file to upload
+            s3_key: S3 object key
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        def upload(metadata):
+            self.s3_client.upload_file(
+                local_path,
+                self.config.s3_bucket,
+                s3_key,
+                ExtraArgs={'ContentType': 'application/pdf', 'Metadata': metadata},
+                Config=self.s3_transfer_config
+            )
+        
+        return self._upload_with_retries(upload, s3_key)
+    
+    def _upload_with_retries(self, upload, s3_key: str) -> bool:
+        """
+        Run an upload callable, retrying transient S3 errors.
+        
+        Args:
+            upload: Callable taking the object metadata and performing the upload
+            s3_key: S3 object key
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.s3_client or not self.config.s3_bucket:
+            logging.warning("S3 client not available or bucket not configured")
+            return False
+        
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                metadata = {
+                    'source': 'hk-pdf-crawler',
+                    'upload_time': str(int(time.time()))
+                }
+                
+                upload(metadata)
                 
                 logging.debug(f"Uploaded to S3: s3://{self.config.s3_bucket}/{s3_key}")
+                
+                # Keep the prefetched listing current for later existence checks
+                existing_keys = self._s3_existing_keys.get(self._s3_key_prefix(s3_key))
+                if existing_keys is not None:
+                    existing_keys.add(s3_key)
                 return True
                 
             except ClientError as e:
@@ -283,6 +598,15 @@ class FileDownloader:
                     logging.error(f"S3 error {error_code}: {e}")
                     return False
                 
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt
+                    logging.warning(f"S3 upload attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                    time.sleep(wait_time)
+                else:
+                    logging.error(f"S3 upload failed after {max_retries} attempts: {e}")
+                    return False
+            except S3UploadFailedError as e:
+                # Multipart failures are reported by the transfer manager
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt
                     logging.warning(f"S3 upload attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
@@ -298,16 +622,53 @@ class FileDownloader:
         logging.error("S3 upload failed: exhausted all retry attempts")
         return False
     
-    def _async_upload_to_s3(self, content: bytes, s3_key: str, filename: str) -> None:
+    def _queue_s3_upload(self, file_path: str, s3_key: str, filename: str,
+                         remove_after: bool = False) -> None:
         """
-        Async wrapper for S3 upload to be used with ThreadPoolExecutor
+        Queue a saved file for upload, starting the uploader threads on first use.
+        
+        Blocks while S3_UPLOAD_QUEUE_SIZE uploads are already waiting.
+        """
+        with self._s3_workers_lock:
+            if not self._s3_workers:
+                for i in range(S3_UPLOAD_WORKERS):
+                    worker = threading.Thread(
+                        target=self._s3_upload_worker, name=f"s3-upload-{i}", daemon=True
+                    )
+                    worker.start()
+                    self._s3_workers.append(worker)
+        
+        self._s3_queue.put((file_path, s3_key, filename, remove_after))
+    
+    def _s3_upload_worker(self) -> None:
+        """Upload queued files until a None sentinel is received"""
+        while True:
+            item = self._s3_queue.get()
+            try:
+                if item is None:
+                    return
+                self._async_upload_to_s3(*item)
+            finally:
+                self._s3_queue.task_done()
+    
+    def _async_upload_to_s3(self, file_path: str, s3_key: str, filename: str,
+                            remove_after: bool = False) -> None:
+        """
+        Async wrapper for S3 upload, run by the S3 uploader threads
+        
+        The file is uploaded straight from disk inside the worker, so
+        downloads don't keep their content in memory while the upload is
+        queued. Spooled files for S3-only storage are removed once uploaded.
         """
         try:
-            success = self.upload_to_s3(content, s3_key)
+            success = self.upload_file_to_s3(file_path, s3_key)
             if not success:
                 logging.warning(f"S3 upload failed for {filename}, but local save succeeded")
         except Exception as e:
             logging.error(f"Async S3 upload error for {filename}: {e}")
+        finally:
+            if remove_after and os.path.exists(file_path):
+                os.remove(file_path)
     
     def generate_filename(self, url: str, title: str = "") -> str:
         """
@@ -323,9 +684,7 @@ class FileDownloader:
         # Start with title if provided
         if title:
             # Clean title for filename
-            filename = re.sub(r'[^\w\s-]', '', title.strip())
-            filename = re.sub(r'[-\s]+', '-', filename)
-            filename = filename.strip('-')
+            filename = _clean_name(title.strip())
         else:
             # Extract filename from URL
             parsed_url = urlparse(url)
@@ -347,9 +706,7 @@ class FileDownloader:
             filename = os.path.splitext(filename)[0]
         
         # Clean filename
-        filename = re.sub(r'[^\w\s-]', '', filename)
-        filename = re.sub(r'[-\s]+', '-', filename)
-        filename = filename.strip('-')
+        filename = _clean_name(filename)
         
         # Ensure filename is not empty
         if not filename:
@@ -362,19 +719,26 @@ class FileDownloader:
         
         return filename
     
-    def file_exists(self, file_path: str, department: str) -> bool:
+    def file_exists(self, file_path: str, department: str, force_s3_check: bool = True) -> bool:
         """
         Check if file already exists locally or in S3.
         
         Args:
             file_path: Local file path to check
             department: Department name for S3 key generation
+            force_s3_check: Send a HeadObject when S3 hasn't been listed for
+                the department; when False only local files and prefetched
+                S3 listings are consulted
             
         Returns:
             True if file exists, False otherwise
         """
-        # Check local file
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        # Check local file, from the department snapshot when one was taken
+        snapshot = self._local_snapshot.get(os.path.dirname(file_path))
+        if snapshot is not None:
+            if snapshot.get(os.path.basename(file_path), 0) > 0:
+                return True
+        elif os.path.exists(file_path) and os.path.getsize(file_path) > 0:
             return True
         
         # Check S3 if enabled
@@ -382,6 +746,14 @@ class FileDownloader:
             filename = os.path.basename(file_path)
             s3_key = self._get_s3_key(filename, department)
             
+            # Answer from the department listing when it has been prefetched
+            existing_keys = self._s3_existing_keys.get(self._s3_key_prefix(s3_key))
+            if existing_keys is not None:
+                return s3_key in existing_keys
+            
+            if not force_s3_check:
+                return False
+            
             try:
                 self.s3_client.head_object(Bucket=self.config.s3_bucket, Key=s3_key)
                 return True
@@ -391,33 +763,143 @@ class FileDownloader:
         
         return False
     
-    def validate_pdf_content(self, content: bytes) -> bool:
+    def _snapshot_local(self, department: str) -> Dict[str, int]:
+        """
+        Record the sizes of a department's local files with one directory scan.
+        
+        file_exists then answers from this snapshot instead of two stat
+        calls per file.
+        
+        Args:
+            department: Department name for directory organization
+            
+        Returns:
+            Mapping of file name to size in bytes
+        """
+        dept_dir = os.path.dirname(self._get_local_path('placeholder.pdf', department))
+        snapshot = {}
+        
+        try:
+            with os.scandir(dept_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        snapshot[entry.name] = entry.stat().st_size
+        except FileNotFoundError:
+            # Nothing downloaded for this department yet
+            pass
+        except OSError as e:
+            logging.warning(f"Could not scan {dept_dir}: {e}")
+            return {}
+        
+        self._local_snapshot[dept_dir] = snapshot
+        return snapshot
+    
+    def _prefetch_s3_keys(self, department: str) -> None:
+        """
+        List a department's existing S3 objects in one paginated pass.
+        
+        file_exists then answers from this listing instead of sending a
+        HeadObject per file, so N checks cost ceil(N/1000) LIST calls.
+        
+        Args:
+            department: Department name for S3 key generation
+        """
+        if not (self.config.s3_enabled and self.s3_client and self.config.s3_bucket):
+            return
+        
+        prefix = self._s3_key_prefix(self._get_s3_key('placeholder.pdf', department))
+        if not prefix:
+            # Keys sit at the bucket root, so the listing would cover the
+            # whole bucket; keep the per-file HeadObject checks instead
+            return
+        
+        keys = set()
+        
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.config.s3_bucket, Prefix=prefix):
+                keys.update(obj['Key'] for obj in page.get('Contents', []))
+        except Exception as e:
+            # Fall back to per-file HeadObject checks
+            logging.warning(f"Could not list existing S3 objects for {department}: {e}")
+            return
+        
+        self._s3_existing_keys[prefix] = keys
+        logging.debug(f"Found {len(keys)} existing S3 objects under '{prefix}'")
+    
+    def _s3_key_prefix(self, s3_key: str) -> str:
+        """Directory part of an S3 key, including the trailing '/'"""
+        return s3_key[:s3_key.rfind('/') + 1]
+    
+    def validate_pdf_content(self, content: Union[bytes, bytearray, memoryview, str, os.PathLike]) -> bool:
         """
         Validate that downloaded content is actually a PDF.
         
+        Only the header and the last 1 KB are inspected, without copying
+        the content; a path is checked by reading just those parts of the file.
+        
         Args:
-            content: File content as bytes
+            content: File content as a bytes-like object, or a path to the file
             
         Returns:
             True if content appears to be a valid PDF, False otherwise
         """
+        if isinstance(content, (str, os.PathLike)):
+            return self._validate_pdf_file(content)
+        
         if not content:
             return False
         
         # Check PDF magic number
-        if not content.startswith(b'%PDF-'):
+        if content[:5] != b'%PDF-':
             return False
         
         # Check minimum size (PDFs should be at least 100 bytes, not 1KB)
-        if len(content) < 100:
+        size = len(content)
+        if size < 100:
             return False
         
         # Check for PDF trailer (optional - some PDFs may not have it at the end)
-        if b'%%EOF' not in content[-1024:]:
+        if isinstance(content, memoryview):
+            has_eof = content[-1024:].tobytes().find(b'%%EOF') != -1
+        else:
+            has_eof = content.find(b'%%EOF', max(size - 1024, 0)) != -1
+        if not has_eof:
             logging.debug("PDF content missing EOF marker at end, but proceeding")
         
         return True
     
+    def _validate_pdf_file(self, file_path: str) -> bool:
+        """
+        Validate a PDF on disk by reading only its header and trailer.
+        
+        Args:
+            file_path: Path of the file to check
+            
+        Returns:
+            True if the file appears to be a valid PDF, False otherwise
+        """
+        try:
+            file_size = os.path.getsize(file_path)
+            with open(file_path, 'rb') as f:
+                # Check PDF magic number
+                if f.read(5) != b'%PDF-':
+                    return False
+                
+                # Check minimum size (PDFs should be at least 100 bytes)
+                if file_size < 100:
+                    return False
+                
+                # Check for PDF trailer (optional - some PDFs may not have it at the end)
+                f.seek(max(file_size - 1024, 0))
+                if b'%%EOF' not in f.read():
+                    logging.debug("PDF content missing EOF marker at end, but proceeding")
+        except OSError as e:
+            logging.warning(f"Could not validate downloaded file {file_path}: {e}")
+            return False
+        
+        return True
+    
     def _validate_pdf_url(self, url: str) -> bool:
         """
         Validate PDF URL with HEAD request to check content-type.
@@ -428,47 +910,63 @@ class FileDownloader:
         Returns:
             True if URL points to a PDF, False otherwise
         """
+        lowered = url.lower()
+        
         # Skip HEAD validation for AWS signed URLs (they expire quickly)
         if 'X-Amz-Signature' in url or 'X-Amz-Algorithm' in url:
-            if url.lower().endswith('.pdf') or '.pdf?' in url.lower():
+            if lowered.endswith('.pdf') or '.pdf?' in lowered:
                 logging.info(f"Skipping HEAD validation for AWS signed URL: {url[:100]}...")
                 return True
         
+        # _is_pdf_response accepts a .pdf URL whatever its content-type, so
+        # for government sites the HEAD would only catch a bad status; the
+        # GET in download_pdf checks the status and %PDF- header anyway
+        if lowered.endswith('.pdf') and is_government_domain(url):
+            return True
+        
         try:
-            response = self.session.head(
-                url, 
-                timeout=10,
-                headers={'User-Agent': 'HK-PDF-Crawler/1.0'},
-                allow_redirects=True
-            )
+            response = self.session.head(url, timeout=10, allow_redirects=True)
             
             # Check status code
             if response.status_code != 200:
                 logging.warning(f"HEAD request failed for {url}: {response.status_code}")
                 return False  # Don't download if HEAD request fails
             
-            # Check content type
-            content_type = response.headers.get('content-type', '').lower()
-            if 'application/pdf' in content_type:
-                return True
-            
-            # Some servers don't set proper content-type, check URL pattern
-            if url.lower().endswith('.pdf'):
-                logging.info(f"URL ends with .pdf, assuming PDF: {url}")
-                return True
-            
-            # Check content-disposition for PDF filename
-            content_disposition = response.headers.get('content-disposition', '').lower()
-            if '.pdf' in content_disposition:
-                return True
-            
-            logging.warning(f"URL may not be a PDF (content-type: {content_type}): {url}")
-            return False  # Don't download non-PDF files
+            return self._is_pdf_response(url, response.headers)
             
         except Exception as e:
             logging.warning(f"HEAD request failed for {url}: {e}")
             return False  # Don't download if validation fails
     
+    def _is_pdf_response(self, url: str, headers) -> bool:
+        """
+        Check response headers (and URL) for signs that the body is a PDF.
+        
+        Args:
+            url: URL the response came from
+            headers: Response headers from a HEAD or GET request
+            
+        Returns:
+            True if the response looks like a PDF, False otherwise
+        """
+        # Check content type
+        content_type = headers.get('content-type', '').lower()
+        if 'application/pdf' in content_type:
+            return True
+        
+        # Some servers don't set proper content-type, check URL pattern
+        if url.lower().endswith('.pdf'):
+            logging.info(f"URL ends with .pdf, assuming PDF: {url}")
+            return True
+        
+        # Check content-disposition for PDF filename
+        content_disposition = headers.get('content-disposition', '').lower()
+        if '.pdf' in content_disposition:
+            return True
+        
+        logging.warning(f"URL may not be a PDF (content-type: {content_type}): {url}")
+        return False  # Don't download non-PDF files
+    
     def _get_local_path(self, filename: str, department: str) -> str:
         """
         Get local file path with department organization.
@@ -484,9 +982,7 @@ class FileDownloader:
         
         if self.config.organize_by_department:
             # Clean department name for directory
-            dept_dir = re.sub(r'[^\w\s-]', '', department)
-            dept_dir = re.sub(r'[-\s]+', '-', dept_dir).strip('-')
-            return str(base_path / dept_dir / filename)
+            return str(base_path / _clean_department_dir(department) / filename)
         else:
             return str(base_path / filename)
     
@@ -509,40 +1005,23 @@ class FileDownloader:
         
         # Add department if organizing by department
         if self.config.organize_by_department:
-            dept_dir = re.sub(r'[^\w\s-]', '', department)
-            dept_dir = re.sub(r'[-\s]+', '-', dept_dir).strip('-')
-            key_parts.append(dept_dir)
+            key_parts.append(_clean_department_dir(department))
         
         key_parts.append(filename)
         
         return '/'.join(key_parts)
     
-    def _load_file_registry(self) -> Dict:
-        """Load file registry for tracking downloaded files"""
-        if os.path.exists(self.file_registry_path):
-            try:
-                with open(self.file_registry_path, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logging.warning(f"Could not load file registry: {e}")
-        return {}
-    
-    def _save_file_registry(self):
-        """Save file registry to disk"""
-        try:
-            os.makedirs(os.path.dirname(self.file_registry_path), exist_ok=True)
-            with open(self.file_registry_path, 'w') as f:
-                json.dump(self.file_registry, f, indent=2)
-        except Exception as e:
-            logging.error(f"Could not save file registry: {e}")
-    
     def _get_file_hash(self, content: bytes) -> str:
         """Calculate SHA-256 hash of file content"""
         return hashlib.sha256(content).hexdigest()
     
-    def _get_url_hash(self, url: str) -> str:
-        """Calculate hash of URL for registry key"""
-        return hashlib.md5(url.encode()).hexdigest()
+    def _get_file_hash_from_path(self, file_path: str) -> str:
+        """Calculate SHA-256 hash of a file on disk without loading it whole"""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
     
     @retry_with_backoff(max_retries=3, base_delay=1.0)
     def _check_remote_file_modified(self, url: str) -> Optional[Dict]:
@@ -588,9 +1067,9 @@ class FileDownloader:
         if not os.path.exists(local_path):
             return True
         
-        # Check file registry for previous download info
-        url_hash = self._get_url_hash(url)
-        registry_entry = self.file_registry.get(url_hash)
+        # Check file registry for previous download info; entries are keyed
+        # by URL since str hashing is far cheaper than MD5 + hex per lookup
+        registry_entry = self.file_registry.get(url)
         
         if not registry_entry:
             # File exists but not in registry, check if we should re-download
@@ -610,7 +1089,9 @@ class FileDownloader:
         logging.debug(f"File unchanged, skipping: {url}")
         return False
     
-    def update_file_registry(self, url: str, local_path: str, content: bytes, remote_info: Dict = None):
+    def update_file_registry(self, url: str, local_path: str, content: Optional[bytes] = None,
+                             remote_info: Dict = None, file_hash: Optional[str] = None,
+                             file_size: Optional[int] = None):
         """
         Update file registry with download information
         
@@ -619,15 +1100,26 @@ class FileDownloader:
             local_path: Local path where file was saved
             content: File content for hash calculation
             remote_info: Remote file information from headers
+            file_hash: SHA-256 already computed while downloading
+            file_size: Size already known from downloading; read from the
+                       file when only the hash is given
         """
-        url_hash = self._get_url_hash(url)
+        if content is not None:
+            file_size = len(content)
+            file_hash = self._get_file_hash(content)
+        elif file_hash is None:
+            file_size = os.path.getsize(local_path)
+            file_hash = self._get_file_hash_from_path(local_path)
+        elif file_size is None:
+            # The entry replaces the whole row, so don't record a missing size
+            file_size = os.path.getsize(local_path)
         
         registry_entry = {
             'url': url,
             'local_path': local_path,
             'download_time': time.time(),
-            'file_size': len(content),
-            'file_hash': self._get_file_hash(content)
+            'file_size': file_size,
+            'file_hash': file_hash
         }
         
         if remote_info:
@@ -637,8 +1129,7 @@ class FileDownloader:
                 'content_length': remote_info.get('content_length')
             })
         
-        self.file_registry[url_hash] = registry_entry
-        self._save_file_registry()
+        self.file_registry[url] = registry_entry
     
     def download_pdf_incremental(self, url: str, department: str, force_update: bool = False) -> DownloadResult:
         """
@@ -657,26 +1148,23 @@ class FileDownloader:
             filename = self.generate_filename(url)
             local_path = self._get_local_path(filename, department)
             
-            # Check if we should download this file
-            if not self.should_download_file(url, local_path, force_update):
-                logging.info(f"File up to date, skipping: {filename}")
-                return DownloadResult(
-                    url=url,
-                    success=True,
-                    file_path=local_path,
-                    file_size=os.path.getsize(local_path) if os.path.exists(local_path) else 0
-                )
-            
-            # Get remote file info before downloading
-            remote_info = self._check_remote_file_modified(url)
+            # Previously downloaded files are re-fetched with a conditional
+            # GET, so an unchanged file costs one empty 304 response instead
+            # of HEAD requests before the download
+            headers = {}
+            registry_entry = None
+            if not force_update and os.path.exists(local_path):
+                registry_entry = self.file_registry.get(url)
             
-            # Validate PDF URL with HEAD request
-            if not self._validate_pdf_url(url):
-                return DownloadResult(
-                    url=url,
-                    success=False,
-                    error="URL does not point to a valid PDF file"
-                )
+            if registry_entry:
+                if registry_entry.get('etag'):
+                    headers['If-None-Match'] = registry_entry['etag']
+                if registry_entry.get('last_modified'):
+                    headers['If-Modified-Since'] = registry_entry['last_modified']
+                
+                # Without recorded validators, fall back to comparing HEAD info
+                if not headers and not self.should_download_file(url, local_path):
+                    return self._up_to_date_result(url, local_path, filename)
             
             # Download the file with streaming
             logging.info(f"Downloading PDF: {url}")
@@ -684,58 +1172,67 @@ class FileDownloader:
                 url, 
                 stream=True, 
                 timeout=30,
-                headers={'User-Agent': 'HK-PDF-Crawler/1.0'}
+                headers=headers
             )
-            response.raise_for_status()
             
-            # Read content and validate
-            content = b''
-            file_size = 0
+            if response.status_code == 304:
+                response.close()
+                return self._up_to_date_result(url, local_path, filename)
+            
+            response.raise_for_status()
             
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    content += chunk
-                    file_size += len(chunk)
+            remote_info = {
+                'last_modified': response.headers.get('Last-Modified'),
+                'etag': response.headers.get('ETag'),
+                'content_length': response.headers.get('Content-Length')
+            }
             
-            # Validate PDF content
-            if not self.validate_pdf_content(content):
+            # Validate from the GET headers before reading the body, instead
+            # of a separate HEAD round-trip
+            if not self._is_pdf_response(url, response.headers):
+                response.close()
                 return DownloadResult(
                     url=url,
                     success=False,
-                    error="Downloaded content is not a valid PDF file"
+                    error="URL does not point to a valid PDF file"
                 )
             
-            # Save locally if configured
-            local_saved = True
-            if not self.config.s3_enabled or self.config.local_path:
-                local_saved = self.save_locally(content, local_path)
-                if not local_saved:
-                    return DownloadResult(
-                        url=url,
-                        success=False,
-                        error="Failed to save file locally"
-                    )
+            # Stream straight to disk; S3-only mode spools to a temp file
+            store_locally = not self.config.s3_enabled or bool(self.config.local_path)
+            target_path = local_path if store_locally else self._make_spool_path()
+            
+            # A queued S3 upload reads the file straight back, so keep it cached
+            uploading = bool(self.config.s3_enabled and self.s3_client)
+            saved = self._stream_to_file(response, url, target_path, drop_cache=not uploading)
+            if not saved.success:
+                return saved
+            file_size = saved.file_size
+            
+            # Update file registry with the hash computed while streaming
+            self.update_file_registry(
+                url, local_path, remote_info=remote_info,
+                file_hash=saved.file_hash, file_size=file_size
+            )
             
             # Upload to S3 if configured (async)
             s3_saved = True
             s3_key = self._get_s3_key(filename, department) if self.config.s3_enabled else None
             if self.config.s3_enabled and self.s3_client and s3_key:
-                # Submit S3 upload to thread pool for parallel processing
-                self.s3_executor.submit(self._async_upload_to_s3, content, s3_key, filename)
+                # Hand the upload to the S3 uploader threads
+                self._queue_s3_upload(target_path, s3_key, filename, not store_locally)
+            elif not store_locally:
+                os.remove(target_path)
             
-            # Update file registry
-            if local_saved or s3_saved:
-                self.update_file_registry(url, local_path, content, remote_info)
-            
-            success = local_saved or s3_saved
-            final_path = local_path if local_saved else f"s3://{self.config.s3_bucket}/{s3_key}"
+            success = store_locally or s3_saved
+            final_path = local_path if store_locally else f"s3://{self.config.s3_bucket}/{s3_key}"
             
             logging.info(f"Successfully downloaded: {filename} ({file_size} bytes)")
             return DownloadResult(
                 url=url,
                 success=success,
                 file_path=final_path,
-                file_size=file_size
+                file_size=file_size,
+                file_hash=saved.file_hash
             )
             
         except requests.exceptions.RequestException as e:
@@ -753,16 +1250,36 @@ class FileDownloader:
                 error=f"Unexpected error: {str(e)}"
             )
     
+    def _up_to_date_result(self, url: str, local_path: str, filename: str) -> DownloadResult:
+        """Result for a previously downloaded file that hasn't changed"""
+        logging.info(f"File up to date, skipping: {filename}")
+        return DownloadResult(
+            url=url,
+            success=True,
+            file_path=local_path,
+            file_size=os.path.getsize(local_path) if os.path.exists(local_path) else 0
+        )
+    
+    def close(self):
+        """
+        Finish queued S3 uploads, write any buffered registry updates and
+        release the registry database and pooled connections
+        """
+        with self._s3_workers_lock:
+            for _ in self._s3_workers:
+                self._s3_queue.put(None)
+            for worker in self._s3_workers:
+                worker.join()
+            self._s3_workers = []
+        
+        self.file_registry.close()
+        self._adapter.close()
+    
     def get_registry_stats(self) -> Dict:
         """Get statistics from the file registry"""
-        if not self.file_registry:
+        stats = self.file_registry.get_stats()
+        if not stats['total_files']:
             return {'total_files': 0, 'total_size': 0}
         
-        total_files = len(self.file_registry)
-        total_size = sum(entry.get('file_size', 0) for entry in self.file_registry.values())
-        
-        return {
-            'total_files': total_files,
-            'total_size': total_size,
-            'total_size_mb': total_size / (1024 * 1024)
-        }
\ No newline at end of file
+        stats['total_size_mb'] = stats['total_size'] / (1024 * 1024)
+        return stats
\ No newline at end of file
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+File Registry for Incremental Downloads
+
+Records every downloaded file (local path, size, hash and the server's
+ETag/Last-Modified) so later runs can skip files that haven't changed.
+
+Entries live in a SQLite database opened in WAL mode, so recording a
+download is a single indexed upsert instead of rewriting the whole
+registry file after every PDF. Updates are buffered in memory and written
+by a background flusher in one transaction per batch.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Registry fields, in table column order
+_COLUMNS = (
+    'url', 'local_path', 'download_time', 'file_size', 'file_hash',
+    'last_modified', 'etag', 'content_length'
+)
+
+# Buffered updates are written after this many seconds or entries
+FLUSH_INTERVAL = 2.0
+FLUSH_BATCH_SIZE = 50
+
+
+# Registries that may still hold buffered entries
+_open_registries: "weakref.WeakSet[FileRegistry]" = weakref.WeakSet()
+
+
+def _close_at_exit():
+    """Write buffered entries of registries that were never closed"""
+    for registry in list(_open_registries):
+        registry.close()
+
+
+atexit.register(_close_at_exit)
+
+
+class FileRegistry:
+    """Persistent registry of downloaded files, keyed by URL"""
+
+    def __init__(self, db_file: str, legacy_json_file: Optional[str] = None,
+                 flush_interval: float = FLUSH_INTERVAL, flush_batch_size: int = FLUSH_BATCH_SIZE):
+        self.db_file = db_file
+        self.legacy_json_file = legacy_json_file
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+
+        # Download workers share this instance across threads
+        self._lock = threading.RLock()
+        self._conn = None
+
+        # Rows waiting for the background flusher, keyed by URL
+        self._pending: Dict[str, tuple] = {}
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Database connection, opened on first use so idle downloaders
+        don't create registry files"""
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+                conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                with conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS registry ("
+                        "url TEXT PRIMARY KEY, local_path TEXT, download_time REAL, "
+                        "file_size INTEGER, file_hash TEXT, last_modified TEXT, "
+                        "etag TEXT, content_length TEXT)"
+                    )
+                self._conn = conn
+
+                # Import the registry written by older versions
+                if self.legacy_json_file:
+                    self._import_legacy_registry(self.legacy_json_file)
+            return self._conn
+
+    def _import_legacy_registry(self, file_path: str):
+        """Move entries from the old JSON registry into the database"""
+        if not os.path.exists(file_path):
+            return
+
+        try:
+            with open(file_path, 'r') as f:
+                registry = json.load(f)
+        except Exception as e:
+            logger.warning("Could not load file registry %s: %s", file_path, e)
+            return
+
+        # Older registries were keyed by MD5 of the URL; re-key by URL
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO registry VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._row(entry.get('url', key), entry)
+                    for key, entry in registry.items()
+                )
+            )
+
+        try:
+            os.replace(file_path, file_path + '.migrated')
+        except FileNotFoundError:
+            # Already migrated by a concurrent crawler
+            pass
+
+    def _row(self, url: str, entry: Dict) -> tuple:
+        """Table row for a registry entry"""
+        return (url,) + tuple(entry.get(column) for column in _COLUMNS[1:])
+
+    def get(self, url: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        """Get the registry entry for a URL"""
+        with self._lock:
+            row = self._pending.get(url)
+            if row is None:
+                row = self.conn.execute(
+                    "SELECT * FROM registry WHERE url = ?", (url,)
+                ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else default
+
+    def __setitem__(self, url: str, entry: Dict):
+        """Record (or replace) the entry for a URL"""
+        with self._lock:
+            self._pending[url] = self._row(url, entry)
+
+            if len(self._pending) >= self.flush_batch_size:
+                self._flush_requested.set()
+
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="file-registry-flush", daemon=True
+                )
+                self._flusher.start()
+                _open_registries.add(self)
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._lock:
+            count, = self.conn.execute("SELECT COUNT(*) FROM registry").fetchone()
+        return count
+
+    def values(self) -> Iterator[Dict]:
+        """Iterate over all registry entries"""
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM registry").fetchall()
+        return (dict(zip(_COLUMNS, row)) for row in rows)
+
+    def get_stats(self) -> Dict:
+        """Get file count and total size from the registry"""
+        self.flush()
+        with self._lock:
+            total_files, total_size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM registry"
+            ).fetchone()
+        return {'total_files': total_files, 'total_size': total_size}
+
+    def _flush_loop(self):
+        """Write buffered entries every flush_interval seconds (or when a
+        batch fills up); exits once nothing is left to write"""
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Could not save file registry: %s", e)
+
+            with self._lock:
+                if not self._pending:
+                    self._flusher = None
+                    return
+
+    def flush(self):
+        """Write all buffered entries in a single transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = list(self._pending.values())
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO registry VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self._pending.clear()
+
+    def close(self):
+        """Flush buffered entries, stop the flusher and close the registry database"""
+        with self._lock:
+            self.flush()
+            flusher = self._flusher
+
+        # Wake the flusher so it sees the empty buffer and exits
+        if flusher is not None and flusher is not threading.current_thread():
+            self._flush_requested.set()
+            flusher.join()
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        _open_registries.discard(self)
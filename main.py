@@ -25,97 +25,62 @@ import sys
 from typing import List, Optional
 
 from utils import setup_logging
-from config import load_config, create_config_from_markdown
-from crawler import PDFCrawler
-from models import DryRunReport, CrawlResults
+from config import load_config, create_config_from_markdown, DEFAULT_DEPARTMENT_WORKERS
+from models import CrawlResults
 
-def print_dry_run_report(report: DryRunReport):
-    """Print comprehensive dry-run analysis report to console"""
-    print("\n" + "="*60)
-    print("DRY-RUN ANALYSIS RESULTS")
-    print("="*60)
-    
-    # Department-by-department analysis
-    for analysis in report.department_analyses:
-        print(f"\n📋 {analysis.department}:")
-        print(f"   Accessible URLs: {analysis.seed_urls_accessible}/{analysis.seed_urls_total}")
-        print(f"   Estimated PDFs: {analysis.estimated_pdfs}")
-        
-        # Status indicators
-        if analysis.requires_browser:
-            print(f"   ⚠️  Requires browser automation")
-        if analysis.rate_limit_detected:
-            print(f"   ⚠️  Rate limiting detected")
-        
-        # Issues
-        if analysis.issues:
-            print(f"   Issues found:")
-            for issue in analysis.issues:
-                print(f"     ❌ {issue}")
-        else:
-            print(f"   ✅ No issues detected")
-    
-    # Overall summary
-    print(f"\n" + "="*60)
-    print("OVERALL SUMMARY")
-    print("="*60)
-    print(f"Total Estimated PDFs: {report.total_estimated_pdfs}")
-    print(f"Estimated Duration: {report.estimated_duration/60:.1f} minutes")
-    
-    # Issues summary
-    if report.issues_found:
-        print(f"\nIssues Found ({len(report.issues_found)}):")
-        for issue in report.issues_found:
-            print(f"  ❌ {issue}")
-    else:
-        print(f"\n✅ No major issues detected")
-    
-    # Recommendations
-    if report.recommendations:
-        print(f"\nRecommendations ({len(report.recommendations)}):")
-        for rec in report.recommendations:
-            print(f"  💡 {rec}")
-    else:
-        print(f"\n✅ No specific recommendations")
+# Report separators and section banners
+SEP60 = "=" * 60
+CRAWL_RESULTS_BANNER = f"\n{SEP60}\nCRAWLING RESULTS\n{SEP60}"
+SUMMARY_BANNER = f"\n{SEP60}\nOVERALL SUMMARY\n{SEP60}"
+
+
+def __getattr__(name):
+    """Import the crawler on first use
     
-    print("\n" + "="*60)
+    PDFCrawler pulls in selenium, boto3 and the rest of the crawling stack,
+    which --help, argument errors and --test-advanced never need.
+    """
+    if name == 'PDFCrawler':
+        from crawler import PDFCrawler
+        return PDFCrawler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def print_final_report(results: CrawlResults):
     """Print comprehensive final crawling report to console"""
-    print("\n" + "="*60)
-    print("CRAWLING RESULTS")
-    print("="*60)
+    # Lines are collected and written at once rather than printed one by one
+    lines = []
+    lines.append(CRAWL_RESULTS_BANNER)
     
     # Department-by-department results
     for dept_result in results.departments:
-        print(f"\n📁 {dept_result.department}:")
-        print(f"   URLs Crawled: {dept_result.urls_crawled}")
-        print(f"   PDFs Found: {dept_result.pdfs_found}")
-        print(f"   PDFs Downloaded: {dept_result.pdfs_downloaded}")
-        print(f"   PDFs Failed: {dept_result.pdfs_failed}")
-        print(f"   PDFs Skipped: {dept_result.pdfs_skipped}")
-        print(f"   Total Size: {dept_result.total_size/(1024*1024):.2f} MB")
-        print(f"   Duration: {dept_result.duration/60:.2f} minutes")
+        lines.append(f"\n📁 {dept_result.department}:")
+        lines.append(f"   URLs Crawled: {dept_result.urls_crawled}")
+        lines.append(f"   PDFs Found: {dept_result.pdfs_found}")
+        lines.append(f"   PDFs Downloaded: {dept_result.pdfs_downloaded}")
+        lines.append(f"   PDFs Failed: {dept_result.pdfs_failed}")
+        lines.append(f"   PDFs Skipped: {dept_result.pdfs_skipped}")
+        lines.append(f"   Total Size: {dept_result.total_size_mb:.2f} MB")
+        lines.append(f"   Duration: {dept_result.duration_minutes:.2f} minutes")
         
         if dept_result.errors:
-            print(f"   Errors ({len(dept_result.errors)}):")
+            lines.append(f"   Errors ({len(dept_result.errors)}):")
             for error in dept_result.errors[:5]:  # Show first 5 errors
-                print(f"     ❌ {error}")
+                lines.append(f"     ❌ {error}")
             if len(dept_result.errors) > 5:
-                print(f"     ... and {len(dept_result.errors) - 5} more errors")
+                lines.append(f"     ... and {len(dept_result.errors) - 5} more errors")
     
     # Overall summary
-    print(f"\n" + "="*60)
-    print("OVERALL SUMMARY")
-    print("="*60)
-    print(f"Total PDFs Found: {results.total_pdfs_found}")
-    print(f"Total PDFs Downloaded: {results.total_pdfs_downloaded}")
-    print(f"Success Rate: {results.success_rate:.1f}%")
-    print(f"Total Duration: {results.total_duration/60:.2f} minutes")
-    print(f"Average Speed: {results.total_pdfs_downloaded/(results.total_duration/60):.1f} PDFs/minute")
+    lines.append(SUMMARY_BANNER)
+    lines.append(f"Total PDFs Found: {results.total_pdfs_found}")
+    lines.append(f"Total PDFs Downloaded: {results.total_pdfs_downloaded}")
+    lines.append(f"Success Rate: {results.success_rate:.1f}%")
+    lines.append(f"Total Duration: {results.total_duration/60:.2f} minutes")
+    lines.append(f"Average Speed: {results.total_pdfs_downloaded/(results.total_duration/60):.1f} PDFs/minute")
     
-    print("\n" + "="*60)
+    lines.append("\n" + SEP60)
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -156,9 +121,15 @@ Examples:
     parser.add_argument('--full-scan', 
                        action='store_true',
                        help='Disable incremental updates, scan everything (ignore cache)')
+    parser.add_argument('--workers', 
+                       type=int, default=DEFAULT_DEPARTMENT_WORKERS,
+                       help=f'Number of departments to crawl in parallel (default: {DEFAULT_DEPARTMENT_WORKERS})')
     parser.add_argument('--cache-max-age', 
                        type=int, default=24,
                        help='Maximum age in hours for cached pages (default: 24)')
+    parser.add_argument('--clean-cache', 
+                       action='store_true',
+                       help='Clear cached dry-run analyses before running')
     parser.add_argument('--disable-advanced', 
                        action='store_true',
                        help='Disable advanced discovery features (sitemap, search, archives)')
@@ -177,6 +148,10 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
+    if args.workers < 1:
+        print("❌ Error: --workers must be at least 1")
+        sys.exit(1)
+    
     if args.config and args.input_urls:
         print("❌ Error: Cannot use both --config and --input-urls at the same time")
         print("Please choose one input method.")
@@ -186,10 +161,10 @@ Examples:
     try:
         setup_logging(log_level=args.log_level, log_file=args.log_file)
         logger = logging.getLogger('hk_pdf_crawler')
-        logger.info("="*60)
+        logger.info(SEP60)
         logger.info("HK PDF Crawler starting...")
         logger.info(f"Command line: {' '.join(sys.argv)}")
-        logger.info("="*60)
+        logger.info(SEP60)
     except Exception as e:
         print(f"❌ Failed to set up logging: {str(e)}")
         sys.exit(1)
@@ -230,11 +205,11 @@ Examples:
         
         # Filter departments if specified
         if args.departments:
-            available_depts = list(config.departments.keys())
-            invalid_depts = [d for d in args.departments if d not in available_depts]
+            # Dict membership, keeping the order the departments were given in
+            invalid_depts = [d for d in args.departments if d not in config.departments]
             if invalid_depts:
                 print(f"❌ Invalid departments specified: {', '.join(invalid_depts)}")
-                print(f"Available departments: {', '.join(available_depts)}")
+                print(f"Available departments: {', '.join(config.departments)}")
                 sys.exit(1)
             print(f"🎯 Filtering to specific departments: {', '.join(args.departments)}")
             logger.info(f"Filtering to specific departments: {', '.join(args.departments)}")
@@ -263,7 +238,8 @@ Examples:
         # Initialize crawler
         print("🚀 Initializing PDF crawler...")
         logger.info("Initializing PDF crawler...")
-        crawler = PDFCrawler(config)
+        PDFCrawler = getattr(sys.modules[__name__], 'PDFCrawler')
+        crawler = PDFCrawler(config, workers=args.workers)
         
         # Configure advanced features
         if args.disable_advanced:
@@ -274,11 +250,18 @@ Examples:
         if args.force_update:
             print("🔄 Force update mode enabled - will re-download all files")
             logger.info("Force update mode enabled")
+            crawler.use_analysis_cache = False
+        
+        if args.clean_cache:
+            removed = crawler.analysis_cache.clear()
+            print(f"🧹 Cleared {removed} cached dry-run analyses")
+            logger.info(f"Cleared {removed} cached dry-run analyses")
         
         if args.full_scan:
             print("🔍 Full scan mode enabled - ignoring discovery cache")
             logger.info("Full scan mode enabled")
             crawler.use_incremental_updates = False
+            crawler.use_analysis_cache = False
         
         if args.cache_max_age != 24:
             print(f"⏰ Cache max age set to {args.cache_max_age} hours")
@@ -290,7 +273,7 @@ Examples:
             print("🔍 Running dry-run analysis...")
             logger.info("Running dry-run analysis...")
             report = crawler.dry_run(args.departments)
-            print_dry_run_report(report)
+            crawler.progress_reporter.print_dry_run_report(report)
             logger.info("Dry-run analysis completed successfully")
             print("✅ Dry-run analysis completed")
         else:
@@ -5,11 +5,16 @@ This module contains all the dataclass definitions used throughout the PDF crawl
 including results, configurations, and analysis structures.
 """
 
+import sys
 from dataclasses import dataclass
 from typing import List, Optional
 
+# Slotted instances drop the per-object __dict__; a result is created for
+# every PDF, so this adds up on large crawls. Needs Python 3.10+.
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class DownloadResult:
     """Result of a single PDF download attempt"""
     url: str
@@ -17,9 +22,10 @@ class DownloadResult:
     file_path: Optional[str] = None
     error: Optional[str] = None
     file_size: int = 0
+    file_hash: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DepartmentResults:
     """Results for crawling a single department"""
     department: str
@@ -31,9 +37,26 @@ class DepartmentResults:
     total_size: int
     duration: float
     errors: List[str]
+    
+    @property
+    def total_size_mb(self) -> float:
+        """Total downloaded size in MB"""
+        return self.total_size / (1024 * 1024)
+    
+    @property
+    def duration_minutes(self) -> float:
+        """Crawl duration in minutes"""
+        return self.duration / 60
+    
+    @property
+    def success_rate(self) -> float:
+        """Percentage of found PDFs that were downloaded (0 if none were found)"""
+        if self.pdfs_found == 0:
+            return 0
+        return self.pdfs_downloaded / self.pdfs_found * 100
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class CrawlResults:
     """Overall crawling results"""
     departments: List[DepartmentResults]
@@ -43,7 +66,7 @@ class CrawlResults:
     success_rate: float
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DepartmentAnalysis:
     """Analysis results for a single department"""
     department: str
@@ -55,7 +78,7 @@ class DepartmentAnalysis:
     issues: List[str]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DryRunReport:
     """Dry-run analysis report"""
     department_analyses: List[DepartmentAnalysis]
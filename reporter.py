@@ -9,82 +9,264 @@ import time
 import json
 import csv
 import os
+import logging
+import sys
+import queue
+import atexit
+import threading
+import weakref
 from collections import defaultdict
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NamedTuple, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
-from tqdm import tqdm
 
 from models import CrawlResults, DepartmentResults, DryRunReport
 
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from tqdm import tqdm
+
+# tqdm is imported when the first progress bar is created
+_tqdm = None
+
+# Write lock shared by every progress bar; installed in tqdm once, on import
+_BAR_LOCK = threading.RLock()
+
+
+def _get_tqdm():
+    """Import tqdm on first use"""
+    global _tqdm
+    if _tqdm is None:
+        from tqdm import tqdm
+        tqdm.set_lock(_BAR_LOCK)
+        _tqdm = tqdm
+    return _tqdm
+
+# Progress lines are written in batches every PROGRESS_FLUSH_INTERVAL
+# seconds, or as soon as PROGRESS_FLUSH_BATCH lines are waiting
+PROGRESS_FLUSH_INTERVAL = 0.1
+PROGRESS_FLUSH_BATCH = 64
+
+# Report separators and section banners
+SEP60 = "=" * 60
+SUB30 = "-" * 30
+FINAL_REPORT_BANNER = f"{SEP60}\nHK PDF CRAWLER - FINAL REPORT\n{SEP60}"
+DRY_RUN_BANNER = f"\n{SEP60}\nDRY-RUN ANALYSIS RESULTS\n{SEP60}"
+SUMMARY_BANNER = f"\n{SEP60}\nOVERALL SUMMARY\n{SEP60}"
+
+
+# Queued after the last event to stop the writer thread
+_STOP = object()
+
+# Reporters whose writer thread may still be running
+_open_reporters: "weakref.WeakSet[ProgressReporter]" = weakref.WeakSet()
+
+
+def _close_at_exit():
+    """Write progress lines still queued when the interpreter exits"""
+    for reporter in list(_open_reporters):
+        reporter.close()
+
+
+atexit.register(_close_at_exit)
+
+
+class StatEvent(NamedTuple):
+    """A progress report queued by a crawling thread"""
+    timestamp: float
+    department: str
+    action: str
+    details: str
+    # (department key, global key, amount) counter increments
+    counts: Tuple[Tuple[str, str, int], ...] = ()
+
 
 class ProgressReporter:
     """Handles progress tracking and report generation"""
     
     def __init__(self):
-        self.stats: Dict[str, Any] = defaultdict(int)
         self.start_time = time.time()
-        self.department_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        self.current_progress_bars: Dict[str, tqdm] = {}
+        self.current_progress_bars: Dict[str, "tqdm"] = {}
+        
+        # Department bars share one lock and each keep their own terminal line
+        self._bar_lock = _BAR_LOCK
+        self._bar_positions: Dict[str, int] = {}
+        
+        # Counters are owned by the writer thread; crawling threads only
+        # queue StatEvents, so updates need no lock
+        self._stats: Dict[str, Any] = defaultdict(int)
+        self._department_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        
+        # Events are also formatted and written by the writer thread, so
+        # workers never block on stdout
+        self._events: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        
+        # Last formatted timestamp, reused for events within the same second
+        self._clock_second = -1
+        self._clock_text = ""
+        
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Global counters, including every event reported so far"""
+        self.flush()
+        return self._stats
+        
+    @property
+    def department_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-department counters, including every event reported so far"""
+        self.flush()
+        return self._department_stats
         
     def update_progress(self, department: str, action: str, details: str = ""):
         """Update and display real-time progress"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._report(StatEvent(time.time(), department, action, details))
         
-        # Update department statistics
-        self.department_stats[department][f"{action}_count"] += 1
+    def _report(self, event: StatEvent):
+        """Queue an event for the writer thread"""
+        self._start_writer()
+        self._events.put(event)
         
-        # Display real-time update
-        status_msg = f"[{timestamp}] {department}: {action}"
-        if details:
-            status_msg += f" - {details}"
+    def _start_writer(self):
+        """Start the progress writer thread on first use"""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name="progress-writer", daemon=True
+                    )
+                    self._writer.start()
+                    _open_reporters.add(self)
         
-        print(status_msg)
+    def _write_loop(self):
+        """Apply queued events to the counters and write their lines in batches"""
+        stopping = False
+        while not stopping:
+            batch = [self._events.get()]
+            deadline = time.monotonic() + PROGRESS_FLUSH_INTERVAL
+            while len(batch) < PROGRESS_FLUSH_BATCH and batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._events.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            try:
+                lines = []
+                for event in batch:
+                    if event is _STOP:
+                        stopping = True
+                        continue
+                    # One malformed event must not cost the rest of the batch
+                    try:
+                        self._apply(event)
+                        lines.append(self._format_event(event))
+                    except Exception as e:
+                        logger.warning(f"Dropped progress event {event!r}: {e}")
+                
+                if lines:
+                    sys.stdout.write("\n".join(lines) + "\n")
+                    sys.stdout.flush()
+            except Exception:
+                # A closed or broken stdout must not stop the crawl
+                pass
+            finally:
+                for _ in batch:
+                    self._events.task_done()
         
-        # Update global statistics
-        self.stats[f"total_{action}"] += 1
+    def _apply(self, event: StatEvent):
+        """Add an event to the counters (writer thread only)"""
+        department_stats = self._department_stats[event.department]
+        for department_key, global_key, amount in event.counts:
+            department_stats[department_key] += amount
+            self._stats[global_key] += amount
         
-    def track_discovery(self, department: str, urls_found: int, pdfs_found: int):
-        """Track URL discovery statistics"""
-        self.department_stats[department]["urls_crawled"] += urls_found
-        self.department_stats[department]["pdfs_found"] += pdfs_found
+        department_stats[f"{event.action}_count"] += 1
+        self._stats[f"total_{event.action}"] += 1
+        
+    def _format_event(self, event: StatEvent) -> str:
+        """Format a progress event as a status line"""
+        status_msg = f"[{self._clock(event.timestamp)}] {event.department}: {event.action}"
+        if event.details:
+            status_msg += f" - {event.details}"
+        return status_msg
+        
+    def _clock(self, timestamp: float) -> str:
+        """HH:MM:SS for a timestamp, formatted once per second (writer thread only)"""
+        second = int(timestamp)
+        if second != self._clock_second:
+            self._clock_second = second
+            self._clock_text = time.strftime('%H:%M:%S', time.localtime(second))
+        return self._clock_text
+        
+    def flush(self):
+        """Wait until every queued event has been counted and written"""
+        if self._writer is not None:
+            self._events.join()
         
-        # Update global stats
-        self.stats["total_urls_crawled"] += urls_found
-        self.stats["total_pdfs_found"] += pdfs_found
+    def close(self):
+        """Write any queued events and stop the writer thread"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._events.put(_STOP)
+            writer.join()
+        _open_reporters.discard(self)
         
-        self.update_progress(department, "discovery", 
-                           f"Found {pdfs_found} PDFs from {urls_found} URLs")
+    def track_discovery(self, department: str, urls_found: int, pdfs_found: int):
+        """Track URL discovery statistics"""
+        self._report(StatEvent(
+            time.time(), department, "discovery",
+            f"Found {pdfs_found} PDFs from {urls_found} URLs",
+            (("urls_crawled", "total_urls_crawled", urls_found),
+             ("pdfs_found", "total_pdfs_found", pdfs_found))
+        ))
         
     def track_download(self, department: str, success: bool, file_size: int = 0):
         """Track download statistics"""
         if success:
-            self.department_stats[department]["pdfs_downloaded"] += 1
-            self.department_stats[department]["total_size"] += file_size
-            self.stats["total_pdfs_downloaded"] += 1
-            self.stats["total_size"] += file_size
-            
             size_mb = file_size / (1024 * 1024) if file_size > 0 else 0
-            self.update_progress(department, "download_success", 
-                               f"Downloaded PDF ({size_mb:.2f} MB)")
+            self._report(StatEvent(
+                time.time(), department, "download_success",
+                f"Downloaded PDF ({size_mb:.2f} MB)",
+                (("pdfs_downloaded", "total_pdfs_downloaded", 1),
+                 ("total_size", "total_size", file_size))
+            ))
         else:
-            self.department_stats[department]["pdfs_failed"] += 1
-            self.stats["total_pdfs_failed"] += 1
-            self.update_progress(department, "download_failed", "PDF download failed")
+            self._report(StatEvent(
+                time.time(), department, "download_failed", "PDF download failed",
+                (("pdfs_failed", "total_pdfs_failed", 1),)
+            ))
             
     def track_skip(self, department: str, reason: str = "already exists"):
         """Track skipped downloads"""
-        self.department_stats[department]["pdfs_skipped"] += 1
-        self.stats["total_pdfs_skipped"] += 1
-        self.update_progress(department, "download_skipped", reason)
+        self._report(StatEvent(
+            time.time(), department, "download_skipped", reason,
+            (("pdfs_skipped", "total_pdfs_skipped", 1),)
+        ))
         
-    def create_progress_bar(self, department: str, total: int, description: str) -> tqdm:
+    def create_progress_bar(self, department: str, total: int, description: str) -> "tqdm":
         """Create a progress bar for downloads"""
+        tqdm = _get_tqdm()
+        with self._bar_lock:
+            position = self._bar_positions.setdefault(department, len(self._bar_positions))
+        
+        # Redraw at most every 0.5s / 10 files, so parallel departments
+        # don't spend their time repainting the terminal
         progress_bar = tqdm(
             total=total,
             desc=f"{department}: {description}",
             unit="files",
             unit_scale=True,
-            leave=True
+            leave=True,
+            position=position,
+            mininterval=0.5,
+            maxinterval=2.0,
+            miniters=10,
+            smoothing=0
         )
         self.current_progress_bars[department] = progress_bar
         return progress_bar
@@ -102,32 +284,33 @@ class ProgressReporter:
             
     def generate_report(self, results: CrawlResults) -> str:
         """Generate comprehensive final report"""
+        # Drain the queue once, then read the counters directly
+        self.flush()
+        stats = self._stats
         total_duration = time.time() - self.start_time
         
         report_lines = []
-        report_lines.append("=" * 60)
-        report_lines.append("HK PDF CRAWLER - FINAL REPORT")
-        report_lines.append("=" * 60)
+        report_lines.append(FINAL_REPORT_BANNER)
         report_lines.append(f"Crawl completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         report_lines.append(f"Total duration: {total_duration / 60:.2f} minutes")
         report_lines.append("")
         
         # Overall statistics
         report_lines.append("OVERALL STATISTICS")
-        report_lines.append("-" * 30)
+        report_lines.append(SUB30)
         report_lines.append(f"Total PDFs found: {results.total_pdfs_found}")
         report_lines.append(f"Total PDFs downloaded: {results.total_pdfs_downloaded}")
-        report_lines.append(f"Total PDFs failed: {self.stats.get('total_pdfs_failed', 0)}")
-        report_lines.append(f"Total PDFs skipped: {self.stats.get('total_pdfs_skipped', 0)}")
+        report_lines.append(f"Total PDFs failed: {stats.get('total_pdfs_failed', 0)}")
+        report_lines.append(f"Total PDFs skipped: {stats.get('total_pdfs_skipped', 0)}")
         report_lines.append(f"Success rate: {results.success_rate:.1f}%")
         
-        total_size_mb = self.stats.get('total_size', 0) / (1024 * 1024)
+        total_size_mb = stats.get('total_size', 0) / (1024 * 1024)
         report_lines.append(f"Total size downloaded: {total_size_mb:.2f} MB")
         report_lines.append("")
         
         # Department breakdown
         report_lines.append("DEPARTMENT BREAKDOWN")
-        report_lines.append("-" * 30)
+        report_lines.append(SUB30)
         
         for dept_result in results.departments:
             report_lines.append(f"\n{dept_result.department}:")
@@ -137,13 +320,11 @@ class ProgressReporter:
             report_lines.append(f"  PDFs failed: {dept_result.pdfs_failed}")
             report_lines.append(f"  PDFs skipped: {dept_result.pdfs_skipped}")
             
-            dept_size_mb = dept_result.total_size / (1024 * 1024)
-            report_lines.append(f"  Total size: {dept_size_mb:.2f} MB")
-            report_lines.append(f"  Duration: {dept_result.duration / 60:.2f} minutes")
+            report_lines.append(f"  Total size: {dept_result.total_size_mb:.2f} MB")
+            report_lines.append(f"  Duration: {dept_result.duration_minutes:.2f} minutes")
             
             if dept_result.pdfs_found > 0:
-                dept_success_rate = (dept_result.pdfs_downloaded / dept_result.pdfs_found) * 100
-                report_lines.append(f"  Success rate: {dept_success_rate:.1f}%")
+                report_lines.append(f"  Success rate: {dept_result.success_rate:.1f}%")
             
             if dept_result.errors:
                 report_lines.append(f"  Errors encountered: {len(dept_result.errors)}")
@@ -153,12 +334,13 @@ class ProgressReporter:
                     report_lines.append(f"    ... and {len(dept_result.errors) - 3} more")
         
         report_lines.append("")
-        report_lines.append("=" * 60)
+        report_lines.append(SEP60)
         
         return "\n".join(report_lines)
         
     def save_report(self, results: CrawlResults, format: str = "json"):
         """Save report to file in JSON or CSV format"""
+        self.flush()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if format.lower() == "json":
@@ -174,36 +356,41 @@ class ProgressReporter:
         
     def _save_json_report(self, results: CrawlResults, filename: str):
         """Save report as JSON file"""
-        report_data = {
+        report_header = {
             "timestamp": datetime.now().isoformat(),
             "total_duration": time.time() - self.start_time,
             "overall_stats": {
                 "total_pdfs_found": results.total_pdfs_found,
                 "total_pdfs_downloaded": results.total_pdfs_downloaded,
-                "total_pdfs_failed": self.stats.get('total_pdfs_failed', 0),
-                "total_pdfs_skipped": self.stats.get('total_pdfs_skipped', 0),
+                "total_pdfs_failed": self._stats.get('total_pdfs_failed', 0),
+                "total_pdfs_skipped": self._stats.get('total_pdfs_skipped', 0),
                 "success_rate": results.success_rate,
-                "total_size_bytes": self.stats.get('total_size', 0)
-            },
-            "departments": []
+                "total_size_bytes": self._stats.get('total_size', 0)
+            }
         }
         
-        for dept_result in results.departments:
-            dept_data = {
-                "name": dept_result.department,
-                "urls_crawled": dept_result.urls_crawled,
-                "pdfs_found": dept_result.pdfs_found,
-                "pdfs_downloaded": dept_result.pdfs_downloaded,
-                "pdfs_failed": dept_result.pdfs_failed,
-                "pdfs_skipped": dept_result.pdfs_skipped,
-                "total_size_bytes": dept_result.total_size,
-                "duration_seconds": dept_result.duration,
-                "errors": dept_result.errors
-            }
-            report_data["departments"].append(dept_data)
-            
+        # Departments are encoded and written one at a time, so the full
+        # report (errors included) is never held in memory as one object
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+            f.write(json.dumps(report_header)[:-1] + ', "departments": [')
+            
+            for i, dept_result in enumerate(results.departments):
+                dept_data = {
+                    "name": dept_result.department,
+                    "urls_crawled": dept_result.urls_crawled,
+                    "pdfs_found": dept_result.pdfs_found,
+                    "pdfs_downloaded": dept_result.pdfs_downloaded,
+                    "pdfs_failed": dept_result.pdfs_failed,
+                    "pdfs_skipped": dept_result.pdfs_skipped,
+                    "total_size_bytes": dept_result.total_size,
+                    "duration_seconds": dept_result.duration,
+                    "errors": dept_result.errors
+                }
+                if i:
+                    f.write(', ')
+                f.write(json.dumps(dept_data))
+            
+            f.write(']}\n')
             
     def _save_csv_report(self, results: CrawlResults, filename: str):
         """Save report as CSV file"""
@@ -217,60 +404,74 @@ class ProgressReporter:
                 'Success_Rate_%', 'Error_Count'
             ])
             
-            # Write department data
-            for dept_result in results.departments:
-                success_rate = 0
-                if dept_result.pdfs_found > 0:
-                    success_rate = (dept_result.pdfs_downloaded / dept_result.pdfs_found) * 100
-                    
-                writer.writerow([
+            # Write department data in one call
+            writer.writerows(
+                [
                     dept_result.department,
                     dept_result.urls_crawled,
                     dept_result.pdfs_found,
                     dept_result.pdfs_downloaded,
                     dept_result.pdfs_failed,
                     dept_result.pdfs_skipped,
-                    round(dept_result.total_size / (1024 * 1024), 2),
-                    round(dept_result.duration / 60, 2),
-                    round(success_rate, 1),
+                    round(dept_result.total_size_mb, 2),
+                    round(dept_result.duration_minutes, 2),
+                    round(dept_result.success_rate, 1),
                     len(dept_result.errors)
-                ])
+                ]
+                for dept_result in results.departments
+            )
                 
     def print_final_summary(self, results: CrawlResults):
         """Print final summary to console"""
         report = self.generate_report(results)
-        print(report)
+        sys.stdout.write(report + "\n")
         
     def print_dry_run_report(self, report: DryRunReport):
-        """Print dry-run analysis report"""
-        print("\n" + "=" * 50)
-        print("DRY-RUN ANALYSIS RESULTS")
-        print("=" * 50)
+        """Print dry-run analysis report to console"""
+        lines = [DRY_RUN_BANNER]
         
+        # Department-by-department analysis
         for analysis in report.department_analyses:
-            print(f"\n{analysis.department}:")
-            print(f"  Accessible URLs: {analysis.seed_urls_accessible}/{analysis.seed_urls_total}")
-            print(f"  Estimated PDFs: {analysis.estimated_pdfs}")
+            lines.append(f"\n📋 {analysis.department}:")
+            lines.append(f"   Accessible URLs: {analysis.seed_urls_accessible}/{analysis.seed_urls_total}")
+            lines.append(f"   Estimated PDFs: {analysis.estimated_pdfs}")
             
+            # Status indicators
             if analysis.requires_browser:
-                print("  ⚠️  Requires browser automation")
+                lines.append("   ⚠️  Requires browser automation")
             if analysis.rate_limit_detected:
-                print("  ⚠️  Rate limiting detected")
-                
-            for issue in analysis.issues:
-                print(f"  ❌ {issue}")
+                lines.append("   ⚠️  Rate limiting detected")
+            
+            # Issues
+            if analysis.issues:
+                lines.append("   Issues found:")
+                for issue in analysis.issues:
+                    lines.append(f"     ❌ {issue}")
+            else:
+                lines.append("   ✅ No issues detected")
         
-        print(f"\nTotal Estimated PDFs: {report.total_estimated_pdfs}")
-        print(f"Estimated Duration: {report.estimated_duration/60:.1f} minutes")
+        # Overall summary
+        lines.append(SUMMARY_BANNER)
+        lines.append(f"Total Estimated PDFs: {report.total_estimated_pdfs}")
+        lines.append(f"Estimated Duration: {report.estimated_duration/60:.1f} minutes")
         
+        # Issues summary
         if report.issues_found:
-            print("\nIssues Found:")
+            lines.append(f"\nIssues Found ({len(report.issues_found)}):")
             for issue in report.issues_found:
-                print(f"  ❌ {issue}")
+                lines.append(f"  ❌ {issue}")
+        else:
+            lines.append("\n✅ No major issues detected")
         
+        # Recommendations
         if report.recommendations:
-            print("\nRecommendations:")
+            lines.append(f"\nRecommendations ({len(report.recommendations)}):")
             for rec in report.recommendations:
-                print(f"  💡 {rec}")
-                
-        print("=" * 50)
\ No newline at end of file
+                lines.append(f"  💡 {rec}")
+        else:
+            lines.append("\n✅ No specific recommendations")
+        
+        lines.append("\n" + SEP60)
+        
+        # One write for the whole report instead of a print per line
+        sys.stdout.write("\n".join(lines) + "\n")
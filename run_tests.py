@@ -10,10 +10,34 @@ import sys
 import os
 import subprocess
 import argparse
+import importlib.util
+import hashlib
+import json
 from pathlib import Path
 
+# Modules the test suite imports, and the crawler modules it tests
+REQUIRED_MODULES = ['pytest', 'requests', 'bs4', 'selenium', 'yaml', 'boto3', 'tqdm']
+CORE_MODULES = [
+    'config.py', 'discovery.py', 'downloader.py',
+    'browser.py', 'crawler.py', 'models.py', 'utils.py'
+]
 
-def run_command(command, description):
+# Result of the last successful environment check
+ENV_CACHE_FILE = '.test_env_cache.json'
+
+# Options for every pytest run: this script prints its own banners, so
+# pytest's header, warnings summary and test cache are skipped
+BASE_PYTEST = ['-p', 'no:cacheprovider', '-p', 'no:warnings', '--no-header', '--tb=short']
+
+# Plugins are loaded explicitly (-p) where a run needs them instead of
+# scanning every installed package for pytest entry points
+PYTEST_ENV = {**os.environ, 'PYTEST_DISABLE_PLUGIN_AUTOLOAD': '1'}
+
+# Set by --verbose to list every test as it runs
+_verbose = False
+
+
+def run_command(command, description, env=None):
     """Run a command and return success status"""
     print(f"\n{'='*60}")
     print(f"Running: {description}")
@@ -21,15 +45,41 @@ def run_command(command, description):
     print('='*60)
     
     try:
-        result = subprocess.run(command, check=True, capture_output=False)
-        print(f"✅ {description} - PASSED")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} - FAILED (exit code: {e.returncode})")
-        return False
+        returncode = subprocess.run(command, env=env).returncode
     except FileNotFoundError:
         print(f"❌ {description} - FAILED (command not found)")
         return False
+    
+    if returncode != 0:
+        print(f"❌ {description} - FAILED (exit code: {returncode})")
+        return False
+    
+    print(f"✅ {description} - PASSED")
+    return True
+
+
+def _pytest_cmd(files, extra=None):
+    """Build a pytest command for the given test files
+    
+    When pytest-xdist is installed, test files are spread across all CPU
+    cores. --dist=loadfile keeps every test of a file on one worker, so
+    per-file fixtures and the global `responses` mocks never race.
+    importlib import mode loads test files without rewriting sys.path.
+    """
+    extra = list(extra or [])
+    command = [sys.executable, '-m', 'pytest', *files, *BASE_PYTEST, '--import-mode=importlib']
+    if _verbose:
+        command.append('-v')
+    if importlib.util.find_spec('xdist') is not None:
+        command += ['-p', 'xdist', '-n', 'auto', '--dist=loadfile']
+    if any(arg.startswith('--cov') for arg in extra):
+        command += ['-p', 'pytest_cov']
+    return command + extra
+
+
+def _run_pytest_command(command, description):
+    """Run a pytest command without plugin autoloading"""
+    return run_command(command, description, env=PYTEST_ENV)
 
 
 def install_test_dependencies():
@@ -39,6 +89,7 @@ def install_test_dependencies():
     dependencies = [
         'pytest>=7.0.0',
         'pytest-cov>=4.0.0',
+        'pytest-xdist>=3.5.0',
         'responses>=0.23.0',
         'moto>=4.2.0',  # For mocking AWS services
         'selenium>=4.0.0',
@@ -49,103 +100,45 @@ def install_test_dependencies():
         'tqdm>=4.64.0'
     ]
     
-    for dep in dependencies:
-        command = [sys.executable, '-m', 'pip', 'install', dep]
-        if not run_command(command, f"Installing {dep}"):
-            print(f"Warning: Failed to install {dep}")
+    # One pip run resolves everything together; fall back to installing
+    # package by package only if the batch fails
+    pip_command = [
+        sys.executable, '-m', 'pip', 'install',
+        '--disable-pip-version-check', '--prefer-binary'
+    ]
+    if not run_command(pip_command + dependencies, "Installing test dependencies"):
+        for dep in dependencies:
+            if not run_command(pip_command + [dep], f"Installing {dep}"):
+                print(f"Warning: Failed to install {dep}")
     
     print("✅ Test dependencies installation completed")
 
 
-def run_unit_tests():
-    """Run unit tests"""
-    command = [
-        sys.executable, '-m', 'pytest', 
-        'test_unit_core.py',
-        '-v',
-        '--tb=short',
-        '--cov=.',
-        '--cov-report=term-missing'
-    ]
-    return run_command(command, "Unit Tests (Core Functions)")
-
-
-def run_integration_tests():
-    """Run integration tests with mocked HTTP requests"""
-    command = [
-        sys.executable, '-m', 'pytest',
-        'test_integration_mocked.py',
-        '-v',
-        '--tb=short'
-    ]
-    return run_command(command, "Integration Tests (Mocked HTTP)")
-
-
-def run_end_to_end_tests():
-    """Run end-to-end tests"""
-    command = [
-        sys.executable, '-m', 'pytest',
-        'test_end_to_end.py',
-        '-v',
-        '--tb=short'
-    ]
-    return run_command(command, "End-to-End Tests")
-
+# Test categories: pytest marker -> (description, help for its CLI flag).
+# Markers are declared in pytest.ini and each test file tags itself with a
+# module-level `pytestmark`.
+CATEGORIES = {
+    'unit': ("Unit Tests (Core Functions)", "Run unit tests only"),
+    'integration': ("Integration Tests (Mocked HTTP)", "Run integration tests only"),
+    'e2e': ("End-to-End Tests", "Run end-to-end tests only"),
+    'errors': ("Error Handling Tests", "Run error handling tests only"),
+    'browser': ("Browser Automation Tests", "Run browser automation tests only"),
+    's3': ("S3 Integration Tests", "Run S3 integration tests only"),
+    'existing': ("Existing Tests", "Run the existing feature tests only"),
+}
 
-def run_error_handling_tests():
-    """Run error handling tests"""
-    command = [
-        sys.executable, '-m', 'pytest',
-        'test_error_handling.py',
-        '-v',
-        '--tb=short'
-    ]
-    return run_command(command, "Error Handling Tests")
-
-
-def run_browser_tests():
-    """Run browser automation tests"""
-    command = [
-        sys.executable, '-m', 'pytest',
-        'test_browser_automation.py',
-        '-v',
-        '--tb=short'
-    ]
-    return run_command(command, "Browser Automation Tests")
 
-
-def run_s3_tests():
-    """Run S3 integration tests"""
-    command = [
-        sys.executable, '-m', 'pytest',
-        'test_s3_integration.py',
-        '-v',
-        '--tb=short'
-    ]
-    return run_command(command, "S3 Integration Tests")
-
-
-def run_existing_tests():
-    """Run existing test files"""
-    existing_tests = [
-        'test_comprehensive.py',
-        'test_integration.py',
-        'test_crawler_integration.py',
-        'test_concurrency.py',
-        'test_advanced_features.py',
-        'test_reporter.py'
-    ]
+def run_category(category):
+    """Run the tests of one category, selected by its pytest marker
     
-    results = []
-    for test_file in existing_tests:
-        if os.path.exists(test_file):
-            command = [sys.executable, '-m', 'pytest', test_file, '-v', '--tb=short']
-            success = run_command(command, f"Existing Tests ({test_file})")
-            results.append(success)
-        else:
-            print(f"⚠️  Test file not found: {test_file}")
-    
-    return all(results) if results else True
+    Coverage tracing slows the tests down, so unit tests only collect it
+    when HK_COVERAGE=1 is set; --coverage is the usual way to get a report.
+    """
+    description, _ = CATEGORIES[category]
+    extra = []
+    if category == 'unit' and os.environ.get('HK_COVERAGE') == '1':
+        extra = ['--cov=.', '--cov-report=term-missing']
+    return _run_pytest_command(_pytest_cmd(['-m', category], extra), description)
 
 
 def run_all_tests():
@@ -154,36 +147,16 @@ def run_all_tests():
     print(f"Python version: {sys.version}")
     print(f"Working directory: {os.getcwd()}")
     
-    test_functions = [
-        run_unit_tests,
-        run_integration_tests,
-        run_end_to_end_tests,
-        run_error_handling_tests,
-        run_browser_tests,
-        run_s3_tests,
-        run_existing_tests
-    ]
-    
-    results = []
-    for test_func in test_functions:
-        try:
-            success = test_func()
-            results.append(success)
-        except Exception as e:
-            print(f"❌ Error running {test_func.__name__}: {e}")
-            results.append(False)
+    # One pytest run over every test file: the interpreter and plugins load
+    # once, and xdist balances all files across the workers together
+    success = _run_pytest_command(_pytest_cmd([]), "All Tests")
     
     # Summary
     print(f"\n{'='*60}")
     print("TEST SUMMARY")
     print('='*60)
     
-    passed = sum(results)
-    total = len(results)
-    
-    print(f"Tests passed: {passed}/{total}")
-    
-    if all(results):
+    if success:
         print("🎉 All tests passed!")
         return True
     else:
@@ -195,16 +168,12 @@ def run_quick_tests():
     """Run a quick subset of tests"""
     print("🏃 Running quick test suite...")
     
-    command = [
-        sys.executable, '-m', 'pytest',
-        'test_unit_core.py',
-        'test_integration_mocked.py',
-        '-v',
-        '--tb=line',
-        '-x'  # Stop on first failure
-    ]
+    command = _pytest_cmd(
+        ['test_unit_core.py', 'test_integration_mocked.py'],
+        ['--tb=line', '-x']  # Stop on first failure
+    )
     
-    return run_command(command, "Quick Tests (Unit + Integration)")
+    return _run_pytest_command(command, "Quick Tests (Unit + Integration)")
 
 
 def run_coverage_report():
@@ -212,17 +181,13 @@ def run_coverage_report():
     print("📊 Generating coverage report...")
     
     # Run tests with coverage
-    command = [
-        sys.executable, '-m', 'pytest',
-        '--cov=.',
-        '--cov-report=html',
-        '--cov-report=term',
-        '--cov-report=xml',
-        'test_unit_core.py',
-        'test_integration_mocked.py'
-    ]
+    # pytest-cov merges the results of xdist workers automatically
+    command = _pytest_cmd(
+        ['test_unit_core.py', 'test_integration_mocked.py'],
+        ['--cov=.', '--cov-report=html', '--cov-report=term', '--cov-report=xml']
+    )
     
-    success = run_command(command, "Coverage Report Generation")
+    success = _run_pytest_command(command, "Coverage Report Generation")
     
     if success:
         print("\n📈 Coverage reports generated:")
@@ -244,18 +209,12 @@ def check_test_environment():
     
     print(f"✅ Python version: {sys.version}")
     
-    # Check required modules
-    required_modules = [
-        'pytest', 'requests', 'beautifulsoup4', 'selenium', 
-        'yaml', 'boto3', 'tqdm'
-    ]
-    
+    # Check required modules (find_spec locates them without importing)
     missing_modules = []
-    for module in required_modules:
-        try:
-            __import__(module)
+    for module in REQUIRED_MODULES:
+        if importlib.util.find_spec(module) is not None:
             print(f"✅ {module} available")
-        except ImportError:
+        else:
             missing_modules.append(module)
             print(f"❌ {module} missing")
     
@@ -265,14 +224,10 @@ def check_test_environment():
         return False
     
     # Check if core modules exist
-    core_modules = [
-        'config.py', 'discovery.py', 'downloader.py', 
-        'browser.py', 'crawler.py', 'models.py', 'utils.py'
-    ]
-    
+    present = _project_files()
     missing_files = []
-    for module in core_modules:
-        if not os.path.exists(module):
+    for module in CORE_MODULES:
+        if module not in present:
             missing_files.append(module)
             print(f"❌ {module} missing")
         else:
@@ -283,9 +238,41 @@ def check_test_environment():
         return False
     
     print("✅ Test environment check passed")
+    
+    try:
+        with open(ENV_CACHE_FILE, 'w') as f:
+            json.dump({'key': _environment_key(), 'ok': True}, f)
+    except OSError:
+        pass
     return True
 
 
+def _project_files():
+    """Files in the project directory by name, from a single directory scan"""
+    with os.scandir('.') as entries:
+        return {entry.name: entry for entry in entries if entry.is_file()}
+
+
+def _environment_key():
+    """Key that changes with the Python version, requirements or core modules"""
+    present = _project_files()
+    parts = [sys.version]
+    for path in CORE_MODULES + ['requirements.txt']:
+        if path in present:
+            parts.append(f"{path}:{present[path].stat().st_mtime}")
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+
+def environment_check_cached():
+    """Whether the environment passed its check and hasn't changed since"""
+    try:
+        with open(ENV_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return cached.get('ok') is True and cached.get('key') == _environment_key()
+
+
 def main():
     """Main test runner function"""
     parser = argparse.ArgumentParser(description='HK PDF Crawler Test Runner')
@@ -297,21 +284,21 @@ def main():
                        help='Generate coverage report')
     parser.add_argument('--check-env', action='store_true',
                        help='Check test environment setup')
-    parser.add_argument('--unit', action='store_true',
-                       help='Run unit tests only')
-    parser.add_argument('--integration', action='store_true',
-                       help='Run integration tests only')
-    parser.add_argument('--e2e', action='store_true',
-                       help='Run end-to-end tests only')
-    parser.add_argument('--errors', action='store_true',
-                       help='Run error handling tests only')
-    parser.add_argument('--browser', action='store_true',
-                       help='Run browser automation tests only')
-    parser.add_argument('--s3', action='store_true',
-                       help='Run S3 integration tests only')
+    parser.add_argument('--force-check-env', action='store_true',
+                       help='Check the environment even if an earlier check is still valid')
+    parser.add_argument('--category', choices=CATEGORIES,
+                       help='Run one test category only')
+    for category, (_, help_text) in CATEGORIES.items():
+        parser.add_argument(f'--{category}', dest='category', action='store_const',
+                           const=category, help=help_text)
+    parser.add_argument('--verbose', action='store_true',
+                       help='List every test as it runs')
     
     args = parser.parse_args()
     
+    global _verbose
+    _verbose = args.verbose
+    
     if args.install_deps:
         install_test_dependencies()
         return
@@ -320,8 +307,9 @@ def main():
         success = check_test_environment()
         sys.exit(0 if success else 1)
     
-    # Check environment before running tests
-    if not check_test_environment():
+    # Check environment before running tests, unless it passed already
+    # and nothing has changed since
+    if (args.force_check_env or not environment_check_cached()) and not check_test_environment():
         print("\n❌ Environment check failed. Run --check-env for details.")
         sys.exit(1)
     
@@ -331,18 +319,8 @@ def main():
         success = run_quick_tests()
     elif args.coverage:
         success = run_coverage_report()
-    elif args.unit:
-        success = run_unit_tests()
-    elif args.integration:
-        success = run_integration_tests()
-    elif args.e2e:
-        success = run_end_to_end_tests()
-    elif args.errors:
-        success = run_error_handling_tests()
-    elif args.browser:
-        success = run_browser_tests()
-    elif args.s3:
-        success = run_s3_tests()
+    elif args.category:
+        success = run_category(args.category)
     else:
         # Run all tests by default
         success = run_all_tests()
@@ -6,32 +6,46 @@ This script tests advanced features with proper mocking to prevent hanging.
 """
 
 import os
-import sys
 import time
 import logging
-import tempfile
-import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch
 import pytest
 import responses
 
-# Add current directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
 from utils import UserAgentRotator, SessionManager, retry_with_backoff, setup_logging
 from discovery import URLDiscovery
 from downloader import FileDownloader
+from file_registry import FileRegistry
 from config import StorageConfig, CrawlSettings
 from models import DownloadResult
 
+pytestmark = pytest.mark.existing
+
+
+@pytest.fixture
+def temp_dir(tmp_path):
+    """Temporary directory for tests, cleaned up by pytest"""
+    return str(tmp_path)
+
 
 @pytest.fixture
-def temp_dir():
-    """Create temporary directory for tests"""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+def mocked_responses():
+    """Mock HTTP responses for one test; unused mocks are allowed"""
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        yield rsps
+
+
+@pytest.fixture(scope="module")
+def session_manager():
+    """Session manager shared by the discovery tests"""
+    return SessionManager()
+
+
+@pytest.fixture(scope="module")
+def discovery(session_manager):
+    """URL discovery on the shared session; `responses` mocks it at send time"""
+    return URLDiscovery(session_manager.get_session())
 
 
 def test_user_agent_rotation():
@@ -68,11 +82,10 @@ def test_session_management():
     assert session3 is not None
 
 
-@responses.activate
-def test_sitemap_discovery():
+def test_sitemap_discovery(mocked_responses, discovery):
     """Test sitemap.xml parsing functionality with mocked responses"""
     # Mock sitemap responses
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://www.bd.gov.hk/sitemap.xml',
         body='''<?xml version="1.0" encoding="UTF-8"?>
@@ -83,15 +96,12 @@ def test_sitemap_discovery():
         status=200
     )
     
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://www.labour.gov.hk/sitemap.xml',
         status=404
     )
     
-    session_manager = SessionManager()
-    discovery = URLDiscovery(session_manager.get_session())
-    
     # Test successful sitemap discovery
     urls = discovery.discover_urls_from_sitemap('www.bd.gov.hk')
     assert len(urls) >= 0  # Should handle gracefully even if no URLs found
@@ -101,29 +111,24 @@ def test_sitemap_discovery():
     assert isinstance(urls, list)
 
 
-@responses.activate  
-def test_archive_discovery():
+def test_archive_discovery(mocked_responses, discovery):
     """Test archive section discovery with mocked responses"""
     # Mock archive page
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://www.bd.gov.hk/en/resources/archives/',
         body='<html><body><a href="archive1.pdf">Archive 1</a><a href="archive2.pdf">Archive 2</a></body></html>',
         status=200
     )
     
-    session_manager = SessionManager()
-    discovery = URLDiscovery(session_manager.get_session())
-    
     urls = discovery.discover_archive_sections('www.bd.gov.hk')
     assert isinstance(urls, list)
 
 
-@responses.activate
-def test_search_functionality():
+def test_search_functionality(mocked_responses, discovery):
     """Test search form handling with mocked responses"""
     # Mock search page with form
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://www.bd.gov.hk/en/resources/codes-and-references/codes-and-design-manuals/index.html',
         body='''<html><body>
@@ -136,16 +141,13 @@ def test_search_functionality():
     )
     
     # Mock search results
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://www.bd.gov.hk/search',
         body='<html><body><a href="result1.pdf">Result 1</a></body></html>',
         status=200
     )
     
-    session_manager = SessionManager()
-    discovery = URLDiscovery(session_manager.get_session())
-    
     search_results = discovery.search_for_pdfs(
         'https://www.bd.gov.hk/en/resources/codes-and-references/codes-and-design-manuals/index.html',
         ['PDF', 'document']
@@ -165,7 +167,7 @@ def test_incremental_updates(temp_dir):
     
     # Test file registry operations
     assert hasattr(downloader, 'file_registry')
-    assert isinstance(downloader.file_registry, dict)
+    assert isinstance(downloader.file_registry, FileRegistry)
     
     # Test registry update
     test_url = 'https://example.com/test.pdf'
@@ -179,12 +181,15 @@ def test_incremental_updates(temp_dir):
     
     downloader.update_file_registry(test_url, test_path, test_content, {})
     
-    # Check that registry was updated (it uses hash as key, not URL)
+    # Check that registry was updated (entries are keyed by URL)
     assert len(downloader.file_registry) > 0
 
 
-def test_retry_logic():
+def test_retry_logic(monkeypatch):
     """Test retry logic with exponential backoff"""
+    # Record the backoff delays instead of sleeping through them
+    delays = []
+    monkeypatch.setattr('utils.time.sleep', delays.append)
     call_count = 0
     
     @retry_with_backoff(max_retries=3)
@@ -198,13 +203,13 @@ def test_retry_logic():
     result = failing_function()
     assert result == "success"
     assert call_count == 3
+    assert delays == [1.0, 2.0]
 
 
-@responses.activate
-def test_comprehensive_discovery():
+def test_comprehensive_discovery(mocked_responses, discovery):
     """Test comprehensive URL discovery with mocked responses"""
     # Mock main page
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://example.gov.hk/index.html',
         body='<html><body><a href="doc1.pdf">Doc 1</a><a href="page2.html">Page 2</a></body></html>',
@@ -212,7 +217,7 @@ def test_comprehensive_discovery():
     )
     
     # Mock secondary page
-    responses.add(
+    mocked_responses.add(
         responses.GET,
         'https://example.gov.hk/page2.html',
         body='<html><body><a href="doc2.pdf">Doc 2</a></body></html>',
@@ -220,13 +225,10 @@ def test_comprehensive_discovery():
     )
     
     # Mock sitemap (will fail gracefully)
-    responses.add(responses.GET, 'https://example.gov.hk/sitemap.xml', status=404)
-    responses.add(responses.GET, 'https://example.gov.hk/sitemap_index.xml', status=404)
-    responses.add(responses.GET, 'https://example.gov.hk/sitemaps.xml', status=404)
-    responses.add(responses.GET, 'http://example.gov.hk/sitemap.xml', status=404)
-    
-    session_manager = SessionManager()
-    discovery = URLDiscovery(session_manager.get_session())
+    mocked_responses.add(responses.GET, 'https://example.gov.hk/sitemap.xml', status=404)
+    mocked_responses.add(responses.GET, 'https://example.gov.hk/sitemap_index.xml', status=404)
+    mocked_responses.add(responses.GET, 'https://example.gov.hk/sitemaps.xml', status=404)
+    mocked_responses.add(responses.GET, 'http://example.gov.hk/sitemap.xml', status=404)
     
     urls = discovery.discover_comprehensive_urls('https://example.gov.hk/index.html', max_depth=2)
     assert isinstance(urls, list)
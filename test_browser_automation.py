@@ -9,17 +9,40 @@ JavaScript-heavy pages, interactive elements, and Selenium WebDriver integration
 import pytest
 import tempfile
 import os
-from unittest.mock import Mock, patch, MagicMock, call
+from dataclasses import dataclass
+from unittest.mock import Mock, patch, MagicMock, PropertyMock, call
 from selenium.common.exceptions import (
-    TimeoutException, NoSuchElementException, WebDriverException,
-    ElementClickInterceptedException
+    TimeoutException, NoSuchElementException, WebDriverException, InvalidSessionIdException
 )
 
 # Import modules to test
-from browser import BrowserHandler
+from browser import BrowserHandler, BrowserPool, PDF_LINK_CSS
 from config import CrawlConfig, DepartmentConfig, CrawlSettings, StorageConfig
+from models import _SLOTS
 from crawler import PDFCrawler
 
+pytestmark = pytest.mark.browser
+
+
+@dataclass(**_SLOTS)
+class FakeElement:
+    """Lightweight stand-in for a WebElement; far cheaper to build than a Mock"""
+    href: str = ''
+    text: str = ''
+    clicks: int = 0
+    
+    def get_attribute(self, name: str) -> str:
+        return self.href if name == 'href' else ''
+    
+    def get_text(self) -> str:
+        return self.text
+    
+    def click(self) -> None:
+        self.clicks += 1
+    
+    def is_selected(self) -> bool:
+        return False
+
 
 class TestBrowserHandlerInitialization:
     """Test browser handler initialization and configuration"""
@@ -105,6 +128,12 @@ class TestBrowserHandlerInitialization:
 class TestInteractivePageHandling:
     """Test handling of interactive web pages"""
     
+    @pytest.fixture(autouse=True)
+    def skip_page_waits(self):
+        """The WebDriver is mocked, so there is no page to wait for"""
+        with patch('browser.time.sleep'):
+            yield
+    
     def setup_method(self):
         """Set up test fixtures"""
         self.handler = BrowserHandler(headless=True)
@@ -121,9 +150,7 @@ class TestInteractivePageHandling:
         test_url = "https://example.com/interactive.html"
         
         # Mock page elements
-        mock_link = Mock()
-        mock_link.get_attribute.return_value = "https://example.com/document.pdf"
-        mock_link.get_text.return_value = "Download PDF"
+        mock_link = FakeElement("https://example.com/document.pdf", "Download PDF")
         
         self.mock_driver.find_elements.return_value = [mock_link]
         
@@ -138,69 +165,152 @@ class TestInteractivePageHandling:
         # Should return list of PDF links
         assert isinstance(pdf_links, list)
     
+    def test_handle_interactive_page_batched(self):
+        """Test links are collected by one async script when it succeeds"""
+        self.mock_driver.execute_async_script.return_value = [
+            'https://example.com/document.pdf', 'docs/report.pdf', 'https://example.com/document.pdf'
+        ]
+        self.mock_driver.find_elements.return_value = []
+        
+        pdf_links = self.handler.handle_interactive_page("https://example.com/interactive.html")
+        
+        assert self.mock_driver.execute_async_script.call_count == 2
+        assert sorted(pdf_links) == ['https://example.com/docs/report.pdf', 'https://example.com/document.pdf']
+        
+        # The per-element helpers only run as a fallback
+        self.mock_driver.execute_script.assert_not_called()
+    
+    def test_handle_interactive_page_batch_fallback(self):
+        """Test the step-by-step helpers run when the batch script fails"""
+        self.mock_driver.execute_async_script.side_effect = WebDriverException("script timeout")
+        self.mock_driver.execute_script.return_value = ['https://example.com/hidden.pdf']
+        self.mock_driver.find_elements.return_value = []
+        
+        pdf_links = self.handler.handle_interactive_page("https://example.com/interactive.html")
+        
+        assert 'https://example.com/hidden.pdf' in pdf_links
+    
+    def test_cdp_pdf_sniffing(self):
+        """Test PDFs seen in the network log are returned and replace the reveal scripts"""
+        import json
+        
+        def performance_entry(method, url, mime_type):
+            message = {'message': {'method': method, 'params': {'response': {'url': url, 'mimeType': mime_type}}}}
+            return {'level': 'INFO', 'message': json.dumps(message)}
+        
+        self.mock_driver.get_log.side_effect = [
+            [performance_entry('Network.responseReceived', 'https://example.com/previous.pdf', 'application/pdf')],
+            [
+                performance_entry('Network.responseReceived', 'https://example.com/report?id=1', 'application/pdf'),
+                performance_entry('Network.responseReceived', 'https://example.com/app.js', 'text/javascript'),
+                performance_entry('Network.requestWillBeSent', 'https://example.com/other.pdf', ''),
+            ],
+            [performance_entry('Network.responseReceived', 'https://example.com/files/annual.PDF', 'binary/octet-stream')],
+        ]
+        self.mock_driver.execute_async_script.side_effect = WebDriverException("script timeout")
+        self.mock_driver.execute_script.return_value = None
+        self.mock_driver.find_elements.return_value = []
+        
+        with patch.object(self.handler, '_execute_pdf_reveal_scripts') as mock_reveal:
+            pdf_links = self.handler.handle_interactive_page("https://example.com/interactive.html")
+        
+        assert sorted(pdf_links) == ['https://example.com/files/annual.PDF', 'https://example.com/report?id=1']
+        self.mock_driver.get_log.assert_called_with('performance')
+        mock_reveal.assert_not_called()
+    
     def test_find_existing_pdf_links(self):
         """Test finding existing PDF links on page"""
-        # Mock PDF links
-        mock_pdf_link1 = Mock()
-        mock_pdf_link1.get_attribute.return_value = "https://example.com/doc1.pdf"
-        mock_pdf_link1.get_text.return_value = "Document 1"
+        # The page returns plain link URLs for the compound selector
+        def mock_execute_script(script, *args):
+            if args == (PDF_LINK_CSS,):
+                return [
+                    "https://example.com/doc1.pdf",
+                    "https://example.com/doc2.pdf",
+                    "https://example.com/page.html",
+                ]
+            return None
         
-        mock_pdf_link2 = Mock()
-        mock_pdf_link2.get_attribute.return_value = "https://example.com/doc2.pdf"
-        mock_pdf_link2.get_text.return_value = "Document 2"
+        self.mock_driver.execute_script.side_effect = mock_execute_script
         
-        # Mock non-PDF link
-        mock_other_link = Mock()
-        mock_other_link.get_attribute.return_value = "https://example.com/page.html"
-        mock_other_link.get_text.return_value = "Other Page"
+        pdf_links = self.handler._find_existing_pdf_links()
         
-        # Configure mock to return different elements for different selectors
-        def mock_find_elements(by, selector):
-            if 'href$=".pdf"' in selector or 'href*=".pdf"' in selector:
-                return [mock_pdf_link1, mock_pdf_link2]
-            else:
-                return [mock_other_link]
+        # Should find PDF links with a single query and no element lookups
+        assert pdf_links == ["https://example.com/doc1.pdf", "https://example.com/doc2.pdf"]
+        self.mock_driver.find_elements.assert_not_called()
+    
+    def test_find_existing_pdf_links_cached_until_dom_changes(self):
+        """Test repeated lookups reuse links until the page changes"""
+        self.mock_driver.current_url = "https://example.com/page.html"
+        queries = []
         
-        self.mock_driver.find_elements.side_effect = mock_find_elements
+        # Installing the observer, then "unchanged", then "changed"
+        dom_changes = iter([True, False, True, False])
         
-        pdf_links = self.handler._find_existing_pdf_links()
+        def mock_execute_script(script, *args):
+            if args:
+                queries.append(args)
+                return ["https://example.com/doc1.pdf"]
+            return next(dom_changes)
+        
+        self.mock_driver.execute_script.side_effect = mock_execute_script
+        
+        first = self.handler._find_existing_pdf_links()
+        assert first == ["https://example.com/doc1.pdf"]
+        assert len(queries) == 1
+        
+        assert self.handler._find_existing_pdf_links() == first
+        assert len(queries) == 1
         
-        # Should find PDF links
-        assert len(pdf_links) >= 0  # May vary based on implementation
+        assert self.handler._find_existing_pdf_links() == first
+        assert len(queries) == 2
     
     def test_click_interactive_elements(self):
         """Test clicking interactive elements to reveal PDFs"""
         # Mock clickable elements
-        mock_button = Mock()
-        mock_button.click.return_value = None
+        mock_button = FakeElement(text="Download")
         
-        # Mock find_elements to return button for some selectors
-        def mock_find_elements(by, selector):
-            if 'button' in selector or 'Download' in selector:
+        # One page script returns the elements matching any selector
+        def mock_execute_script(script, *args):
+            if args == (BrowserHandler.INTERACTIVE_TEXT_TARGETS, BrowserHandler.INTERACTIVE_SELECTORS, 3):
                 return [mock_button]
-            return []
+            return None
         
-        self.mock_driver.find_elements.side_effect = mock_find_elements
-        self.mock_driver.execute_script.return_value = None
+        self.mock_driver.execute_script.side_effect = mock_execute_script
+        self.mock_driver.execute_async_script.return_value = []
         
         pdf_links = self.handler._click_interactive_elements()
         
         # Should attempt to click elements
         assert isinstance(pdf_links, list)
+        assert self.mock_driver.execute_async_script.call_args.args[1] is mock_button
+        self.mock_driver.find_elements.assert_not_called()
+    
+    def test_click_provided_elements(self):
+        """Test elements the caller already holds are clicked without a lookup"""
+        mock_button = FakeElement(text="Show All")
+        self.mock_driver.execute_async_script.return_value = ['https://example.com/revealed.pdf']
+        
+        pdf_links = self.handler._click_interactive_elements([mock_button])
+        
+        assert pdf_links == ['https://example.com/revealed.pdf']
+        self.mock_driver.execute_async_script.assert_called_once()
+        assert self.mock_driver.execute_async_script.call_args.args[1:] == (mock_button, PDF_LINK_CSS)
+        self.mock_driver.find_elements.assert_not_called()
     
     def test_click_element_with_interception(self):
-        """Test handling of click interception"""
-        mock_button = Mock()
-        mock_button.click.side_effect = ElementClickInterceptedException("Element intercepted")
+        """Test clicks happen in the page, where overlays can't intercept them"""
+        mock_button = FakeElement(text="Download")
         
-        self.mock_driver.find_elements.return_value = [mock_button]
-        self.mock_driver.execute_script.return_value = None
+        self.mock_driver.execute_script.return_value = [FakeElement(text="View"), mock_button]
+        self.mock_driver.execute_async_script.side_effect = [
+            WebDriverException("stale element"), ['https://example.com/revealed.pdf']
+        ]
         
-        # Should handle click interception and try JavaScript click
         pdf_links = self.handler._click_interactive_elements()
         
-        # Verify JavaScript click was attempted
-        self.mock_driver.execute_script.assert_called()
+        # Verify the JavaScript click was used and a failed click was skipped
+        assert mock_button.clicks == 0
+        assert pdf_links == ['https://example.com/revealed.pdf']
     
     def test_execute_pdf_reveal_scripts(self):
         """Test executing JavaScript to reveal PDF URLs"""
@@ -221,43 +331,28 @@ class TestInteractivePageHandling:
     
     def test_handle_forms_and_modals(self):
         """Test handling of forms and modal dialogs"""
-        # Mock modal trigger
-        mock_modal_trigger = Mock()
-        mock_modal_trigger.click.return_value = None
-        
-        # Mock close button
-        mock_close_button = Mock()
-        mock_close_button.click.return_value = None
-        
-        # Mock form elements
-        mock_checkbox = Mock()
-        mock_checkbox.is_selected.return_value = False
-        mock_checkbox.click.return_value = None
-        
-        mock_submit_button = Mock()
-        mock_submit_button.click.return_value = None
-        
-        mock_form = Mock()
-        mock_form.find_elements.side_effect = [
-            [mock_checkbox],  # checkboxes
-            [mock_submit_button]  # submit buttons
-        ]
-        
-        def mock_find_elements(by, selector):
-            if 'modal-trigger' in selector:
-                return [mock_modal_trigger]
-            elif 'close' in selector or 'modal-close' in selector:
-                return [mock_close_button]
-            elif selector == 'form':
-                return [mock_form]
-            return []
-        
-        self.mock_driver.find_elements.side_effect = mock_find_elements
+        # One script opens the modals, ticks checkboxes and submits forms
+        self.mock_driver.execute_async_script.return_value = {
+            'links': ['https://example.com/modal.pdf'],
+            'submitted': 1,
+        }
+        self.mock_driver.execute_script.side_effect = lambda script, *args: (
+            ['https://example.com/after-submit.pdf'] if args else None
+        )
         
         pdf_links = self.handler._handle_forms_and_modals()
         
-        # Should handle modals and forms
-        assert isinstance(pdf_links, list)
+        # Should collect modal links and look again after the submission
+        assert pdf_links == ['https://example.com/modal.pdf', 'https://example.com/after-submit.pdf']
+        self.mock_driver.execute_async_script.assert_called_once()
+        self.mock_driver.find_elements.assert_not_called()
+        self.mock_wait.until.assert_called_once()
+    
+    def test_handle_forms_and_modals_script_error(self):
+        """Test a failing form script yields no links"""
+        self.mock_driver.execute_async_script.side_effect = WebDriverException("script timeout")
+        
+        assert self.handler._handle_forms_and_modals() == []
     
     def test_javascript_execution(self):
         """Test direct JavaScript execution"""
@@ -281,17 +376,47 @@ class TestInteractivePageHandling:
         
         assert result is None  # Should return None on error
     
-    def test_wait_for_element_success(self):
+    @patch('browser.WebDriverWait')
+    def test_wait_for_element_success(self, mock_wait_class):
         """Test waiting for element to appear"""
+        mock_wait_class.return_value = self.mock_wait
         self.mock_wait.until.return_value = True
         
         result = self.handler.wait_for_element('.pdf-link', timeout=5)
         
         assert result is True
         self.mock_wait.until.assert_called_once()
+        
+        # The second wait with the same timeout reuses the first one
+        assert self.handler.wait_for_element('.other-link', timeout=5) is True
+        mock_wait_class.assert_called_once_with(
+            self.mock_driver, 5, poll_frequency=0.1, ignored_exceptions=(NoSuchElementException,)
+        )
+        assert self.mock_wait.until.call_count == 2
+    
+    @patch('browser.WebDriverWait')
+    def test_no_implicit_wait_during_explicit(self, mock_wait_class):
+        """Test the implicit wait is suspended while an explicit wait polls"""
+        calls = []
+        self.mock_driver.implicitly_wait.side_effect = lambda seconds: calls.append(('implicit', seconds))
+        mock_wait_class.return_value = self.mock_wait
+        self.mock_wait.until.side_effect = lambda condition: calls.append(('until', None)) or True
+        
+        self.handler.set_implicit_wait(3)
+        assert self.handler.wait_for_element('.pdf-link', timeout=5) is True
+        
+        assert calls == [('implicit', 3), ('implicit', 0), ('until', None), ('implicit', 3)]
+        
+        # Without an implicit wait there is nothing to suspend
+        self.handler.set_implicit_wait(0)
+        calls.clear()
+        self.handler.wait_for_element('.pdf-link', timeout=5)
+        assert calls == [('until', None)]
     
-    def test_wait_for_element_timeout(self):
+    @patch('browser.WebDriverWait')
+    def test_wait_for_element_timeout(self, mock_wait_class):
         """Test waiting for element that doesn't appear"""
+        mock_wait_class.return_value = self.mock_wait
         self.mock_wait.until.side_effect = TimeoutException("Element not found")
         
         result = self.handler.wait_for_element('.nonexistent-element', timeout=5)
@@ -388,10 +513,12 @@ class TestBrowserIntegrationWithCrawler:
     def test_browser_error_handling_in_crawler(self):
         """Test crawler handles browser errors gracefully"""
         with patch('crawler.BrowserHandler') as mock_browser_class:
-            # Mock browser that raises exception
-            mock_browser = Mock()
-            mock_browser.handle_interactive_page.side_effect = WebDriverException("Browser error")
-            mock_browser_class.return_value = mock_browser
+            # A real handler whose browser session has crashed, then a
+            # working replacement
+            crashed = started_handler(dead_driver())
+            replacement = started_handler(Mock())
+            replacement._collect_page_links = Mock(return_value=[])
+            mock_browser_class.side_effect = [crashed, replacement]
             
             with patch('crawler.URLDiscovery') as mock_discovery_class:
                 mock_discovery = Mock()
@@ -406,11 +533,26 @@ class TestBrowserIntegrationWithCrawler:
                     
                     crawler = PDFCrawler(self.config)
                     
+                    # Reach the browser fallback through standard discovery,
+                    # regardless of pages cached by earlier runs
+                    crawler.use_comprehensive_discovery = False
+                    
                     # Should handle browser error gracefully
-                    results = crawler.crawl(['js_dept'])
+                    with patch('crawler.time.sleep') as mock_sleep, \
+                         patch.object(crawler.discovery_cache, 'should_skip_page', return_value=False):
+                        results = crawler.crawl(['js_dept'])
                     
                     # Should still return results despite browser error
                     assert len(results.departments) == 1
+                    
+                    # The crashed browser was closed and the page retried once
+                    # on a fresh one, without a backoff sleep beyond the
+                    # normal request delay
+                    assert crashed.driver is None
+                    replacement._collect_page_links.assert_called_once()
+                    assert mock_browser_class.call_count == 2
+                    delay = self.config.settings.delay_between_requests
+                    assert all(c.args == (delay,) for c in mock_sleep.call_args_list)
 
 
 class TestBrowserCompatibility:
@@ -432,6 +574,195 @@ class TestBrowserCompatibility:
         # Should have options parameter
         assert 'options' in call_args.kwargs or len(call_args.args) > 0
     
+    @patch('browser.subprocess.Popen')
+    @patch('browser.webdriver.Chrome')
+    def test_chrome_options_shared_endpoint(self, mock_chrome, mock_popen):
+        """Test handlers attach to a shared browser instead of launching Chrome"""
+        mock_chrome.return_value = Mock()
+        
+        handlers = [BrowserHandler(cdp_endpoint='127.0.0.1:9222') for _ in range(2)]
+        for handler in handlers:
+            handler.start_browser()
+        
+        assert mock_chrome.call_count == 2
+        for call in mock_chrome.call_args_list:
+            options = call.kwargs['options']
+            assert options.debugger_address == '127.0.0.1:9222'
+            assert '--headless' not in options.arguments
+        
+        # Each handler works in its own tab; no Chrome process was spawned
+        assert mock_chrome.return_value.switch_to.new_window.call_count == 2
+        mock_popen.assert_not_called()
+        
+        handlers[1].close_browser()
+        mock_chrome.return_value.close.assert_called_once()
+    
+    @patch('browser.webdriver.Chrome')
+    def test_persistent_user_data_dir(self, mock_chrome, tmp_path):
+        """Test browsers keep a persistent profile, one per live browser"""
+        base = str(tmp_path)
+        
+        def profile_argument(call):
+            return [arg for arg in call.kwargs['options'].arguments if arg.startswith('--user-data-dir=')]
+        
+        first = BrowserHandler(user_data_dir=base)
+        second = BrowserHandler(user_data_dir=base)
+        first.start_browser()
+        second.start_browser()
+        
+        assert profile_argument(mock_chrome.call_args_list[0]) == [f'--user-data-dir={os.path.join(base, "profile-0")}']
+        assert profile_argument(mock_chrome.call_args_list[1]) == [f'--user-data-dir={os.path.join(base, "profile-1")}']
+        
+        # A restarted browser picks the freed profile, and its cache, back up
+        first.close_browser()
+        BrowserHandler(user_data_dir=base).start_browser()
+        assert profile_argument(mock_chrome.call_args_list[2]) == [f'--user-data-dir={os.path.join(base, "profile-0")}']
+        
+        # Profiles locked by a Chrome in another process are skipped
+        second.close_browser()
+        os.makedirs(os.path.join(base, 'profile-1'))
+        os.symlink('other-host-1234', os.path.join(base, 'profile-1', 'SingletonLock'))
+        BrowserHandler(user_data_dir=base).start_browser()
+        assert profile_argument(mock_chrome.call_args_list[3]) == [f'--user-data-dir={os.path.join(base, "profile-2")}']
+        
+        BrowserHandler(user_data_dir=None).start_browser()
+        assert profile_argument(mock_chrome.call_args_list[4]) == []
+    
+    def test_stale_profile_lock_is_reclaimed(self, tmp_path):
+        """Test a lock left by a dead Chrome on this host doesn't retire its profile"""
+        import socket
+        import subprocess
+        import sys
+        from browser import _claim_profile, _release_profile
+        
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        
+        stale_lock = tmp_path / 'profile-0' / 'SingletonLock'
+        live_lock = tmp_path / 'profile-1' / 'SingletonLock'
+        for lock, pid in ((stale_lock, exited.pid), (live_lock, os.getpid())):
+            lock.parent.mkdir()
+            os.symlink(f'{socket.gethostname()}-{pid}', lock)
+        
+        profile = _claim_profile(str(tmp_path))
+        try:
+            assert profile == str(tmp_path / 'profile-0')
+            assert not os.path.lexists(stale_lock)
+            assert os.path.lexists(live_lock)
+            
+            # A lock held by a live process still keeps its profile reserved
+            second = _claim_profile(str(tmp_path))
+            assert second == str(tmp_path / 'profile-2')
+            _release_profile(second)
+        finally:
+            _release_profile(profile)
+    
+    @patch('browser.webdriver.Chrome')
+    def test_canonical_script_registered_once(self, mock_chrome):
+        """Test page scripts are injected once per driver and then called by name"""
+        from selenium.common.exceptions import JavascriptException
+        
+        mock_driver = mock_chrome.return_value
+        handler = BrowserHandler(headless=True)
+        handler.start_browser()
+        handler.start_browser()
+        
+        mock_driver.execute_cdp_cmd.assert_called_once()
+        command, params = mock_driver.execute_cdp_cmd.call_args.args
+        assert command == 'Page.addScriptToEvaluateOnNewDocument'
+        assert 'window.__hkpdf' in params['source']
+        
+        mock_driver.execute_script.return_value = ['https://example.com/doc.pdf']
+        assert handler._find_existing_pdf_links() == ['https://example.com/doc.pdf']
+        script, css = mock_driver.execute_script.call_args_list[0].args
+        assert script == 'return window.__hkpdf.linkHrefs.apply(null, arguments);'
+        assert css == PDF_LINK_CSS
+        
+        # Documents without the helpers get the full script
+        mock_driver.execute_script.reset_mock()
+        mock_driver.execute_script.side_effect = [
+            JavascriptException("window.__hkpdf is undefined"), ['https://example.com/doc.pdf']
+        ]
+        assert handler._find_existing_pdf_links() == ['https://example.com/doc.pdf']
+        assert 'querySelectorAll' in mock_driver.execute_script.call_args_list[1].args[0]
+    
+    @patch('browser.webdriver.Chrome')
+    def test_client_config_pool_size(self, mock_chrome):
+        """Test the WebDriver connection pool is sized from pool_size"""
+        from selenium.webdriver.remote.client_config import ClientConfig
+        from selenium.webdriver.remote.remote_connection import RemoteConnection
+        
+        executor = RemoteConnection(client_config=ClientConfig('http://127.0.0.1:9515'))
+        mock_chrome.return_value = Mock(command_executor=executor)
+        
+        handler = BrowserHandler(pool_size=8)
+        handler.start_browser()
+        
+        assert executor.client_config.init_args_for_pool_manager == {
+            "init_args_for_pool_manager": {"maxsize": 8}
+        }
+        assert executor._conn.connection_pool_kw['maxsize'] == 8
+    
+    @patch('browser.webdriver.Chrome')
+    def test_client_config_pool_size_degrades_gracefully(self, mock_chrome):
+        """Test a Selenium without the private pool hooks keeps its default pool"""
+        from selenium.webdriver.remote.client_config import ClientConfig
+        from selenium.webdriver.remote.remote_connection import RemoteConnection
+        
+        executor = RemoteConnection(client_config=ClientConfig('http://127.0.0.1:9515'))
+        default_pool = executor._conn
+        mock_chrome.return_value = Mock(command_executor=executor)
+        
+        with patch.object(RemoteConnection, '_get_connection_manager', side_effect=AttributeError('gone')):
+            handler = BrowserHandler(pool_size=8)
+            handler.start_browser()
+        
+        assert handler.driver is mock_chrome.return_value
+        assert executor._conn is default_pool
+        
+        with patch('browser.ClientConfig', None):
+            BrowserHandler(pool_size=8).start_browser()
+    
+    def test_driver_paths_reused_across_starts(self):
+        """Test only the first browser start looks up chromedriver and Chrome"""
+        def start_chrome(options, service=None):
+            # Selenium records the browser it found in the options
+            if service is None:
+                options.binary_location = '/opt/chrome/chrome'
+            driver = Mock()
+            driver.service.path = service.path if service else '/opt/chrome/chromedriver'
+            return driver
+        
+        with patch.dict('browser._CHROME_PATHS', clear=True), \
+             patch('browser.webdriver.Chrome', side_effect=start_chrome) as mock_chrome:
+            BrowserHandler(headless=True).start_browser()
+            BrowserHandler(headless=True).start_browser()
+        
+        first, second = mock_chrome.call_args_list
+        assert 'service' not in first.kwargs
+        assert second.kwargs['service'].path == '/opt/chrome/chromedriver'
+        assert second.kwargs['options'].binary_location == '/opt/chrome/chrome'
+        
+        # Each start gets its own options object
+        assert first.kwargs['options'] is not second.kwargs['options']
+    
+    @patch('browser.urlopen')
+    @patch('browser.shutil.which', return_value='/usr/bin/google-chrome')
+    @patch('browser.subprocess.Popen')
+    def test_launch_shared_chrome(self, mock_popen, mock_which, mock_urlopen):
+        """Test the shared Chrome is launched once with remote debugging"""
+        from browser import launch_shared_chrome
+        
+        endpoint, process = launch_shared_chrome(port=9333, user_data_dir='/tmp/profile')
+        
+        assert endpoint == '127.0.0.1:9333'
+        assert process is mock_popen.return_value
+        command = mock_popen.call_args.args[0]
+        assert command[0] == '/usr/bin/google-chrome'
+        assert '--remote-debugging-port=9333' in command
+        assert '--user-data-dir=/tmp/profile' in command
+        mock_urlopen.assert_called_once()
+    
     @patch('browser.webdriver.Chrome')
     def test_headless_vs_gui_mode(self, mock_chrome):
         """Test difference between headless and GUI mode"""
@@ -489,7 +820,7 @@ class TestJavaScriptHeavyPages:
         # Mock initial page load with no PDFs
         self.mock_driver.find_elements.side_effect = [
             [],  # No PDFs initially
-            [Mock()],  # PDFs appear after JavaScript execution
+            [FakeElement("https://dynamic.example.com/loaded.pdf")],  # PDFs appear after JavaScript execution
         ]
         
         # Mock JavaScript execution
@@ -528,8 +859,7 @@ class TestJavaScriptHeavyPages:
         self.mock_driver.execute_script.return_value = None
         
         # Mock finding elements after SPA navigation
-        mock_pdf_link = Mock()
-        mock_pdf_link.get_attribute.return_value = "https://spa.example.com/api/document.pdf"
+        mock_pdf_link = FakeElement("https://spa.example.com/api/document.pdf")
         self.mock_driver.find_elements.return_value = [mock_pdf_link]
         
         pdf_links = self.handler.handle_interactive_page(test_url)
@@ -581,6 +911,50 @@ class TestBrowserPerformance:
         # Should reuse the same driver instance
         assert mock_driver.get.call_count == len(urls)
     
+    def test_multiple_pages_in_tabs(self):
+        """Test several pages are opened in tabs up front and processed in turn"""
+        import json
+        from unittest.mock import PropertyMock
+        
+        handler = BrowserHandler(headless=True)
+        mock_driver = Mock()
+        handler.driver = mock_driver
+        handler.wait = Mock()
+        
+        handles = ['main']
+        current = ['main']
+        
+        def open_tab(script, *args):
+            if 'window.open' in script:
+                handles.append(f'tab-{len(handles)}')
+        
+        mock_driver.execute_script.side_effect = open_tab
+        type(mock_driver).window_handles = PropertyMock(side_effect=lambda: list(handles))
+        mock_driver.current_window_handle = 'main'
+        mock_driver.switch_to.window.side_effect = lambda handle: current.__setitem__(0, handle)
+        mock_driver.execute_async_script.side_effect = lambda script, *args: [f'https://example.com/{current[0]}.pdf']
+        mock_driver.find_elements.return_value = []
+        
+        sniffed = {'webview': 'tab-2', 'message': {
+            'method': 'Network.responseReceived',
+            'params': {'response': {'url': 'https://example.com/sniffed.pdf', 'mimeType': 'application/pdf'}},
+        }}
+        mock_driver.get_log.side_effect = [[], [{'message': json.dumps(sniffed)}]]
+        
+        results = handler.handle_interactive_pages([
+            'https://example1.com/page.html', 'https://example2.com/page.html'
+        ])
+        
+        assert results == {
+            'https://example1.com/page.html': ['https://example.com/tab-1.pdf'],
+            'https://example2.com/page.html': ['https://example.com/tab-2.pdf', 'https://example.com/sniffed.pdf'],
+        }
+        
+        # Both tabs were opened before either was processed, then closed
+        mock_driver.get.assert_not_called()
+        assert mock_driver.close.call_count == 2
+        assert current[0] == 'main'
+    
     @patch('time.sleep')
     def test_page_load_timing(self, mock_sleep):
         """Test page load timing and delays"""
@@ -596,8 +970,185 @@ class TestBrowserPerformance:
         
         handler.handle_interactive_page('https://example.com/slow-page.html')
         
-        # Should include appropriate delays
-        mock_sleep.assert_called()
+        # Should wait for the body and then for the document to finish loading
+        assert mock_wait.until.call_count == 2
+        
+        # The readiness condition checks document.readyState
+        ready_condition = mock_wait.until.call_args_list[1][0][0]
+        mock_driver.execute_script.return_value = 'complete'
+        assert ready_condition(mock_driver)
+        mock_driver.execute_script.return_value = 'loading'
+        assert not ready_condition(mock_driver)
+    
+    def test_pdf_href_filtering(self):
+        """Test PDF link classification of the hrefs returned by the page script"""
+        from browser import _filter_pdf_hrefs, _is_pdf_url_path
+        
+        hrefs = [
+            'https://example.gov.hk/docs/a.PDF',
+            'https://example.gov.hk/docs/b.html',
+            'https://example.gov.hk/Download?id=1',
+            None,
+            42,
+        ]
+        
+        assert _filter_pdf_hrefs(hrefs) == [
+            'https://example.gov.hk/docs/a.PDF', 'https://example.gov.hk/Download?id=1'
+        ]
+        
+        assert _is_pdf_url_path('https://example.gov.hk/a.pdf?version=2#page=3')
+        assert not _is_pdf_url_path('https://example.gov.hk/a.pdf/view')
+
+
+def dead_driver() -> Mock:
+    """A WebDriver stub whose browser session has died"""
+    driver = Mock()
+    driver.get.side_effect = InvalidSessionIdException("invalid session id")
+    type(driver).window_handles = PropertyMock(side_effect=InvalidSessionIdException("invalid session id"))
+    return driver
+
+
+def started_handler(driver: Mock) -> BrowserHandler:
+    """A real BrowserHandler attached to a stubbed WebDriver"""
+    handler = BrowserHandler(headless=True)
+    handler.driver = driver
+    handler.wait = Mock()
+    return handler
+
+
+class TestBrowserPool:
+    """Test reuse and recycling of pooled browser handlers"""
+    
+    @patch('browser.WebDriverWait')
+    @patch('browser.webdriver.Chrome')
+    def test_pool_reuses_driver_across_urls(self, mock_chrome, mock_wait_class):
+        """Test one browser serves several pages when they run one at a time"""
+        mock_chrome.return_value.execute_async_script.return_value = []
+        mock_chrome.return_value.find_elements.return_value = []
+        pool = BrowserPool(size=2)
+        
+        for i in range(3):
+            with pool.handler() as handler:
+                handler.handle_interactive_page(f'https://example.com/page{i}.html')
+        
+        assert mock_chrome.call_count == 1
+        assert pool.close() == 1
+        mock_chrome.return_value.quit.assert_called_once()
+    
+    def test_pool_recycles_on_error(self):
+        """Test a handler whose WebDriver fails is closed and replaced"""
+        broken, fresh = Mock(), Mock()
+        broken.handle_interactive_page.side_effect = WebDriverException("session deleted")
+        factory = Mock(side_effect=[broken, fresh])
+        pool = BrowserPool(size=1, factory=factory)
+        
+        with pytest.raises(WebDriverException):
+            with pool.handler() as handler:
+                handler.handle_interactive_page('https://example.com/a.html')
+        
+        broken.close_browser.assert_called_once()
+        with pool.handler() as handler:
+            assert handler is fresh
+        assert factory.call_count == 2
+    
+    def test_pool_discards_real_handler_with_dead_session(self):
+        """Test a real handler whose browser crashed raises and is replaced"""
+        dead, fresh = started_handler(dead_driver()), started_handler(Mock())
+        pool = BrowserPool(size=1, factory=Mock(side_effect=[dead, fresh]))
+        
+        with pytest.raises(WebDriverException):
+            with pool.handler() as handler:
+                handler.handle_interactive_page('https://example.com/a.html')
+        
+        assert dead.driver is None
+        with pool.handler() as handler:
+            assert handler is fresh
+    
+    def test_page_error_with_live_session_keeps_handler(self):
+        """Test a page that fails to load is skipped without recycling the browser"""
+        driver = Mock()
+        driver.get.side_effect = TimeoutException("page load timed out")
+        live = started_handler(driver)
+        factory = Mock(side_effect=[live])
+        pool = BrowserPool(size=1, factory=factory)
+        
+        with pool.handler() as handler:
+            assert handler.handle_interactive_page('https://example.com/slow.html') == []
+        with pool.handler() as handler:
+            assert handler is live
+        assert factory.call_count == 1
+    
+    def test_idle_handler_health_checked_on_checkout(self):
+        """Test an idle browser that died between pages isn't handed out again"""
+        driver = Mock()
+        crashed, fresh = started_handler(driver), started_handler(Mock())
+        pool = BrowserPool(size=1, factory=Mock(side_effect=[crashed, fresh]))
+        
+        with pool.handler():
+            pass
+        type(driver).window_handles = PropertyMock(side_effect=WebDriverException("chrome not reachable"))
+        
+        with pool.handler() as handler:
+            assert handler is fresh
+        driver.quit.assert_called_once()
+    
+    def test_wait_healthy_after_replacement(self):
+        """Test waiters are released as soon as a failed handler's slot frees up"""
+        import threading
+        
+        broken = Mock()
+        pool = BrowserPool(size=1, factory=Mock(return_value=broken))
+        handler = pool.acquire()
+        
+        assert pool.wait_healthy(timeout=0.01) is False
+        
+        releaser = threading.Timer(0.05, pool.release, args=(handler,), kwargs={'discard': True})
+        releaser.start()
+        assert pool.wait_healthy(timeout=5) is True
+        releaser.join()
+        broken.close_browser.assert_called_once()
+    
+    def test_wait_healthy_replaces_dead_idle_handler(self):
+        """Test wait_healthy closes a dead idle browser and starts a replacement"""
+        driver = Mock()
+        crashed = started_handler(driver)
+        fresh = BrowserHandler(headless=True)
+        fresh.start_browser = Mock()
+        pool = BrowserPool(size=1, factory=Mock(side_effect=[crashed, fresh]))
+        
+        with pool.handler():
+            pass
+        type(driver).window_handles = PropertyMock(side_effect=WebDriverException("chrome not reachable"))
+        
+        assert pool.wait_healthy(timeout=1) is True
+        driver.quit.assert_called_once()
+        fresh.start_browser.assert_called_once()
+        with pool.handler() as handler:
+            assert handler is fresh
+    
+    def test_wait_healthy_fails_when_replacement_cannot_start(self):
+        """Test wait_healthy reports failure when a new browser won't start"""
+        fresh = BrowserHandler(headless=True)
+        fresh.start_browser = Mock(side_effect=WebDriverException("chrome failed to start"))
+        pool = BrowserPool(size=1, factory=Mock(return_value=fresh))
+        
+        assert pool.wait_healthy(timeout=1) is False
+        assert pool._idle.empty()
+        assert pool.wait_healthy(timeout=0.01) is False
+    
+    def test_pool_recycles_after_max_uses(self):
+        """Test handlers are replaced after serving max_uses pages"""
+        factory = Mock(side_effect=lambda: Mock())
+        pool = BrowserPool(size=1, max_uses=2, factory=factory)
+        
+        handlers = []
+        for _ in range(3):
+            with pool.handler() as handler:
+                handlers.append(handler)
+        
+        assert handlers[0] is handlers[1]
+        assert handlers[2] is not handlers[0]
+        handlers[0].close_browser.assert_called_once()
 
 
 if __name__ == "__main__":
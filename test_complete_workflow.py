@@ -6,20 +6,23 @@ This test validates the entire crawling workflow using both input methods
 and ensures all components work together correctly.
 """
 
+import io
 import os
 import sys
 import tempfile
+import threading
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import pytest
 
-# Add the project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from config import load_config, create_config_from_markdown
+from config import load_config_from_string, create_config_from_markdown_string
 from crawler import PDFCrawler
 from utils import setup_logging
 
+pytestmark = pytest.mark.existing
+
 
 def create_test_markdown():
     """Create a test markdown file with sample URLs"""
@@ -75,12 +78,8 @@ def test_markdown_parsing():
     """Test markdown file parsing"""
     print("Testing markdown parsing...")
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-        f.write(create_test_markdown())
-        markdown_file = f.name
-    
     try:
-        config = create_config_from_markdown(markdown_file)
+        config = create_config_from_markdown_string(create_test_markdown())
         
         # Validate configuration
         assert len(config.departments) >= 2, "Should parse at least 2 departments"
@@ -97,20 +96,14 @@ def test_markdown_parsing():
     except Exception as e:
         print(f"❌ Markdown parsing test failed: {e}")
         return False
-    finally:
-        os.unlink(markdown_file)
 
 
 def test_yaml_parsing():
     """Test YAML configuration parsing"""
     print("Testing YAML parsing...")
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        f.write(create_test_yaml())
-        yaml_file = f.name
-    
     try:
-        config = load_config(yaml_file)
+        config = load_config_from_string(create_test_yaml())
         
         # Validate configuration
         assert len(config.departments) == 2, "Should parse exactly 2 departments"
@@ -123,20 +116,14 @@ def test_yaml_parsing():
     except Exception as e:
         print(f"❌ YAML parsing test failed: {e}")
         return False
-    finally:
-        os.unlink(yaml_file)
 
 
 def test_dry_run_analysis():
     """Test dry-run analysis functionality"""
     print("Testing dry-run analysis...")
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        f.write(create_test_yaml())
-        yaml_file = f.name
-    
     try:
-        config = load_config(yaml_file)
+        config = load_config_from_string(create_test_yaml())
         crawler = PDFCrawler(config)
         
         # Run dry-run analysis
@@ -157,8 +144,6 @@ def test_dry_run_analysis():
     except Exception as e:
         print(f"❌ Dry-run analysis test failed: {e}")
         return False
-    finally:
-        os.unlink(yaml_file)
 
 
 def test_file_utilities():
@@ -229,32 +214,20 @@ def test_configuration_validation():
     
     try:
         # Test invalid YAML
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("invalid: yaml: content:")
-            invalid_yaml = f.name
-        
         try:
-            load_config(invalid_yaml)
+            load_config_from_string("invalid: yaml: content:")
             print("❌ Should have failed on invalid YAML")
             return False
         except Exception:
             pass  # Expected to fail
-        finally:
-            os.unlink(invalid_yaml)
         
         # Test missing departments
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("settings:\n  delay_between_requests: 1.0")
-            no_deps_yaml = f.name
-        
         try:
-            load_config(no_deps_yaml)
+            load_config_from_string("settings:\n  delay_between_requests: 1.0")
             print("❌ Should have failed on missing departments")
             return False
         except ValueError:
             pass  # Expected to fail
-        finally:
-            os.unlink(no_deps_yaml)
         
         print("✅ Configuration validation test passed")
         return True
@@ -329,6 +302,37 @@ def test_json_operations():
         return False
 
 
+class _ThreadOutput:
+    """sys.stdout stand-in that sends each test thread's prints to its own buffer"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    def _target(self):
+        return getattr(self._local, 'buffer', self.stream)
+    
+    def write(self, text):
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+
+
+def _run_captured(test, output: _ThreadOutput):
+    """Run one test with its output captured, returning (passed, output)"""
+    buffer = output._local.buffer = io.StringIO()
+    try:
+        try:
+            passed = bool(test())
+        except Exception as e:
+            print(f"❌ Test {test.__name__} crashed: {e}")
+            passed = False
+        return passed, buffer.getvalue()
+    finally:
+        del output._local.buffer
+
+
 def run_all_tests():
     """Run all tests and report results"""
     print("="*60)
@@ -351,16 +355,23 @@ def run_all_tests():
     passed = 0
     failed = 0
     
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            print(f"❌ Test {test.__name__} crashed: {e}")
+    # The tests are independent and mostly wait on I/O, so they run in
+    # parallel; each one's output is printed together, in the order above
+    output = _ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(tests), os.cpu_count() or 4)) as executor:
+            futures = [executor.submit(_run_captured, test, output) for test in tests]
+            results = [future.result() for future in futures]
+    finally:
+        sys.stdout = output.stream
+    
+    for test_passed, test_output in results:
+        print(test_output)
+        if test_passed:
+            passed += 1
+        else:
             failed += 1
-        print()
     
     print("="*60)
     print("TEST RESULTS")
@@ -14,12 +14,15 @@ import tempfile
 import os
 from unittest.mock import Mock
 import requests_mock
+import pytest
 
 from concurrency import SimpleConcurrency
 from downloader import FileDownloader
 from config import StorageConfig
 from crawler import DownloadResult
 
+pytestmark = pytest.mark.existing
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -7,13 +7,17 @@ using mock URLs and a simple test setup.
 
 import time
 import logging
+import threading
 from unittest.mock import Mock, MagicMock
 from typing import List
+import pytest
 
 from concurrency import SimpleConcurrency
 from crawler import DownloadResult
 from config import StorageConfig
 
+pytestmark = pytest.mark.existing
+
 
 # Configure logging for testing
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -156,6 +160,41 @@ def test_rate_limiting():
     print("✓ Rate limiting test passed")
 
 
+def test_same_domain_downloads_overlap():
+    """Test rate limiting spaces request starts without serializing downloads"""
+    print("\n=== Testing Same-Domain Overlap ===")
+    
+    same_domain_urls = [
+        "https://example.com/doc1.pdf",
+        "https://example.com/doc2.pdf"
+    ]
+    
+    active = 0
+    max_active = 0
+    counter_lock = threading.Lock()
+    
+    def slow_download(url: str, department: str):
+        nonlocal active, max_active
+        with counter_lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(1.5)  # Longer than the per-domain request gap
+        with counter_lock:
+            active -= 1
+        return DownloadResult(url=url, success=True, file_size=1024)
+    
+    mock_downloader = Mock()
+    mock_downloader.download_pdf = slow_download
+    concurrency = SimpleConcurrency(max_workers=2)
+    
+    results = concurrency.download_pdfs_concurrently(same_domain_urls, "test_department", mock_downloader)
+    
+    assert all(r.success for r in results)
+    assert max_active == 2, "Second download should start while the first is still running"
+    
+    print("✓ Same-domain overlap test passed")
+
+
 def test_retry_logic():
     """Test retry logic with exponential backoff"""
     print("\n=== Testing Retry Logic ===")
@@ -225,6 +264,37 @@ def test_concurrency_stats():
     print("✓ Concurrency stats test passed")
 
 
+def test_duplicate_urls_downloaded_once():
+    """Test duplicate URLs are scheduled once and results follow input order"""
+    test_urls = [
+        "https://domain1.com/b.pdf",
+        "https://domain2.com/a.pdf",
+        "https://domain1.com/b.pdf",
+        "https://domain2.com/a.pdf",
+    ]
+    
+    mock_downloader = MockDownloader(simulate_delays=False)
+    concurrency = SimpleConcurrency(max_workers=2)
+    
+    results = concurrency.download_pdfs_concurrently(test_urls, "test_department", mock_downloader)
+    
+    assert mock_downloader.download_count == 2
+    assert [r.url for r in results] == ["https://domain1.com/b.pdf", "https://domain2.com/a.pdf"]
+
+
+def test_direct_rate_limited_download_tracks_domain():
+    """Test calling download_with_rate_limit without a precomputed domain"""
+    mock_downloader = MockDownloader(simulate_delays=False)
+    concurrency = SimpleConcurrency(max_workers=2)
+    
+    result = concurrency.download_with_rate_limit("https://domain1.com:8443/doc.pdf", "test_department", mock_downloader)
+    concurrency.download_pdfs_concurrently(["https://domain1.com:8443/other.pdf"], "test_department", mock_downloader)
+    
+    assert result.success
+    assert concurrency.get_stats()['active_domains'] == ["domain1.com:8443"]
+    assert mock_downloader.download_count == 2
+
+
 def main():
     """Run all concurrency tests"""
     print("Starting SimpleConcurrency tests...")
@@ -232,6 +302,7 @@ def main():
     try:
         test_basic_concurrent_download()
         test_rate_limiting()
+        test_same_domain_downloads_overlap()
         test_retry_logic()
         test_empty_url_list()
         test_concurrency_stats()
@@ -10,11 +10,14 @@ import logging
 import tempfile
 import os
 from pathlib import Path
+import pytest
 
 from config import CrawlConfig, DepartmentConfig, CrawlSettings, StorageConfig
 from crawler import PDFCrawler
 from utils import setup_logging
 
+pytestmark = pytest.mark.existing
+
 
 def test_crawler_integration():
     """Test end-to-end crawling with a single department"""
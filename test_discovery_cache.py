@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Tests for the discovery cache used by incremental crawls
+
+Covers PDF/page caching, new-PDF filtering, statistics, cleanup and
+migration of the legacy JSON cache files.
+"""
+
+import json
+import os
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from discovery_cache import DiscoveryCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a discovery cache in a temporary directory"""
+    discovery_cache = DiscoveryCache(cache_dir=str(tmp_path))
+    yield discovery_cache
+    discovery_cache.close()
+
+
+def test_cache_discovered_pdfs(cache):
+    """Test that cached PDFs are reported as cached"""
+    cache.cache_discovered_pdfs(['https://example.gov.hk/a.pdf'], 'Test Department')
+
+    assert cache.is_pdf_cached('https://example.gov.hk/a.pdf')
+    assert not cache.is_pdf_cached('https://example.gov.hk/b.pdf')
+
+
+def test_get_new_pdfs_only(cache):
+    """Test filtering of previously discovered PDFs"""
+    cache.cache_discovered_pdfs(['https://example.gov.hk/a.pdf'], 'Test Department')
+
+    new_pdfs = cache.get_new_pdfs_only([
+        'https://example.gov.hk/a.pdf',
+        'https://example.gov.hk/b.pdf'
+    ])
+
+    assert new_pdfs == ['https://example.gov.hk/b.pdf']
+
+
+def test_page_crawl_tracking(cache):
+    """Test recently crawled pages are skipped"""
+    page_url = 'https://example.gov.hk/index.html'
+    assert not cache.should_skip_page(page_url)
+
+    cache.cache_page_crawl(page_url, 3)
+    cache.cache_page_crawl(page_url, 4)
+
+    assert cache.should_skip_page(page_url)
+    assert cache.get_cache_stats()['total_cached_pages'] == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Test cache contents survive reopening the database"""
+    first = DiscoveryCache(cache_dir=str(tmp_path))
+    first.cache_discovered_pdfs(['https://example.gov.hk/a.pdf'], 'Test Department')
+    first.close()
+
+    second = DiscoveryCache(cache_dir=str(tmp_path))
+    try:
+        assert second.is_pdf_cached('https://example.gov.hk/a.pdf')
+    finally:
+        second.close()
+
+
+def test_cleanup_old_entries(cache):
+    """Test expired entries are removed and fresh ones kept"""
+    cache.cache_discovered_pdfs(['https://example.gov.hk/old.pdf'], 'Test Department')
+    cache.cache_page_crawl('https://example.gov.hk/old.html', 1)
+
+    # Age the existing entries by 40 days
+    old_time = time.time() - 40 * 24 * 3600
+    with cache.conn:
+        cache.conn.execute("UPDATE pdf_cache SET last_seen = ?", (old_time,))
+        cache.conn.execute("UPDATE page_cache SET last_crawled = ?", (old_time,))
+
+    cache.cache_discovered_pdfs(['https://example.gov.hk/new.pdf'], 'Test Department')
+
+    assert cache.cleanup_old_entries(max_age_days=30) == (1, 1)
+    assert not cache.is_pdf_cached('https://example.gov.hk/old.pdf')
+    assert cache.is_pdf_cached('https://example.gov.hk/new.pdf')
+
+
+def test_cache_stats(cache):
+    """Test cache statistics"""
+    cache.cache_discovered_pdfs(
+        ['https://example.gov.hk/a.pdf', 'https://example.gov.hk/b.pdf'], 'Test Department'
+    )
+
+    stats = cache.get_cache_stats()
+
+    assert stats['total_cached_pdfs'] == 2
+    assert stats['recent_pdfs'] == 2
+    assert stats['total_cached_pages'] == 0
+    assert stats['cache_age_hours'] < 1
+
+
+def test_legacy_json_cache_migration(tmp_path):
+    """Test entries from the old JSON cache files are imported"""
+    import hashlib
+
+    pdf_url = 'https://example.gov.hk/legacy.pdf'
+    now = time.time()
+    legacy_cache = {
+        hashlib.md5(pdf_url.encode()).hexdigest(): {
+            'url': pdf_url,
+            'discovered_time': now,
+            'source_page': 'Test Department',
+            'last_seen': now
+        }
+    }
+    with open(os.path.join(tmp_path, 'discovery_cache.json'), 'w') as f:
+        json.dump(legacy_cache, f)
+
+    cache = DiscoveryCache(cache_dir=str(tmp_path))
+    try:
+        assert cache.is_pdf_cached(pdf_url)
+        assert not os.path.exists(os.path.join(tmp_path, 'discovery_cache.json'))
+    finally:
+        cache.close()
+
+
+def test_cleanup_uses_age_index(cache):
+    """Test cleanup deletes through the age indexes instead of a table scan"""
+    pdf_plan = cache.conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM pdf_cache WHERE last_seen < ?", (0,)
+    ).fetchall()
+    page_plan = cache.conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM page_cache WHERE last_crawled < ?", (0,)
+    ).fetchall()
+
+    assert any('pdf_cache_last_seen' in row[-1] for row in pdf_plan)
+    assert any('page_cache_last_crawled' in row[-1] for row in page_plan)
+
+
+def test_cache_stats_with_aged_entries(cache):
+    """Test recent counts and cache age when some entries are old"""
+    cache.cache_discovered_pdfs(['https://example.gov.hk/old.pdf'], 'Test Department')
+    old_time = time.time() - 48 * 3600
+    with cache.conn:
+        cache.conn.execute("UPDATE pdf_cache SET discovered = ?, last_seen = ?", (old_time, old_time))
+    cache.cache_discovered_pdfs(['https://example.gov.hk/new.pdf'], 'Test Department')
+
+    stats = cache.get_cache_stats()
+
+    assert stats['total_cached_pdfs'] == 2
+    assert stats['recent_pdfs'] == 1
+    assert 47.9 < stats['cache_age_hours'] < 48.1
+
+
+def test_empty_batches_do_not_write(cache):
+    """Test that empty inputs return before touching the database"""
+    conn = MagicMock()
+
+    with patch.object(cache, 'conn', conn):
+        cache.cache_discovered_pdfs([], 'Test Department')
+        assert cache.get_new_pdfs_only([]) == []
+
+    conn.executemany.assert_not_called()
+    conn.execute.assert_not_called()
+    conn.commit.assert_not_called()
+    conn.__enter__.assert_not_called()
+
+
+def test_corrupt_legacy_cache_is_logged(tmp_path, caplog, capsys):
+    """Test unreadable legacy caches are reported via logging, not stdout"""
+    with open(os.path.join(tmp_path, 'discovery_cache.json'), 'w') as f:
+        f.write('{not valid json')
+
+    with caplog.at_level('WARNING', logger='discovery_cache'):
+        cache = DiscoveryCache(cache_dir=str(tmp_path))
+    cache.close()
+
+    assert 'Could not load cache' in caplog.text
+    assert capsys.readouterr().out == ''
+
+
+def test_get_new_pdfs_only_large_batch(cache):
+    """Test filtering across more URLs than fit in one SQL batch"""
+    cached_urls = [f'https://example.gov.hk/cached-{i}.pdf' for i in range(1200)]
+    new_urls = [f'https://example.gov.hk/new-{i}.pdf' for i in range(300)]
+    cache.cache_discovered_pdfs(cached_urls, 'Test Department')
+
+    old_time = time.time() - 3600
+    with cache.conn:
+        cache.conn.execute("UPDATE pdf_cache SET last_seen = ?", (old_time,))
+
+    result = cache.get_new_pdfs_only(cached_urls + new_urls)
+
+    assert result == new_urls
+    stale, = cache.conn.execute(
+        "SELECT COUNT(*) FROM pdf_cache WHERE last_seen = ?", (old_time,)
+    ).fetchone()
+    assert stale == 0
+
+
+def test_analysis_cache_round_trip(tmp_path):
+    """Test dry-run analyses are cached by department and seed URLs"""
+    from discovery_cache import AnalysisCache
+    from models import DepartmentAnalysis
+
+    analysis_cache = AnalysisCache(cache_dir=str(tmp_path))
+    analysis = DepartmentAnalysis(
+        department='Test Department', seed_urls_accessible=2, seed_urls_total=2,
+        estimated_pdfs=7, requires_browser=False, rate_limit_detected=False, issues=[]
+    )
+    key = AnalysisCache.make_key('Test Department', ['https://b.gov.hk', 'https://a.gov.hk'])
+
+    assert analysis_cache.get(key) is None
+    analysis_cache.put(key, analysis)
+
+    assert analysis_cache.get(key) == analysis
+    assert key == AnalysisCache.make_key('Test Department', ['https://a.gov.hk', 'https://b.gov.hk'])
+    assert key != AnalysisCache.make_key('Test Department', ['https://a.gov.hk'])
+    assert analysis_cache.get(key, max_age_hours=0) is None
+    assert analysis_cache.clear() == 1
+    assert analysis_cache.get(key) is None
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+Tests for the PDF download and storage pipeline
+
+Covers streaming downloads, validation and local storage in FileDownloader
+using mocked HTTP responses.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from unittest.mock import Mock, PropertyMock, patch
+
+import pytest
+import requests
+import responses
+
+from config import StorageConfig
+from downloader import (
+    FileDownloader, DOWNLOAD_CHUNK_SIZE, MULTIPART_THRESHOLD, S3_UPLOAD_QUEUE_SIZE, S3_UPLOAD_WORKERS
+)
+
+pytestmark = pytest.mark.unit
+
+
+PDF_URL = 'https://example.gov.hk/docs/report.pdf'
+
+
+def make_pdf(size: int) -> bytes:
+    """Build PDF-looking content of roughly the given size"""
+    header = b'%PDF-1.4\n'
+    trailer = b'\n%%EOF'
+    return header + b'x' * max(size - len(header) - len(trailer), 100) + trailer
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    """Create a local-only downloader in a temporary directory"""
+    config = StorageConfig(local_path=str(tmp_path), organize_by_department=True, s3_enabled=False)
+    return FileDownloader(config)
+
+
+@pytest.fixture
+def s3_downloader(tmp_path):
+    """Create a downloader with a mocked S3 client"""
+    config = StorageConfig(
+        local_path=str(tmp_path), organize_by_department=True,
+        s3_enabled=True, s3_bucket='test-bucket'
+    )
+    with patch('downloader.boto3.client') as mock_boto3_client:
+        mock_boto3_client.return_value = Mock()
+        yield FileDownloader(config)
+
+
+@responses.activate
+def test_download_spanning_many_chunks(downloader):
+    """Test a body larger than one read chunk is saved intact"""
+    pdf_content = make_pdf(DOWNLOAD_CHUNK_SIZE * 3 + 17)
+    responses.add(responses.HEAD, PDF_URL, headers={'content-type': 'application/pdf'})
+    responses.add(responses.GET, PDF_URL, body=pdf_content)
+
+    result = downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert result.success is True
+    assert result.file_size == len(pdf_content)
+    with open(result.file_path, 'rb') as f:
+        assert f.read() == pdf_content
+
+
+@responses.activate
+def test_download_never_buffers_whole_body(downloader):
+    """Test downloads stream gzip-encoded bodies without reading response.content"""
+    import gzip
+    pdf_content = make_pdf(DOWNLOAD_CHUNK_SIZE * 2 + 5)
+    responses.add(responses.GET, PDF_URL, body=gzip.compress(pdf_content),
+                  headers={'content-type': 'application/pdf', 'content-encoding': 'gzip'})
+
+    with patch.object(requests.Response, 'content', new_callable=PropertyMock,
+                      side_effect=AssertionError('response body buffered in memory')):
+        result = downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert result.success is True
+    assert result.file_size == len(pdf_content)
+    with open(result.file_path, 'rb') as f:
+        assert f.read() == pdf_content
+
+
+@responses.activate
+def test_incremental_download_spanning_many_chunks(downloader):
+    """Test the incremental path saves and registers multi-chunk bodies"""
+    pdf_content = make_pdf(DOWNLOAD_CHUNK_SIZE * 2 + 5)
+    responses.add(responses.HEAD, PDF_URL, headers={'content-type': 'application/pdf'})
+    responses.add(responses.GET, PDF_URL, body=pdf_content)
+
+    result = downloader.download_pdf_incremental(PDF_URL, 'Test Department')
+
+    assert result.success is True
+    assert os.path.getsize(result.file_path) == len(pdf_content)
+    assert downloader.get_registry_stats()['total_size'] == len(pdf_content)
+
+
+@responses.activate
+def test_invalid_download_leaves_no_file(downloader):
+    """Test content failing validation is not left on disk"""
+    responses.add(responses.HEAD, PDF_URL, headers={'content-type': 'application/pdf'})
+    responses.add(responses.GET, PDF_URL, body=b'<html>' + b'x' * 500 + b'</html>')
+
+    result = downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert result.success is False
+    assert 'not a valid PDF' in result.error
+    local_path = downloader._get_local_path(downloader.generate_filename(PDF_URL), 'Test Department')
+    assert not os.path.exists(local_path)
+    assert not os.path.exists(local_path + '.part')
+
+
+def test_interrupted_stream_removes_part_file(downloader, tmp_path):
+    """Test a connection dropped mid-body doesn't leave a partial file"""
+    def broken_body(chunk_size):
+        yield b'%PDF-1.4\n' + b'x' * 200
+        raise requests.exceptions.ChunkedEncodingError('connection dropped')
+
+    response = Mock()
+    response.iter_content.side_effect = broken_body
+    target = str(tmp_path / 'Test-Department' / 'report.pdf')
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        downloader._stream_to_file(response, PDF_URL, target)
+
+    assert not os.path.exists(target)
+    assert not os.path.exists(target + '.part')
+
+
+def test_small_upload_uses_single_put(s3_downloader):
+    """Test files under the multipart threshold are sent with put_object"""
+    assert s3_downloader.upload_to_s3(make_pdf(1024), 'small.pdf') is True
+
+    s3_downloader.s3_client.put_object.assert_called_once()
+    s3_downloader.s3_client.upload_fileobj.assert_not_called()
+
+
+def test_large_upload_uses_multipart_transfer(s3_downloader, tmp_path):
+    """Test large files are streamed through the multipart transfer manager"""
+    file_path = tmp_path / 'large.pdf'
+    file_path.write_bytes(make_pdf(MULTIPART_THRESHOLD + 1))
+
+    with open(file_path, 'rb') as f:
+        assert s3_downloader.upload_to_s3(f, 'large.pdf') is True
+
+    s3_downloader.s3_client.put_object.assert_not_called()
+    args, kwargs = s3_downloader.s3_client.upload_fileobj.call_args
+    assert args[1:] == ('test-bucket', 'large.pdf')
+    assert kwargs['Config'] is s3_downloader.s3_transfer_config
+    assert kwargs['ExtraArgs']['ContentType'] == 'application/pdf'
+
+
+def test_http_blocksize_raised_for_uploads():
+    """Test connections used by boto3 send bodies in large blocks"""
+    import urllib3.connection
+    from downloader import HTTP_BLOCKSIZE
+
+    connection = urllib3.connection.HTTPConnection('example.com')
+
+    assert connection.blocksize == HTTP_BLOCKSIZE
+
+
+@responses.activate
+def test_registry_hash_computed_while_streaming(downloader):
+    """Test the registry records the SHA-256 of the downloaded bytes without rehashing"""
+    pdf_content = make_pdf(DOWNLOAD_CHUNK_SIZE + 99)
+    responses.add(responses.HEAD, PDF_URL, headers={'content-type': 'application/pdf'})
+    responses.add(responses.GET, PDF_URL, body=pdf_content)
+
+    with patch.object(downloader, '_get_file_hash_from_path') as rehash:
+        result = downloader.download_pdf_incremental(PDF_URL, 'Test Department')
+
+    rehash.assert_not_called()
+    assert result.file_hash == hashlib.sha256(pdf_content).hexdigest()
+    entry, = downloader.file_registry.values()
+    assert entry['file_hash'] == result.file_hash
+    assert entry['file_size'] == len(pdf_content)
+
+
+def test_legacy_registry_rekeyed_by_url(tmp_path):
+    """Test registries keyed by URL hash are loaded keyed by URL"""
+    legacy_key = hashlib.md5(PDF_URL.encode()).hexdigest()
+    registry = {legacy_key: {'url': PDF_URL, 'file_size': 123, 'etag': '"abc"'}}
+    with open(tmp_path / '.file_registry.json', 'w') as f:
+        json.dump(registry, f)
+
+    config = StorageConfig(local_path=str(tmp_path), s3_enabled=False)
+    downloader = FileDownloader(config)
+
+    assert len(downloader.file_registry) == 1
+    entry = downloader.file_registry.get(PDF_URL)
+    assert entry['file_size'] == 123
+    assert entry['etag'] == '"abc"'
+
+
+def test_department_names_cleaned_consistently(s3_downloader):
+    """Test local paths and S3 keys share the same cleaned department directory"""
+    department = 'Buildings Department (Codes & Manuals)'
+
+    local_path = s3_downloader._get_local_path('doc.pdf', department)
+    s3_key = s3_downloader._get_s3_key('doc.pdf', department)
+
+    assert local_path.endswith(os.path.join('Buildings-Department-Codes-Manuals', 'doc.pdf'))
+    assert s3_key == 'Buildings-Department-Codes-Manuals/doc.pdf'
+    assert s3_downloader.generate_filename(PDF_URL, title='  Annual Report: 2024/25 ') == 'Annual-Report-202425.pdf'
+
+
+def test_prefetched_s3_listing_replaces_head_object(s3_downloader, tmp_path):
+    """Test file_exists answers from the department listing once it is prefetched"""
+    paginator = s3_downloader.s3_client.get_paginator.return_value
+    paginator.paginate.return_value = [
+        {'Contents': [{'Key': 'Test-Department/a.pdf'}]},
+        {'Contents': [{'Key': 'Test-Department/b.pdf'}]},
+    ]
+
+    s3_downloader._prefetch_s3_keys('Test Department')
+
+    paginator.paginate.assert_called_once_with(Bucket='test-bucket', Prefix='Test-Department/')
+    assert s3_downloader.file_exists(str(tmp_path / 'Test-Department' / 'b.pdf'), 'Test Department')
+    assert not s3_downloader.file_exists(str(tmp_path / 'Test-Department' / 'c.pdf'), 'Test Department')
+    s3_downloader.s3_client.head_object.assert_not_called()
+
+    # Successful uploads are added to the listing
+    s3_downloader.upload_to_s3(make_pdf(200), 'Test-Department/c.pdf')
+    assert s3_downloader.file_exists(str(tmp_path / 'Test-Department' / 'c.pdf'), 'Test Department')
+
+
+def test_s3_prefetch_skipped_without_key_prefix(tmp_path):
+    """Test keys at the bucket root aren't prefetched by listing the whole bucket"""
+    config = StorageConfig(
+        local_path=str(tmp_path), organize_by_department=False,
+        s3_enabled=True, s3_bucket='test-bucket'
+    )
+    with patch('downloader.boto3.client') as mock_boto3_client:
+        mock_boto3_client.return_value = Mock()
+        flat_downloader = FileDownloader(config)
+
+    flat_downloader._prefetch_s3_keys('Test Department')
+
+    flat_downloader.s3_client.get_paginator.assert_not_called()
+    assert flat_downloader._s3_existing_keys == {}
+
+
+@responses.activate
+def test_download_validates_from_get_headers(downloader):
+    """Test downloads are validated from the GET response without a HEAD request"""
+    pdf_content = make_pdf(500)
+    responses.add(responses.GET, PDF_URL, body=pdf_content, headers={'content-type': 'application/pdf'})
+
+    result = downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert result.success is True
+    assert [call.request.method for call in responses.calls] == ['GET']
+
+
+@responses.activate
+def test_validate_pdf_url_skips_head_for_government_pdfs(downloader):
+    """Test .pdf links on government sites are accepted without a HEAD request"""
+    other_url = 'https://example.com/download?id=7'
+    responses.add(responses.HEAD, other_url, headers={'content-type': 'text/html'})
+
+    assert downloader._validate_pdf_url(PDF_URL) is True
+    assert downloader._validate_pdf_url(other_url) is False
+    assert [call.request.url for call in responses.calls] == [other_url]
+
+
+@responses.activate
+def test_non_pdf_get_response_rejected(downloader):
+    """Test a non-PDF response is rejected from its headers"""
+    page_url = 'https://example.gov.hk/docs/report'
+    responses.add(responses.GET, page_url, body=b'<html></html>', headers={'content-type': 'text/html'})
+
+    result = downloader.download_pdf(page_url, 'Test Department')
+
+    assert result.success is False
+    assert result.error == "URL does not point to a valid PDF file"
+
+
+@responses.activate
+def test_incremental_download_uses_conditional_get(downloader):
+    """Test unchanged files are skipped from a 304 without any HEAD request"""
+    pdf_content = make_pdf(500)
+    validators = {'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+    responses.add(responses.GET, PDF_URL, body=pdf_content,
+                  headers={'content-type': 'application/pdf', **validators})
+    first = downloader.download_pdf_incremental(PDF_URL, 'Test Department')
+    assert first.success is True
+
+    responses.replace(responses.GET, PDF_URL, status=304)
+    second = downloader.download_pdf_incremental(PDF_URL, 'Test Department')
+
+    assert second.success is True
+    assert second.file_path == first.file_path
+    assert second.file_size == len(pdf_content)
+    assert [call.request.method for call in responses.calls] == ['GET', 'GET']
+    conditional = responses.calls[1].request.headers
+    assert conditional['If-None-Match'] == '"v1"'
+    assert conditional['If-Modified-Since'] == validators['Last-Modified']
+
+
+@responses.activate
+def test_forced_incremental_download_skips_validators(downloader):
+    """Test force_update downloads without conditional headers"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(500),
+                  headers={'content-type': 'application/pdf', 'ETag': '"v1"'})
+    downloader.download_pdf_incremental(PDF_URL, 'Test Department')
+
+    result = downloader.download_pdf_incremental(PDF_URL, 'Test Department', force_update=True)
+
+    assert result.success is True
+    assert 'If-None-Match' not in responses.calls[1].request.headers
+
+
+@responses.activate
+def test_session_defaults_shared_by_requests(downloader):
+    """Test the pooled session adapter and default headers used by every request"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(500), headers={'content-type': 'application/pdf'})
+
+    downloader.download_pdf(PDF_URL, 'Test Department')
+
+    adapter = downloader.session.get_adapter(PDF_URL)
+    assert adapter._pool_maxsize == 64
+    assert responses.calls[0].request.headers['User-Agent'] == 'HK-PDF-Crawler/1.0'
+
+
+def test_session_per_thread_shares_connection_pool(downloader):
+    """Test each thread gets its own session mounted on the shared adapter"""
+    sessions = []
+    worker = threading.Thread(target=lambda: sessions.append(downloader.session))
+    worker.start()
+    worker.join()
+
+    assert downloader.session is downloader.session
+    assert sessions[0] is not downloader.session
+    assert sessions[0].get_adapter(PDF_URL) is downloader.session.get_adapter(PDF_URL)
+
+
+def test_validate_pdf_content_accepts_views_and_paths(downloader, tmp_path):
+    """Test validation of bytes-like objects and files on disk"""
+    pdf_content = make_pdf(4096)
+    pdf_file = tmp_path / 'doc.pdf'
+    pdf_file.write_bytes(pdf_content)
+    html_file = tmp_path / 'page.pdf'
+    html_file.write_bytes(b'<html>' + b'x' * 200)
+
+    assert downloader.validate_pdf_content(memoryview(pdf_content)) is True
+    assert downloader.validate_pdf_content(bytearray(pdf_content)) is True
+    assert downloader.validate_pdf_content(str(pdf_file)) is True
+    assert downloader.validate_pdf_content(pdf_file) is True
+    assert downloader.validate_pdf_content(memoryview(b'%PDF-1.4')) is False
+    assert downloader.validate_pdf_content(str(html_file)) is False
+    assert downloader.validate_pdf_content(str(tmp_path / 'missing.pdf')) is False
+
+
+def test_local_snapshot_answers_file_exists(downloader, tmp_path):
+    """Test file_exists uses the department directory snapshot once taken"""
+    dept_dir = tmp_path / 'Test-Department'
+    dept_dir.mkdir()
+    (dept_dir / 'present.pdf').write_bytes(make_pdf(200))
+    (dept_dir / 'empty.pdf').write_bytes(b'')
+
+    snapshot = downloader._snapshot_local('Test Department')
+
+    assert snapshot['present.pdf'] > 0
+    with patch('downloader.os.path.getsize') as getsize:
+        assert downloader.file_exists(str(dept_dir / 'present.pdf'), 'Test Department')
+        assert not downloader.file_exists(str(dept_dir / 'empty.pdf'), 'Test Department')
+        assert not downloader.file_exists(str(dept_dir / 'missing.pdf'), 'Test Department')
+    getsize.assert_not_called()
+
+
+@responses.activate
+def test_downloads_update_local_snapshot(downloader):
+    """Test newly saved files are added to an existing snapshot"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(500), headers={'content-type': 'application/pdf'})
+    downloader._snapshot_local('Test Department')
+
+    result = downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert downloader.file_exists(result.file_path, 'Test Department')
+
+
+def test_department_directory_created_once(downloader, tmp_path):
+    """Test the department directory is created on the first save only"""
+    first = str(tmp_path / 'New Department' / 'a.pdf')
+    second = str(tmp_path / 'New Department' / 'b.pdf')
+
+    with patch('downloader.os.makedirs', wraps=os.makedirs) as makedirs:
+        assert downloader.save_locally(make_pdf(500), first)
+        assert downloader.save_locally(make_pdf(500), second)
+
+    assert makedirs.call_count == 1
+    assert os.path.exists(first) and os.path.exists(second)
+
+
+def test_large_saves_dropped_from_page_cache(downloader, tmp_path):
+    """Test big files are written buffered and advised out of the page cache"""
+    from downloader import PAGE_CACHE_DROP_THRESHOLD
+
+    small_path = str(tmp_path / 'small.pdf')
+    large_path = str(tmp_path / 'large.pdf')
+
+    with patch.object(downloader, '_drop_page_cache') as drop_page_cache:
+        assert downloader.save_locally(make_pdf(1024), small_path)
+        drop_page_cache.assert_not_called()
+
+        assert downloader.save_locally(make_pdf(PAGE_CACHE_DROP_THRESHOLD), large_path)
+        drop_page_cache.assert_called_once()
+
+    assert os.path.getsize(large_path) == PAGE_CACHE_DROP_THRESHOLD
+
+
+@pytest.mark.skipif(not hasattr(os, 'posix_fadvise'), reason="posix_fadvise not available")
+def test_page_cache_drop_syncs_before_advising(downloader, tmp_path):
+    """Test the written data is synced to disk before DONTNEED is advised"""
+    calls = []
+
+    with patch('downloader.os.fdatasync', side_effect=lambda fd: calls.append('fdatasync')), \
+         patch('downloader.os.posix_fadvise', side_effect=lambda *args: calls.append('fadvise')):
+        with open(tmp_path / 'doc.pdf', 'wb') as f:
+            f.write(make_pdf(1024))
+            downloader._drop_page_cache(f)
+
+    assert calls == ['fdatasync', 'fadvise']
+
+
+@responses.activate
+def test_s3_bound_downloads_stay_in_page_cache(s3_downloader):
+    """Test a download queued for S3 upload isn't dropped before it's read back"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(4096), headers={'content-type': 'application/pdf'})
+
+    with patch('downloader.PAGE_CACHE_DROP_THRESHOLD', 1024), \
+         patch.object(s3_downloader, '_drop_page_cache') as drop_page_cache:
+        result = s3_downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert result.success is True
+    drop_page_cache.assert_not_called()
+
+
+@responses.activate
+def test_download_skips_per_file_head_object(s3_downloader):
+    """Test single downloads don't send HeadObject for files missing locally"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(500), headers={'content-type': 'application/pdf'})
+
+    result = s3_downloader.download_pdf(PDF_URL, 'Test Department')
+
+    assert result.success is True
+    s3_downloader.s3_client.head_object.assert_not_called()
+    assert not s3_downloader.file_exists('/nonexistent/doc.pdf', 'Test Department', force_s3_check=False)
+    s3_downloader.s3_client.head_object.assert_not_called()
+
+
+def test_non_pdf_body_aborted_after_first_chunk(downloader, tmp_path):
+    """Test a body without the PDF header is rejected without reading further"""
+    chunks_read = []
+
+    def html_body(chunk_size):
+        for chunk in (b'<!DOCTYPE html>', b'x' * chunk_size, b'x' * chunk_size):
+            chunks_read.append(chunk)
+            yield chunk
+
+    response = Mock()
+    response.iter_content.side_effect = html_body
+    target = str(tmp_path / 'Test-Department' / 'report.pdf')
+
+    result = downloader._stream_to_file(response, PDF_URL, target)
+
+    assert result.success is False
+    assert 'not a valid PDF' in result.error
+    assert len(chunks_read) == 1
+    response.close.assert_called_once()
+    assert not os.path.exists(target + '.part')
+
+
+def test_pdf_header_split_across_chunks(downloader, tmp_path):
+    """Test the header check handles a magic number split over small chunks"""
+    pdf_content = make_pdf(300)
+    response = Mock()
+    response.iter_content.return_value = iter([pdf_content[:2], pdf_content[2:4], pdf_content[4:]])
+    target = str(tmp_path / 'report.pdf')
+
+    result = downloader._stream_to_file(response, PDF_URL, target)
+
+    assert result.success is True
+    with open(target, 'rb') as f:
+        assert f.read() == pdf_content
+
+
+def test_s3_upload_queue_is_bounded(s3_downloader, tmp_path):
+    """Test queued uploads block once the uploader threads fall behind"""
+    release = threading.Event()
+    s3_downloader.s3_client.upload_file.side_effect = lambda *args, **kwargs: release.wait(5)
+    file_path = tmp_path / 'report.pdf'
+    file_path.write_bytes(make_pdf(500))
+
+    # Fill every worker and every queue slot
+    for i in range(S3_UPLOAD_WORKERS + S3_UPLOAD_QUEUE_SIZE):
+        s3_downloader._queue_s3_upload(str(file_path), f'key-{i}', 'report.pdf')
+
+    blocked = threading.Thread(
+        target=s3_downloader._queue_s3_upload, args=(str(file_path), 'key-extra', 'report.pdf')
+    )
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(5)
+    s3_downloader.close()
+
+    assert not blocked.is_alive()
+    assert s3_downloader.s3_client.upload_file.call_count == S3_UPLOAD_WORKERS + S3_UPLOAD_QUEUE_SIZE + 1
+
+
+@responses.activate
+def test_close_waits_for_queued_uploads(s3_downloader):
+    """Test close finishes queued uploads and stops the uploader threads"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(500), headers={'content-type': 'application/pdf'})
+
+    result = s3_downloader.download_pdf(PDF_URL, 'Test Department')
+    s3_downloader.close()
+
+    assert result.success is True
+    s3_downloader.s3_client.upload_file.assert_called_once()
+    assert s3_downloader._s3_workers == []
+
+
+@responses.activate
+def test_queued_uploads_read_from_disk(s3_downloader):
+    """Test background uploads hand the saved path to the transfer manager"""
+    responses.add(responses.GET, PDF_URL, body=make_pdf(500), headers={'content-type': 'application/pdf'})
+
+    result = s3_downloader.download_pdf(PDF_URL, 'Test Department')
+    s3_downloader.close()
+
+    args, kwargs = s3_downloader.s3_client.upload_file.call_args
+    assert args[0] == result.file_path
+    assert args[1] == 'test-bucket'
+    assert kwargs['ExtraArgs']['ContentType'] == 'application/pdf'
+    assert kwargs['Config'] is s3_downloader.s3_transfer_config
+    s3_downloader.s3_client.put_object.assert_not_called()
+
+
+@pytest.mark.parametrize('title, expected', [
+    ('Annual Report 2023/24 (Final)', 'Annual-Report-202324-Final.pdf'),
+    ('  --Budget -- Speech\t2024--  ', 'Budget-Speech-2024.pdf'),
+    ('snake_case_title', 'snake_case_title.pdf'),
+    ('年報 2023 (Final)', '年報-2023-Final.pdf'),
+])
+def test_generate_filename_cleans_titles(downloader, title, expected):
+    """Test ASCII titles (translate fast path) and non-ASCII titles clean alike"""
+    assert downloader.generate_filename(PDF_URL, title) == expected
+
+
+def test_registry_update_with_hash_only_keeps_size(downloader, tmp_path):
+    """Test a precomputed hash without a size still records the file size"""
+    file_path = str(tmp_path / 'doc.pdf')
+    content = make_pdf(2048)
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+    with patch.object(downloader, '_get_file_hash_from_path') as hash_from_path:
+        downloader.update_file_registry(PDF_URL, file_path, file_hash='abc123')
+
+    hash_from_path.assert_not_called()
+    entry = downloader.file_registry.get(PDF_URL)
+    assert entry['file_hash'] == 'abc123'
+    assert entry['file_size'] == len(content)
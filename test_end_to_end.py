@@ -21,6 +21,8 @@ from crawler import PDFCrawler
 from main import main, create_config_from_markdown
 from models import CrawlResults
 
+pytestmark = pytest.mark.e2e
+
 
 class TestEndToEndWorkflow:
     """End-to-end workflow tests"""
@@ -207,6 +209,9 @@ class TestEndToEndWorkflow:
         
         assert len(results.departments) == 1
         assert results.departments[0].department == 'Buildings Department'
+        
+        # The progress writer thread is stopped once the crawl finishes
+        assert crawler.progress_reporter._writer is None
     
     @responses.activate
     def test_error_recovery_workflow(self):
@@ -571,6 +576,9 @@ class TestMainCLIInterface:
             # Verify dry_run was called instead of crawl
             mock_crawler.dry_run.assert_called_once()
             mock_crawler.crawl.assert_not_called()
+            mock_crawler.progress_reporter.print_dry_run_report.assert_called_once_with(
+                mock_crawler.dry_run.return_value
+            )
             
         finally:
             os.unlink(config_file.name)
@@ -618,6 +626,81 @@ class TestMainCLIInterface:
             if self.original_argv:
                 sys.argv = self.original_argv
 
+    @patch('main.PDFCrawler')
+    def test_main_rejects_unknown_departments(self, mock_crawler_class, capsys):
+        """Test unknown departments are reported in the order given"""
+        import sys
+        
+        config_file = tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False)
+        yaml.dump({
+            'departments': {
+                'dept1': {'name': 'Dept 1', 'seed_urls': ['https://example1.com']},
+                'dept2': {'name': 'Dept 2', 'seed_urls': ['https://example2.com']}
+            }
+        }, config_file)
+        config_file.close()
+        
+        try:
+            self.original_argv = sys.argv.copy()
+            sys.argv = ['main.py', '--config', config_file.name,
+                        '--departments', 'zeta', 'dept1', 'alpha']
+            
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+            
+            assert exc_info.value.code == 1
+            output = capsys.readouterr().out
+            assert 'Invalid departments specified: zeta, alpha' in output
+            assert 'Available departments: dept1, dept2' in output
+            mock_crawler_class.assert_not_called()
+            
+        finally:
+            os.unlink(config_file.name)
+            if self.original_argv:
+                sys.argv = self.original_argv
+    
+    def test_main_imports_crawler_lazily(self):
+        """Test importing main leaves the crawling stack and tqdm unloaded"""
+        import subprocess
+        import sys
+        
+        code = (
+            "import sys, main\n"
+            "assert 'crawler' not in sys.modules and 'tqdm' not in sys.modules\n"
+            "from crawler import PDFCrawler\n"
+            "assert main.PDFCrawler is PDFCrawler\n"
+        )
+        subprocess.run(
+            [sys.executable, '-c', code], check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    
+    def test_final_report_written_in_one_call(self):
+        """Test the final report is emitted with a single stdout write"""
+        from main import print_final_report
+        from models import DepartmentResults
+        
+        results = CrawlResults(
+            departments=[DepartmentResults(
+                department='Test Department', urls_crawled=5, pdfs_found=4,
+                pdfs_downloaded=3, pdfs_failed=1, pdfs_skipped=0,
+                total_size=2 * 1024 * 1024, duration=120.0, errors=['Error'] * 7
+            )],
+            total_pdfs_found=4,
+            total_pdfs_downloaded=3,
+            total_duration=120.0,
+            success_rate=75.0
+        )
+        
+        with patch('main.sys.stdout') as mock_stdout:
+            print_final_report(results)
+        
+        mock_stdout.write.assert_called_once()
+        output = mock_stdout.write.call_args[0][0]
+        assert 'Total Size: 2.00 MB' in output
+        assert '... and 2 more errors' in output
+        assert 'Average Speed: 1.5 PDFs/minute' in output
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -22,6 +22,8 @@ from downloader import FileDownloader
 from utils import handle_error, retry_with_backoff
 from models import DownloadResult
 
+pytestmark = pytest.mark.errors
+
 
 class TestNetworkErrorHandling:
     """Test handling of various network errors"""
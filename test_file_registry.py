@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Tests for the file registry used by incremental downloads
+
+Covers recording and looking up downloads, statistics, persistence and
+migration of the legacy JSON registry file.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pytest
+from unittest.mock import patch
+
+import file_registry
+from file_registry import FileRegistry
+
+pytestmark = pytest.mark.unit
+
+
+PDF_URL = 'https://example.gov.hk/docs/report.pdf'
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Create a file registry in a temporary directory"""
+    file_registry = FileRegistry(str(tmp_path / '.file_registry.db'))
+    yield file_registry
+    file_registry.close()
+
+
+def test_record_and_lookup(registry):
+    """Test entries are returned with all recorded fields"""
+    registry[PDF_URL] = {
+        'url': PDF_URL,
+        'local_path': '/downloads/report.pdf',
+        'download_time': 1.5,
+        'file_size': 2048,
+        'file_hash': 'abc123',
+        'etag': '"v1"'
+    }
+
+    entry = registry.get(PDF_URL)
+
+    assert entry['local_path'] == '/downloads/report.pdf'
+    assert entry['file_size'] == 2048
+    assert entry['etag'] == '"v1"'
+    assert entry['last_modified'] is None
+    assert PDF_URL in registry
+    assert registry.get('https://example.gov.hk/missing.pdf') is None
+
+
+def test_replacing_entry_keeps_one_row(registry):
+    """Test re-downloads replace the previous entry"""
+    registry[PDF_URL] = {'file_size': 100}
+    registry[PDF_URL] = {'file_size': 200}
+
+    assert len(registry) == 1
+    assert registry.get(PDF_URL)['file_size'] == 200
+
+
+def test_stats(registry):
+    """Test file count and total size"""
+    assert registry.get_stats() == {'total_files': 0, 'total_size': 0}
+
+    registry['https://example.gov.hk/a.pdf'] = {'file_size': 100}
+    registry['https://example.gov.hk/b.pdf'] = {'file_size': 250}
+
+    assert registry.get_stats() == {'total_files': 2, 'total_size': 350}
+
+
+def test_registry_persists_across_instances(tmp_path):
+    """Test entries survive reopening the database"""
+    db_file = str(tmp_path / '.file_registry.db')
+    first = FileRegistry(db_file)
+    first[PDF_URL] = {'file_size': 100}
+    first.close()
+
+    second = FileRegistry(db_file)
+    try:
+        assert second.get(PDF_URL)['file_size'] == 100
+    finally:
+        second.close()
+
+
+def test_legacy_json_registry_migration(tmp_path):
+    """Test entries from the old JSON registry are imported once"""
+    legacy_file = str(tmp_path / '.file_registry.json')
+    with open(legacy_file, 'w') as f:
+        json.dump({
+            hashlib.md5(PDF_URL.encode()).hexdigest(): {'url': PDF_URL, 'file_size': 123}
+        }, f)
+
+    registry = FileRegistry(str(tmp_path / '.file_registry.db'), legacy_json_file=legacy_file)
+    try:
+        assert registry.get(PDF_URL)['file_size'] == 123
+        assert not os.path.exists(legacy_file)
+        assert os.path.exists(legacy_file + '.migrated')
+    finally:
+        registry.close()
+
+
+def test_updates_are_buffered_until_flush(tmp_path):
+    """Test writes are batched in memory but still visible to lookups"""
+    registry = FileRegistry(str(tmp_path / '.file_registry.db'), flush_interval=60)
+    try:
+        registry[PDF_URL] = {'file_size': 100}
+
+        stored, = registry.conn.execute("SELECT COUNT(*) FROM registry").fetchone()
+        assert stored == 0
+        assert registry.get(PDF_URL)['file_size'] == 100
+
+        registry.flush()
+        stored, = registry.conn.execute("SELECT COUNT(*) FROM registry").fetchone()
+        assert stored == 1
+    finally:
+        registry.close()
+
+
+def test_background_flusher_writes_batches(tmp_path):
+    """Test the background flusher persists entries without an explicit flush"""
+    registry = FileRegistry(str(tmp_path / '.file_registry.db'), flush_interval=0.05)
+    try:
+        for i in range(5):
+            registry[f'https://example.gov.hk/{i}.pdf'] = {'file_size': i}
+
+        deadline = time.time() + 5
+        while registry._pending and time.time() < deadline:
+            time.sleep(0.01)
+
+        stored, = registry.conn.execute("SELECT COUNT(*) FROM registry").fetchone()
+        assert stored == 5
+    finally:
+        registry.close()
+
+
+def test_close_flushes_pending_entries(tmp_path):
+    """Test closing the registry persists buffered entries"""
+    db_file = str(tmp_path / '.file_registry.db')
+    registry = FileRegistry(db_file, flush_interval=60)
+    registry[PDF_URL] = {'file_size': 100}
+    registry.close()
+
+    reopened = FileRegistry(db_file)
+    try:
+        assert reopened.get(PDF_URL)['file_size'] == 100
+    finally:
+        reopened.close()
+
+
+def test_close_stops_flusher_thread(tmp_path):
+    """Test close joins the background flusher instead of leaving it waiting"""
+    registry = FileRegistry(str(tmp_path / '.file_registry.db'), flush_interval=60)
+    registry[PDF_URL] = {'file_size': 100}
+    flusher = registry._flusher
+    assert registry in file_registry._open_registries
+
+    registry.close()
+
+    assert not flusher.is_alive()
+    assert registry._flusher is None
+    assert registry not in file_registry._open_registries
+
+
+def test_registries_share_one_exit_hook(tmp_path):
+    """Test new registries don't each register an atexit callback"""
+    with patch('file_registry.atexit.register') as mock_register:
+        for i in range(3):
+            registry = FileRegistry(str(tmp_path / f'{i}.db'))
+            registry[PDF_URL] = {'file_size': i}
+            registry.close()
+
+    mock_register.assert_not_called()
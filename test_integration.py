@@ -10,11 +10,14 @@ import tempfile
 import logging
 from unittest.mock import Mock, patch
 import requests_mock
+import pytest
 
 from downloader import FileDownloader
 from config import StorageConfig
 from crawler import DownloadResult
 
+pytestmark = pytest.mark.existing
+
 
 # Configure logging for testing
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,6 +23,8 @@ from browser import BrowserHandler
 from reporter import ProgressReporter
 from models import DownloadResult
 
+pytestmark = pytest.mark.integration
+
 
 class TestIntegrationWithMockedRequests:
     """Integration tests using mocked HTTP responses"""
@@ -186,6 +188,58 @@ class TestIntegrationWithMockedRequests:
         assert not analysis.requires_browser  # No heavy JS in mock
         assert not analysis.rate_limit_detected
     
+    @responses.activate
+    def test_dry_run_reuses_cached_analysis(self):
+        """Test a repeated dry-run over unchanged seed URLs skips the network"""
+        from discovery_cache import AnalysisCache
+        
+        responses.add(
+            responses.GET,
+            'https://example.gov.hk/index.html',
+            body='<html><body><a href="doc1.pdf">PDF 1</a></body></html>',
+            status=200,
+            content_type='text/html'
+        )
+        
+        crawler = PDFCrawler(self.config)
+        crawler.analysis_cache = AnalysisCache(cache_dir=self.temp_dir)
+        first = crawler.dry_run(['test_dept'])
+        requests_made = len(responses.calls)
+        
+        second = crawler.dry_run(['test_dept'])
+        
+        assert len(responses.calls) == requests_made
+        assert second.department_analyses == first.department_analyses
+        
+        # Bypassing the cache probes the seed URLs again
+        crawler.use_analysis_cache = False
+        crawler.dry_run(['test_dept'])
+        assert len(responses.calls) > requests_made
+    
+    @responses.activate
+    def test_dry_run_survives_failed_cache_write(self):
+        """Test a cache write error doesn't abort the dry run or leave temp files"""
+        import errno
+        from discovery_cache import AnalysisCache
+        
+        responses.add(
+            responses.GET,
+            'https://example.gov.hk/index.html',
+            body='<html><body><a href="doc1.pdf">PDF 1</a></body></html>',
+            status=200,
+            content_type='text/html'
+        )
+        
+        crawler = PDFCrawler(self.config)
+        crawler.analysis_cache = AnalysisCache(cache_dir=self.temp_dir)
+        
+        with patch('discovery_cache.json.dump', side_effect=OSError(errno.ENOSPC, 'No space left on device')):
+            report = crawler.dry_run(['test_dept'])
+        
+        assert len(report.department_analyses) == 1
+        assert report.department_analyses[0].department == 'Test Department'
+        assert os.listdir(crawler.analysis_cache.cache_dir) == []
+    
     @responses.activate
     def test_error_handling_network_failures(self):
         """Test error handling for network failures"""
@@ -326,6 +380,45 @@ class TestIntegrationWithMockedRequests:
         dept_dir = Path(self.temp_dir) / 'test-department'
         pdf_files = list(dept_dir.glob('*.pdf'))
         assert len(pdf_files) == num_pdfs
+    
+    def test_departments_crawled_in_bounded_pool(self):
+        """Test departments run in parallel up to the worker limit, one result each"""
+        import threading
+        import time
+        from models import DepartmentResults
+        
+        for i in range(4):
+            self.config.departments[f'dept_{i}'] = DepartmentConfig(
+                name=f'Department {i}', seed_urls=[f'https://example.gov.hk/{i}.html']
+            )
+        
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        
+        def fake_crawl_department(dept_config):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            return DepartmentResults(
+                department=dept_config.name, urls_crawled=1, pdfs_found=2,
+                pdfs_downloaded=1, pdfs_failed=0, pdfs_skipped=1, total_size=0, duration=0.1,
+                errors=[]
+            )
+        
+        crawler = PDFCrawler(self.config, workers=2)
+        with patch.object(crawler, 'crawl_department', side_effect=fake_crawl_department):
+            results = crawler.crawl()
+        
+        assert peak[0] == 2
+        assert sorted(d.department for d in results.departments) == [
+            'Department 0', 'Department 1', 'Department 2', 'Department 3', 'Test Department'
+        ]
+        assert results.total_pdfs_found == 10
+        assert results.total_pdfs_downloaded == 5
 
 
 class TestFileDownloaderIntegration:
@@ -500,6 +593,108 @@ class TestProgressReporter:
         assert self.reporter.department_stats['test_dept']['pdfs_failed'] == 1
         assert self.reporter.stats['total_pdfs_failed'] == 1
     
+    def test_progress_lines_written_by_writer_thread(self, capsys):
+        """Test progress lines are queued and written in order on flush"""
+        for i in range(100):
+            self.reporter.track_skip('writer_dept', f'reason {i}')
+        self.reporter.flush()
+        
+        lines = [line for line in capsys.readouterr().out.splitlines() if 'writer_dept' in line]
+        assert len(lines) == 100
+        assert lines[0].endswith('writer_dept: download_skipped - reason 0')
+        assert lines[-1].endswith('writer_dept: download_skipped - reason 99')
+
+    def test_timestamp_formatted_once_per_second(self):
+        """Test events within the same second reuse the formatted timestamp"""
+        import time
+
+        with patch('reporter.time.strftime', wraps=time.strftime) as mock_strftime:
+            first = self.reporter._clock(1000.1)
+            assert self.reporter._clock(1000.9) is first
+            assert mock_strftime.call_count == 1
+
+            self.reporter._clock(1001.0)
+            assert mock_strftime.call_count == 2
+
+        assert first == time.strftime('%H:%M:%S', time.localtime(1000))
+
+    def test_concurrent_tracking(self):
+        """Test counters stay exact when many threads report at once"""
+        import threading
+        
+        def report():
+            for _ in range(500):
+                self.reporter.track_download('test_dept', True, 2)
+        
+        threads = [threading.Thread(target=report) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.reporter.flush()
+        
+        assert self.reporter.department_stats['test_dept']['pdfs_downloaded'] == 4000
+        assert self.reporter.stats['total_size'] == 8000
+        assert self.reporter.stats['total_download_success'] == 4000
+    
+    def test_counters_updated_by_writer_thread(self):
+        """Test reporting threads only queue events; the writer applies them"""
+        import threading
+        
+        applied_in = set()
+        original_apply = self.reporter._apply
+        
+        def record_apply(event):
+            applied_in.add(threading.current_thread().name)
+            original_apply(event)
+        
+        with patch.object(self.reporter, '_apply', side_effect=record_apply):
+            self.reporter.track_discovery('test_dept', 3, 2)
+            self.reporter.track_skip('test_dept')
+            assert self.reporter.stats['total_pdfs_skipped'] == 1
+        
+        assert applied_in == {'progress-writer'}
+        assert self.reporter.department_stats['test_dept']['discovery_count'] == 1
+
+    def test_close_writes_queued_events_and_stops_writer(self, capsys):
+        """Test close drains the queue and joins the writer thread"""
+        import reporter as reporter_module
+        
+        self.reporter.track_skip('close_dept', 'last event')
+        writer = self.reporter._writer
+        assert self.reporter in reporter_module._open_reporters
+        
+        self.reporter.close()
+        
+        assert not writer.is_alive()
+        assert self.reporter not in reporter_module._open_reporters
+        assert 'close_dept: download_skipped - last event' in capsys.readouterr().out
+        assert self.reporter.stats['total_pdfs_skipped'] == 1
+        
+        # Reporting after close starts a fresh writer
+        self.reporter.track_skip('close_dept')
+        assert self.reporter.stats['total_pdfs_skipped'] == 2
+        self.reporter.close()
+    
+    def test_reporters_share_one_exit_hook(self):
+        """Test new reporters don't each register an atexit callback"""
+        with patch('reporter.atexit.register') as mock_register:
+            for _ in range(3):
+                ProgressReporter().track_skip('test_dept')
+        
+        mock_register.assert_not_called()
+    
+    def test_bad_event_does_not_drop_batch(self):
+        """Test an event that fails to apply doesn't lose the rest of its batch"""
+        from reporter import StatEvent
+        
+        self.reporter._report(StatEvent(0.0, 'test_dept', 'broken', '', (('pdfs_found', None, 'x'),)))
+        self.reporter.track_skip('test_dept')
+        
+        assert self.reporter.stats['total_pdfs_skipped'] == 1
+        assert self.reporter.department_stats['test_dept']['pdfs_skipped'] == 1
+        self.reporter.close()
+    
     def test_report_generation(self):
         """Test report generation"""
         from models import CrawlResults, DepartmentResults
@@ -531,7 +726,175 @@ class TestProgressReporter:
         assert 'Test Department' in report
         assert '4' in report  # Downloaded count
         assert '80.0%' in report  # Success rate
+    
+    def test_report_drains_queue_once(self):
+        """Test a report waits for the writer once, not on every counter read"""
+        from models import CrawlResults
+        
+        self.reporter.track_skip('test_dept')
+        self.reporter.track_download('test_dept', False)
+        results = CrawlResults(departments=[], total_pdfs_found=0, total_pdfs_downloaded=0,
+                               total_duration=0.0, success_rate=0.0)
+        
+        with patch.object(self.reporter, 'flush', wraps=self.reporter.flush) as mock_flush:
+            report = self.reporter.generate_report(results)
+        
+        assert mock_flush.call_count == 1
+        assert 'Total PDFs failed: 1' in report
+        assert 'Total PDFs skipped: 1' in report
+        self.reporter.close()
+    
+    @pytest.mark.parametrize('department_count', [0, 1, 3])
+    def test_json_report_streamed(self, tmp_path, department_count):
+        """Test the streamed JSON report parses back with every department"""
+        from models import CrawlResults, DepartmentResults
+        
+        departments = [
+            DepartmentResults(
+                department=f'屋宇署 {i}', urls_crawled=i, pdfs_found=2, pdfs_downloaded=1,
+                pdfs_failed=1, pdfs_skipped=0, total_size=1024, duration=1.5,
+                errors=[f'Error "{i}"']
+            )
+            for i in range(department_count)
+        ]
+        results = CrawlResults(
+            departments=departments, total_pdfs_found=2 * department_count,
+            total_pdfs_downloaded=department_count, total_duration=1.5, success_rate=50.0
+        )
+        report_file = tmp_path / 'report.json'
+        
+        self.reporter._save_json_report(results, str(report_file))
+        
+        with open(report_file, encoding='utf-8') as f:
+            report_data = json.load(f)
+        assert report_data['overall_stats']['total_pdfs_found'] == 2 * department_count
+        assert [d['name'] for d in report_data['departments']] == [d.department for d in departments]
+        assert [d['errors'] for d in report_data['departments']] == [d.errors for d in departments]
+
+    
+    def test_csv_report_rows(self, tmp_path):
+        """Test the CSV report has a header and one row per department"""
+        import csv
+        from models import CrawlResults, DepartmentResults
+        
+        departments = [
+            DepartmentResults(
+                department=f'Department {i}', urls_crawled=i, pdfs_found=4, pdfs_downloaded=3,
+                pdfs_failed=1, pdfs_skipped=0, total_size=1024 * 1024, duration=90.0, errors=['e']
+            )
+            for i in range(3)
+        ]
+        results = CrawlResults(
+            departments=departments, total_pdfs_found=12,
+            total_pdfs_downloaded=9, total_duration=90.0, success_rate=75.0
+        )
+        report_file = tmp_path / 'report.csv'
+        
+        self.reporter._save_csv_report(results, str(report_file))
+        
+        with open(report_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        assert rows[0][0] == 'Department'
+        assert rows[1:] == [
+            [f'Department {i}', str(i), '4', '3', '1', '0', '1.0', '1.5', '75.0', '1']
+            for i in range(3)
+        ]
+    
+    def test_progress_bars_keep_their_lines(self):
+        """Test department bars share one lock and get stable, distinct positions"""
+        from tqdm import tqdm
+        
+        first = self.reporter.create_progress_bar('dept_a', 20, 'Downloading')
+        second = self.reporter.create_progress_bar('dept_b', 20, 'Downloading')
+        self.reporter.close_progress_bar('dept_a')
+        again = self.reporter.create_progress_bar('dept_a', 20, 'Downloading')
+        
+        assert abs(first.pos) == abs(again.pos) == 0
+        assert abs(second.pos) == 1
+        assert tqdm.get_lock() is self.reporter._bar_lock
+        assert second.mininterval == 0.5
+        
+        self.reporter.close_progress_bar('dept_a')
+        self.reporter.close_progress_bar('dept_b')
 
+    def test_progress_bars_do_not_replace_tqdm_lock(self):
+        """Test the shared tqdm lock is installed once, not per bar or reporter"""
+        from tqdm import tqdm
+        
+        self.reporter.create_progress_bar('dept_a', 20, 'Downloading')
+        lock = tqdm.get_lock()
+        
+        with patch.object(tqdm, 'set_lock') as mock_set_lock:
+            other = ProgressReporter()
+            other.create_progress_bar('dept_b', 20, 'Downloading')
+            self.reporter.create_progress_bar('dept_c', 20, 'Downloading')
+        
+        mock_set_lock.assert_not_called()
+        assert tqdm.get_lock() is lock is other._bar_lock
+        
+        for department in ('dept_a', 'dept_c'):
+            self.reporter.close_progress_bar(department)
+        other.close_progress_bar('dept_b')
+
+    def test_dry_run_report_single_write(self):
+        """Test the dry-run report is emitted with a single stdout write"""
+        from models import DepartmentAnalysis, DryRunReport
+
+        report = DryRunReport(
+            department_analyses=[DepartmentAnalysis(
+                department='Test Department', seed_urls_accessible=1, seed_urls_total=2,
+                estimated_pdfs=6, requires_browser=True, rate_limit_detected=False,
+                issues=['Seed URL unreachable']
+            )],
+            total_estimated_pdfs=6,
+            estimated_duration=90.0,
+            issues_found=[],
+            recommendations=['Enable browser automation']
+        )
+
+        with patch('reporter.sys.stdout') as mock_stdout:
+            self.reporter.print_dry_run_report(report)
+
+        mock_stdout.write.assert_called_once()
+        output = mock_stdout.write.call_args[0][0]
+        assert 'DRY-RUN ANALYSIS RESULTS' in output
+        assert 'Accessible URLs: 1/2' in output
+        assert 'Estimated Duration: 1.5 minutes' in output
+        assert 'No major issues detected' in output
+        assert 'Recommendations (1):' in output
+
+
+class TestDepartmentReportWriter:
+    """Test per-department success/failure report files"""
+    
+    def test_reports_written_from_streamed_results(self, tmp_path, monkeypatch, capsys):
+        """Test results added one at a time end up under the report headers"""
+        from crawler import DepartmentReportWriter
+        
+        monkeypatch.chdir(tmp_path)
+        writer = DepartmentReportWriter('Test Department (HK)')
+        writer.add(DownloadResult(url='https://example.gov.hk/a.pdf', success=True,
+                                  file_path='/tmp/a.pdf', file_size=1024 * 1024))
+        writer.add(DownloadResult(url='https://example.gov.hk/b.pdf', success=False, error='HTTP 404'))
+        writer.add(DownloadResult(url='https://example.gov.hk/c.pdf', success=True,
+                                  file_path='/tmp/c.pdf', file_size=0))
+        writer.close()
+        
+        success_file, = tmp_path.glob('test_department_hk_successful_downloads_*.txt')
+        failure_file, = tmp_path.glob('test_department_hk_failed_downloads_*.txt')
+        
+        success_lines = success_file.read_text(encoding='utf-8').splitlines()
+        assert success_lines[0] == 'SUCCESSFUL DOWNLOADS - Test Department (HK)'
+        assert success_lines[2] == 'Total: 2 PDFs'
+        assert success_lines[5:8] == [
+            '  1. https://example.gov.hk/a.pdf', '     File: /tmp/a.pdf', '     Size: 1.00 MB'
+        ]
+        assert '  2. https://example.gov.hk/c.pdf' in success_lines
+        
+        failure_lines = failure_file.read_text(encoding='utf-8').splitlines()
+        assert failure_lines[2] == 'Total: 1 URLs'
+        assert failure_lines[5:7] == ['  1. https://example.gov.hk/b.pdf', '     Reason: HTTP 404']
+        assert 'Successful: 2 PDFs' in capsys.readouterr().out
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -8,9 +8,12 @@ with sample crawl data to verify all functionality works correctly.
 
 import time
 import os
+import pytest
 from reporter import ProgressReporter
 from crawler import CrawlResults, DepartmentResults, DryRunReport, DepartmentAnalysis
 
+pytestmark = pytest.mark.existing
+
 
 def test_progress_reporting():
     """Test real-time progress reporting"""
@@ -18,6 +18,8 @@ from config import StorageConfig
 from downloader import FileDownloader
 from models import DownloadResult
 
+pytestmark = pytest.mark.s3
+
 
 class TestS3Configuration:
     """Test S3 configuration and initialization"""
@@ -53,7 +55,10 @@ class TestS3Configuration:
         downloader = FileDownloader(storage_config)
         
         # S3 client should be initialized
-        mock_boto3_client.assert_called_once_with('s3')
+        mock_boto3_client.assert_called_once()
+        args, kwargs = mock_boto3_client.call_args
+        assert args == ('s3',)
+        assert kwargs['config'].max_pool_connections >= 32
         assert downloader.s3_client is not None
     
     @patch('downloader.boto3.client')
@@ -9,6 +9,7 @@ including PDF detection, configuration loading, URL discovery, and utility funct
 import pytest
 import tempfile
 import os
+import sys
 import yaml
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
@@ -21,10 +22,13 @@ from config import (
 from discovery import URLDiscovery
 from utils import (
     handle_error, retry_with_backoff, normalize_url, extract_domain,
-    is_valid_url, sanitize_filename, UserAgentRotator, SessionManager
+    is_valid_url, sanitize_filename, is_government_domain, UserAgentRotator, SessionManager,
+    safe_json_dump, safe_json_load
 )
 from models import DownloadResult, DepartmentResults, CrawlResults
 
+pytestmark = pytest.mark.unit
+
 
 class TestConfigurationLoading:
     """Test configuration loading and validation"""
@@ -168,6 +172,38 @@ class TestConfigurationLoading:
         finally:
             os.unlink(markdown_path)
     
+    def test_create_config_from_markdown_url_blocks(self):
+        """Test URLs are assigned to the header above them, deduplicated and cleaned"""
+        markdown_content = """Intro link https://example.com/ignored.html
+
+## 1. Buildings Department (BD):
+See https://www.bd.gov.hk/a.html, and (https://www.bd.gov.hk/b.html).
+Again: https://www.bd.gov.hk/a.html
+
+## 2. Empty Department:
+No links here.
+
+## 3. Labour Department:
+1. **OSH**: https://www.labour.gov.hk/c.htm;
+"""
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+            f.write(markdown_content)
+            markdown_path = f.name
+
+        try:
+            config = create_config_from_markdown(markdown_path)
+
+            assert list(config.departments) == ['buildings_department', 'labour_department']
+            assert config.departments['buildings_department'].seed_urls == [
+                'https://www.bd.gov.hk/a.html', 'https://www.bd.gov.hk/b.html'
+            ]
+            assert config.departments['labour_department'].seed_urls == [
+                'https://www.labour.gov.hk/c.htm'
+            ]
+        finally:
+            os.unlink(markdown_path)
+
     def test_create_config_from_empty_markdown(self):
         """Test creating configuration from empty markdown file"""
         with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
@@ -410,6 +446,26 @@ class TestUtilityFunctions:
         assert is_valid_url("ftp://example.com") is False
         assert is_valid_url("not-a-url") is False
         assert is_valid_url("") is False
+
+    def test_is_government_domain(self):
+        """Test government domain detection on the host's registrable domain"""
+        assert is_government_domain("https://www.bd.gov.hk/en/index.html") is True
+        assert is_government_domain("https://WWW.LABOUR.GOV.HK:443/eng/") is True
+        assert is_government_domain("https://gov.hk/") is True
+        assert is_government_domain("https://notgov.hk/") is False
+        assert is_government_domain("https://gov.hk.example.com/") is False
+        assert is_government_domain("") is False
+
+    def test_safe_json_round_trip(self, tmp_path):
+        """Test JSON is written compactly with non-ASCII text kept as-is"""
+        json_file = tmp_path / "nested" / "state.json"
+        data = {"department": "屋宇署", "urls": ["https://www.bd.gov.hk/a.pdf"], "count": 2}
+        
+        assert safe_json_dump(data, str(json_file)) is True
+        assert json_file.read_text(encoding='utf-8') == (
+            '{"department":"屋宇署","urls":["https://www.bd.gov.hk/a.pdf"],"count":2}'
+        )
+        assert safe_json_load(str(json_file)) == data
     
     def test_sanitize_filename(self):
         """Test filename sanitization"""
@@ -422,7 +478,14 @@ class TestUtilityFunctions:
         sanitized = sanitize_filename(long_name)
         assert len(sanitized) <= 255
         assert sanitized.endswith(".pdf")
-    
+
+    def test_sanitize_filename_clean_names(self):
+        """Test already-clean names pass through and reserved names are still caught"""
+        assert sanitize_filename("annual-report_2023.v2.pdf") == "annual-report_2023.v2.pdf"
+        assert sanitize_filename("CON.pdf") == "_CON.pdf"
+        assert sanitize_filename("double__underscore.pdf") == "double_underscore.pdf"
+        assert sanitize_filename(".hidden.pdf") == "hidden.pdf"
+
     def test_user_agent_rotator(self):
         """Test user agent rotation"""
         rotator = UserAgentRotator()
@@ -531,7 +594,37 @@ class TestDataModels:
         assert result.total_pdfs_downloaded == 2
         assert result.total_duration == 15.0
         assert result.success_rate == 66.7
+    
+    def test_department_results_derived_values(self):
+        """Test DepartmentResults unit conversions and success rate"""
+        result = DepartmentResults(
+            department="Test",
+            urls_crawled=5,
+            pdfs_found=4,
+            pdfs_downloaded=3,
+            pdfs_failed=1,
+            pdfs_skipped=0,
+            total_size=3 * 1024 * 1024,
+            duration=90.0,
+            errors=[]
+        )
+        
+        assert result.total_size_mb == 3.0
+        assert result.duration_minutes == 1.5
+        assert result.success_rate == 75.0
+        
+        result.pdfs_found = 0
+        assert result.success_rate == 0
 
+    
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+    def test_result_models_use_slots(self):
+        """Test result models don't carry a per-instance __dict__"""
+        result = DownloadResult(url="https://example.com/test.pdf", success=True)
+        
+        assert not hasattr(result, '__dict__')
+        with pytest.raises(AttributeError):
+            result.unexpected = True
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -5,14 +5,41 @@ This module contains helper functions and utilities used across the PDF crawler,
 including URL parsing, file handling, error handling, and retry logic.
 """
 
+import os
+import re
+import json
+import math
 import time
 import logging
 import random
 from functools import wraps
-from typing import Callable, Any, List
-from urllib.parse import urlparse, urljoin
+from typing import Callable, Any, List, Union
+from urllib.parse import urlparse, urlsplit, urljoin, unquote
 import requests
 
+# Patterns are compiled once at import instead of on every call
+# Invalid characters for Windows/Unix filesystems: < > : " / \ | ? *
+_INVALID_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+# Control characters (0x00-0x1f, 0x7f-0x9f)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_SEPARATOR_RUN_RE = re.compile(r'[_\s]+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Names sanitize_filename would return unchanged: word characters joined by
+# single dots/underscores, with nothing to strip at either end
+_CLEAN_FILENAME_RE = re.compile(r'[A-Za-z0-9-]+(?:[._][A-Za-z0-9-]+)*')
+
+# Registrable domains of Hong Kong government sites; every department
+# (bd.gov.hk, labour.gov.hk, ...) is a subdomain of one of these
+_GOV_DOMAINS = frozenset({'gov.hk'})
+
+# Reserved device names on Windows
+_RESERVED_FILENAMES = frozenset({
+    'CON', 'PRN', 'AUX', 'NUL',
+    'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
+    'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9'
+})
+
 
 def handle_error(error: Exception, context: str, url: str = None) -> bool:
     """
@@ -75,7 +102,6 @@ def normalize_url(url: str, base_url: str = None) -> str:
     
     # If base_url provided, resolve relative URL
     if base_url:
-        from urllib.parse import urljoin
         return urljoin(base_url, url)
     
     return url
@@ -95,7 +121,7 @@ def extract_domain(url: str) -> str:
         return ""
     
     try:
-        parsed = urlparse(url)
+        parsed = urlsplit(url)
         domain = parsed.netloc
         
         # Remove 'www.' prefix if present
@@ -121,7 +147,7 @@ def is_valid_url(url: str) -> bool:
         return False
     
     try:
-        parsed = urlparse(url.strip())
+        parsed = urlsplit(url.strip())
         return bool(parsed.netloc and parsed.scheme in ('http', 'https'))
     except Exception:
         return False
@@ -140,30 +166,26 @@ def sanitize_filename(filename: str) -> str:
     if not filename:
         return f"unnamed_file_{int(time.time())}"
     
-    import re
+    # Most names are already safe; skip the rewrite pipeline for them
+    if (len(filename) <= 255 and _CLEAN_FILENAME_RE.fullmatch(filename)
+            and filename.split('.')[0].upper() not in _RESERVED_FILENAMES):
+        return filename
     
     # Remove or replace invalid characters for Windows/Unix filesystems
-    # Invalid characters: < > : " / \ | ? * and control characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _INVALID_FILENAME_CHARS_RE.sub('_', filename)
     
-    # Remove control characters (0x00-0x1f, 0x7f-0x9f)
-    filename = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', filename)
+    # Remove control characters
+    filename = _CONTROL_CHARS_RE.sub('', filename)
     
     # Replace multiple consecutive spaces/underscores with single underscore
-    filename = re.sub(r'[_\s]+', '_', filename)
+    filename = _SEPARATOR_RUN_RE.sub('_', filename)
     
     # Remove leading/trailing spaces and dots (Windows doesn't like these)
     filename = filename.strip(' .')
     
     # Handle reserved names on Windows
-    reserved_names = {
-        'CON', 'PRN', 'AUX', 'NUL',
-        'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
-        'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9'
-    }
-    
     name_part = filename.split('.')[0].upper()
-    if name_part in reserved_names:
+    if name_part in _RESERVED_FILENAMES:
         filename = f"_{filename}"
     
     # Limit total length (most filesystems support 255 chars)
@@ -274,14 +296,13 @@ def normalize_url(url: str, base_url: str = None) -> str:
 
 def extract_domain(url: str) -> str:
     """Extract domain from URL"""
-    parsed = urlparse(url)
-    return parsed.netloc
+    return urlsplit(url).netloc
 
 
 def is_valid_url(url: str) -> bool:
     """Check if URL is valid and accessible"""
     try:
-        parsed = urlparse(url)
+        parsed = urlsplit(url)
         return bool(parsed.netloc and parsed.scheme in ('http', 'https'))
     except Exception:
         return False
@@ -352,7 +373,6 @@ def format_file_size(size_bytes: int) -> str:
         return "0 B"
     
     size_names = ["B", "KB", "MB", "GB", "TB"]
-    import math
     i = int(math.floor(math.log(size_bytes, 1024)))
     p = math.pow(1024, i)
     s = round(size_bytes / p, 2)
@@ -404,10 +424,8 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    import re
-    
     # Remove extra whitespace and normalize
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = _WHITESPACE_RE.sub(' ', text.strip())
     
     # Remove common HTML entities
     html_entities = {
@@ -438,28 +456,10 @@ def is_government_domain(url: str) -> bool:
     if not url:
         return False
     
-    domain = extract_domain(url).lower()
-    
-    # Known HK government domains
-    gov_domains = [
-        'gov.hk',
-        'labour.gov.hk',
-        'bd.gov.hk',
-        'fehd.gov.hk',
-        'epd.gov.hk',
-        'fsd.gov.hk',
-        'landsd.gov.hk',
-        'devb.gov.hk',
-        'hkfsd.gov.hk',
-        'info.gov.hk',
-        'had.gov.hk',
-        'td.gov.hk',
-        'immd.gov.hk',
-        'ird.gov.hk',
-        'customs.gov.hk'
-    ]
-    
-    return any(domain.endswith(gov_domain) for gov_domain in gov_domains)
+    # hostname is lowercased and has any port removed; its last two
+    # labels are looked up directly instead of suffix-matching a list
+    host = urlsplit(url).hostname or ''
+    return '.'.join(host.rsplit('.', 2)[-2:]) in _GOV_DOMAINS
 
 
 def get_url_file_extension(url: str) -> str:
@@ -476,7 +476,6 @@ def get_url_file_extension(url: str) -> str:
         return ""
     
     try:
-        from urllib.parse import urlparse, unquote
         parsed = urlparse(url)
         path = unquote(parsed.path)
         
@@ -488,19 +487,22 @@ def get_url_file_extension(url: str) -> str:
     return ""
 
 
-def create_directory_safely(directory_path: str) -> bool:
+def create_directory_safely(directory_path: Union[str, os.PathLike]) -> bool:
     """
     Create directory with proper error handling
     
     Args:
-        directory_path: Path to create
+        directory_path: Path to create, as a string or path object
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        from pathlib import Path
-        Path(directory_path).mkdir(parents=True, exist_ok=True)
+        # The directory usually exists already: one stat answers that,
+        # where makedirs would fail a mkdir first and then stat anyway
+        if os.path.isdir(directory_path):
+            return True
+        os.makedirs(directory_path, exist_ok=True)
         return True
     except Exception as e:
         logging.error(f"Failed to create directory {directory_path}: {e}")
@@ -519,14 +521,15 @@ def safe_json_dump(data: Any, file_path: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        import json
         from pathlib import Path
         
         # Create directory if needed
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
         
+        # Compact separators let the C encoder write the whole document in
+        # one pass; indent forces the pure-Python encoder
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            f.write(json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str))
         return True
     except Exception as e:
         logging.error(f"Failed to write JSON to {file_path}: {e}")
@@ -544,7 +547,6 @@ def safe_json_load(file_path: str) -> Any:
         Loaded data or None if failed
     """
     try:
-        import json
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e: